@@ -36,12 +36,20 @@ def init_db():
     from models import (
         Project, Document, TestStrategy, TestPlan, 
         Comment, Participant, BreakdownCategory, BreakdownItem,
-        User, Share
+        User, Share, StoredFile, DocumentPage, DocumentContent,
+        DocumentChunk, ExtractionCacheEntry, ProjectStorageUsage,
+        UploadBatch, UploadBatchFile, DocumentTokens, ReextractionJob, Technology,
+        DocumentAnalysis
     )
     Base.metadata.create_all(bind=engine)
     
     # Run migrations for new columns
     run_migrations()
+    migrate_document_text()
+    
+    # Full-text index over document_chunks (FTS5 / tsvector)
+    from services.search import init_search_index
+    init_search_index()
 
 
 def run_migrations():
@@ -55,6 +63,34 @@ def run_migrations():
         # Add eta and duration_days to breakdown_categories
         ("breakdown_categories", "eta", "ALTER TABLE breakdown_categories ADD COLUMN eta TIMESTAMP NULL"),
         ("breakdown_categories", "duration_days", "ALTER TABLE breakdown_categories ADD COLUMN duration_days INTEGER NULL"),
+        # Add breakdown_version to test_strategies (schedule cache key)
+        ("test_strategies", "breakdown_version", "ALTER TABLE test_strategies ADD COLUMN breakdown_version INTEGER NOT NULL DEFAULT 0"),
+        # Add completed_at to breakdown_items (completion forecast history)
+        ("breakdown_items", "completed_at", "ALTER TABLE breakdown_items ADD COLUMN completed_at TIMESTAMP NULL"),
+        # Add file_size and content_hash to documents (streaming uploads)
+        ("documents", "file_size", "ALTER TABLE documents ADD COLUMN file_size INTEGER NULL"),
+        ("documents", "content_hash", "ALTER TABLE documents ADD COLUMN content_hash VARCHAR(64) NULL"),
+        # Add extraction status to documents (background extraction)
+        ("documents", "extraction_status", "ALTER TABLE documents ADD COLUMN extraction_status VARCHAR(20) NULL"),
+        ("documents", "extraction_error", "ALTER TABLE documents ADD COLUMN extraction_error TEXT NULL"),
+        # Add preview and counts to documents (text moved to document_contents)
+        ("documents", "content_preview", "ALTER TABLE documents ADD COLUMN content_preview VARCHAR(300) NULL"),
+        ("documents", "content_bytes", "ALTER TABLE documents ADD COLUMN content_bytes INTEGER NULL"),
+        ("documents", "content_words", "ALTER TABLE documents ADD COLUMN content_words INTEGER NULL"),
+        # Add byte offsets to document_pages (page range reads)
+        ("document_pages", "byte_offset", "ALTER TABLE document_pages ADD COLUMN byte_offset INTEGER NULL"),
+        ("document_pages", "byte_length", "ALTER TABLE document_pages ADD COLUMN byte_length INTEGER NULL"),
+        # Add chunk_layout to extraction_cache (search chunks with heading/page/table)
+        ("extraction_cache", "chunk_layout", "ALTER TABLE extraction_cache ADD COLUMN chunk_layout TEXT NULL"),
+        # Add parser name/version to documents (bulk re-extraction)
+        ("documents", "parser_name", "ALTER TABLE documents ADD COLUMN parser_name VARCHAR(50) NULL"),
+        ("documents", "parser_version", "ALTER TABLE documents ADD COLUMN parser_version INTEGER NULL"),
+        # Add text hash to documents (memoized strategy analysis)
+        ("documents", "text_hash", "ALTER TABLE documents ADD COLUMN text_hash VARCHAR(64) NULL"),
+        # Add owner to reextraction_jobs (resume after restart)
+        ("reextraction_jobs", "owner", "ALTER TABLE reextraction_jobs ADD COLUMN owner VARCHAR(200) NULL"),
+        # Add search_indexed to documents (search backfill skips texts without chunks)
+        ("documents", "search_indexed", "ALTER TABLE documents ADD COLUMN search_indexed BOOLEAN NULL"),
     ]
     
     with engine.connect() as conn:
@@ -73,3 +109,29 @@ def run_migrations():
                     print(f"Column {column} added successfully!")
             except Exception as e:
                 print(f"Migration for {table}.{column} skipped or failed: {e}")
+
+
+def migrate_document_text():
+    """Move text stored inline in documents.content_text into compressed document_contents rows"""
+    from sqlalchemy import inspect, text
+    from models import Document
+    from services.document_text import set_document_text
+    
+    if "content_text" not in {column["name"] for column in inspect(engine).get_columns("documents")}:
+        return
+    
+    db = SessionLocal()
+    try:
+        while True:
+            rows = db.execute(text(
+                "SELECT id, content_text FROM documents WHERE content_text IS NOT NULL LIMIT 100"
+            )).fetchall()
+            if not rows:
+                break
+            for document_id, content_text in rows:
+                set_document_text(db.get(Document, document_id), content_text)
+                db.execute(text("UPDATE documents SET content_text = NULL WHERE id = :id"), {"id": document_id})
+            db.commit()
+            print(f"Moved text of {len(rows)} documents to document_contents")
+    finally:
+        db.close()
@@ -1,13 +1,32 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import asyncio
 import os
 
 from database import init_db
+from services.document_analysis import shutdown_analysis_pool
+from services.extraction import resume_pending_extractions, shutdown_extraction_pool
+from services.extraction_cache import purge_stale_entries
+from services.search import start_search_backfill
+from services.document_tokens import start_token_backfill
+from services.google_docs import close_google_docs_client
+from services.reextraction import resume_reextraction_jobs
+from services.tech_dictionary import seed_technologies
+from services.storage_gc import run_storage_sweep, STORAGE_SWEEP_INTERVAL_HOURS
 from routers import projects, documents, strategies, test_plans, comments
-from routers import participants, breakdown, progress
-from routers import auth, shares
+from routers import participants, breakdown, progress, schedule, search
+from routers import auth, shares, admin
+
+
+async def _storage_sweeper():
+    """Sweep orphaned uploads every STORAGE_SWEEP_INTERVAL_HOURS, off the event loop"""
+    while True:
+        await asyncio.sleep(STORAGE_SWEEP_INTERVAL_HOURS * 3600)
+        try:
+            await asyncio.to_thread(run_storage_sweep)
+        except Exception as e:
+            print(f"Storage sweep failed: {e}")
 
 
 @asynccontextmanager
@@ -16,7 +35,26 @@ async def lifespan(app: FastAPI):
     os.makedirs("uploads", exist_ok=True)
     # Initialize database
     init_db()
+    # Drop cached extractions from superseded parser versions
+    purge_stale_entries()
+    # Bundled technology dictionary on first start
+    seed_technologies()
+    # Pick up extractions interrupted by a restart
+    resume_pending_extractions()
+    # Continue bulk re-extraction jobs from their checkpoints
+    resume_reextraction_jobs()
+    # Index documents stored before search existed, without delaying startup
+    start_search_backfill()
+    # Tokenize documents stored before (or by an older) normalizer, without delaying startup
+    start_token_backfill()
+    # Periodically quarantine/delete orphaned uploads
+    sweeper = asyncio.create_task(_storage_sweeper()) if STORAGE_SWEEP_INTERVAL_HOURS > 0 else None
     yield
+    if sweeper:
+        sweeper.cancel()
+    await close_google_docs_client()
+    shutdown_extraction_pool()
+    shutdown_analysis_pool()
 
 
 app = FastAPI(
@@ -36,9 +74,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Serve uploaded files
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
-
 # Include routers
 app.include_router(projects.router, prefix="/api/projects", tags=["Projects"])
 app.include_router(documents.router, prefix="/api/documents", tags=["Documents"])
@@ -50,10 +85,13 @@ app.include_router(comments.router, prefix="/api/comments", tags=["Comments"])
 app.include_router(participants.router, prefix="/api", tags=["Participants"])
 app.include_router(breakdown.router, prefix="/api", tags=["Breakdown"])
 app.include_router(progress.router, prefix="/api", tags=["Progress"])
+app.include_router(schedule.router, prefix="/api", tags=["Schedule"])
+app.include_router(search.router, prefix="/api", tags=["Search"])
 
 # Authentication & Sharing
 app.include_router(auth.router)
 app.include_router(shares.router)
+app.include_router(admin.router)
 
 
 @app.get("/")
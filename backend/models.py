@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Enum
+from sqlalchemy import (
+    Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Enum, LargeBinary, UniqueConstraint
+)
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -63,12 +65,199 @@ class Document(Base):
     doc_type = Column(String(20), nullable=False)  # hld, prd, other, note
     file_path = Column(String(500))
     file_type = Column(String(20))  # pdf, docx, md, text
-    content_text = Column(Text)  # Extracted text or free text content
+    file_size = Column(Integer, nullable=True)  # Bytes, for uploaded files
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the uploaded file
+    # Extracted text or free text lives compressed in DocumentContent; listings use these
+    content_preview = Column(String(300), nullable=True)
+    content_bytes = Column(Integer, nullable=True)  # UTF-8 size of the full text
+    content_words = Column(Integer, nullable=True)
+    text_hash = Column(String(64), nullable=True)  # SHA-256 of the full text (analysis cache key)
+    extraction_status = Column(String(20), nullable=True)  # pending, done, failed (uploaded files only)
+    extraction_error = Column(Text, nullable=True)
+    parser_name = Column(String(50), nullable=True)  # Parser (and version) that produced the text
+    parser_version = Column(Integer, nullable=True)
+    search_indexed = Column(Boolean, nullable=True)  # Chunked for search (texts may yield no chunks)
     notes = Column(Text)  # Additional notes/prompt for the document
     uploaded_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
     project = relationship("Project", back_populates="documents")
+    pages = relationship("DocumentPage", back_populates="document", cascade="all, delete-orphan",
+                         order_by="DocumentPage.page_number")
+    content = relationship("DocumentContent", uselist=False, cascade="all, delete-orphan")
+    chunks = relationship("DocumentChunk", cascade="all, delete-orphan")
+    tokens = relationship("DocumentTokens", uselist=False, cascade="all, delete-orphan")
+
+
+class DocumentContent(Base):
+    """Full document text as concatenated, independently zlib-compressed frames"""
+    __tablename__ = "document_contents"
+
+    document_id = Column(Integer, ForeignKey("documents.id"), primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    frame_sizes = Column(Text, nullable=False)  # JSON list of compressed frame lengths
+
+
+class DocumentTokens(Base):
+    """Normalized token stream of a document's text, built once at ingest"""
+    __tablename__ = "document_tokens"
+
+    document_id = Column(Integer, ForeignKey("documents.id"), primary_key=True)
+    normalizer_version = Column(Integer, nullable=False)
+    token_count = Column(Integer, nullable=False)
+    vocabulary = Column(LargeBinary, nullable=False)  # zlib of newline-joined terms; a term's id is its line
+    token_ids = Column(LargeBinary, nullable=False)  # zlib of uint32 vocabulary ids, in text order
+    sentence_ends = Column(LargeBinary, nullable=False)  # zlib of uint32 token indexes ending each sentence
+    headings = Column(Text, nullable=False)  # JSON [[token_index, heading], ...]
+
+
+class DocumentChunk(Base):
+    """Search unit of a document's text; indexed by FTS5 (SQLite) or tsvector (PostgreSQL)"""
+    __tablename__ = "document_chunks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+    chunk_index = Column(Integer, nullable=False)
+    char_offset = Column(Integer, nullable=False)  # Position in the document text
+    page = Column(Integer, nullable=True)
+    heading = Column(String(300), nullable=True)
+    table_name = Column(String(200), nullable=True)
+    body = Column(Text, nullable=False)
+    terms = Column(Text, nullable=False, default="")  # Normalized Hebrew forms not present verbatim in body
+
+
+class DocumentPage(Base):
+    """Location of one PDF page's text inside the document's full text"""
+    __tablename__ = "document_pages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
+    page_number = Column(Integer, nullable=False)  # 1-based
+    char_offset = Column(Integer, nullable=False)
+    char_length = Column(Integer, nullable=False)  # 0 for empty or failed pages
+    byte_offset = Column(Integer, nullable=True)  # Same span in UTF-8 bytes, for range reads
+    byte_length = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)  # Set when this page could not be extracted
+
+    # Relationships
+    document = relationship("Document", back_populates="pages")
+
+
+class StoredFile(Base):
+    """Content-addressed upload blob, shared by every Document with the same SHA-256"""
+    __tablename__ = "stored_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, nullable=False, index=True)
+    file_path = Column(String(500), nullable=False)
+    file_size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, default=0, nullable=False)  # Documents pointing at this blob
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class UploadBatch(Base):
+    """A multi-file upload; its files are extracted concurrently"""
+    __tablename__ = "upload_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    files = relationship("UploadBatchFile", back_populates="batch", cascade="all, delete-orphan",
+                         order_by="UploadBatchFile.position")
+
+
+class UploadBatchFile(Base):
+    """One file of an upload batch: the document it became, or why it was rejected"""
+    __tablename__ = "upload_batch_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    batch_id = Column(Integer, ForeignKey("upload_batches.id"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)  # Order within the request
+    filename = Column(String(500))
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="SET NULL"), nullable=True)
+    error = Column(Text)  # Set when the file was rejected
+
+    batch = relationship("UploadBatch", back_populates="files")
+    document = relationship("Document")
+
+
+class ReextractionJob(Base):
+    """Bulk re-extraction of stored documents matching a filter, resumable from its checkpoint"""
+    __tablename__ = "reextraction_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(20), default="queued")  # queued, running, paused, done, cancelled, failed
+    filters = Column(Text, nullable=False)  # JSON: file_types, project_id, outdated_parser, empty_content
+    last_document_id = Column(Integer, default=0, nullable=False)  # Every matching id up to here is processed
+    total = Column(Integer, default=0, nullable=False)
+    processed = Column(Integer, default=0, nullable=False)
+    succeeded = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # Last checkpoint write by the process running it
+    owner = Column(String(200), nullable=True)  # "host:pid:token" of the process running it
+
+
+class DocumentAnalysis(Base):
+    """Strategy-generation analysis of a document text, shared by every document with that text"""
+    __tablename__ = "document_analyses"
+    __table_args__ = (
+        UniqueConstraint("text_hash", "analyzer_version", name="uq_document_analysis_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    text_hash = Column(String(64), nullable=False, index=True)
+    analyzer_version = Column(Integer, nullable=False)
+    scan = Column(Text, nullable=False)  # JSON of the text scan (list items, requirements, keywords)
+    technologies = Column(Text, nullable=False)  # JSON list of technology names
+    dictionary_key = Column(String(64), nullable=False)  # Technology dictionary the names came from
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Technology(Base):
+    """Technology dictionary entry recognised in documents during strategy generation"""
+    __tablename__ = "technologies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False)  # Display name, also matched
+    category = Column(String(50), nullable=True)  # e.g. language, database, cloud
+    aliases = Column(Text, nullable=False, default="[]")  # JSON list of other spellings
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ProjectStorageUsage(Base):
+    """Per-project storage totals, refreshed by the storage sweeper"""
+    __tablename__ = "project_storage_usage"
+
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+    file_count = Column(Integer, nullable=False, default=0)
+    file_bytes = Column(Integer, nullable=False, default=0)  # Uploaded files (shared blobs count per document)
+    text_bytes = Column(Integer, nullable=False, default=0)  # Extracted/stored document text
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ExtractionCacheEntry(Base):
+    """zlib-compressed extraction result for one file hash and parser version"""
+    __tablename__ = "extraction_cache"
+    __table_args__ = (
+        UniqueConstraint("sha256", "parser_name", "parser_version", name="uq_extraction_cache_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    parser_name = Column(String(20), nullable=False)  # Registered parser name (services.parsers)
+    parser_version = Column(Integer, nullable=False)
+    content_zlib = Column(LargeBinary, nullable=False)
+    page_layout = Column(Text, nullable=True)  # JSON [[page_number, offset, length, error], ...] for PDFs
+    chunk_layout = Column(Text, nullable=True)  # JSON [[offset, length, heading, page, table], ...]
+    created_at = Column(DateTime, default=datetime.utcnow)
 
 
 class TestStrategy(Base):
@@ -97,6 +286,7 @@ class TestStrategy(Base):
     deliverables = Column(Text)
     
     created_by = Column(String(100))
+    breakdown_version = Column(Integer, default=0, nullable=False)  # Bumped on every breakdown change (cache key)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -210,6 +400,7 @@ class BreakdownItem(Base):
     priority = Column(String(10), default="medium")  # low, medium, high
     eta = Column(DateTime, nullable=True)  # Estimated completion date
     duration_days = Column(Integer, nullable=True)  # Estimated duration in days
+    completed_at = Column(DateTime, nullable=True)  # Set when status becomes completed (forecast history)
     order_index = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
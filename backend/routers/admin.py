@@ -0,0 +1,323 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, status, Header
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from database import get_db
+from models import User, Project, ProjectStorageUsage, StoredFile, ReextractionJob, Technology
+from schemas import (
+    StorageReport, StorageSweepStats, ProjectStorageUsageResponse,
+    ReextractionRequest, ReextractionJobResponse,
+    TechnologyCreate, TechnologyUpdate, TechnologyResponse, TechnologyImportResult
+)
+from routers.shares import get_authenticated_user
+from services import reextraction, storage_gc
+from services.tech_dictionary import import_technologies
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+
+def get_admin_user(authorization: str, db: Session) -> User:
+    """Helper to get an authenticated admin user from header"""
+    user = get_authenticated_user(authorization, db)
+    if not user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return user
+
+
+# ============== Storage ==============
+
+@router.get("/storage", response_model=StorageReport)
+def get_storage_report(
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Per-project storage totals (as of the last sweep), blob and quarantine usage"""
+    get_admin_user(authorization, db)
+
+    rows = db.query(ProjectStorageUsage, Project.name, Project.is_active).outerjoin(
+        Project, Project.id == ProjectStorageUsage.project_id
+    ).order_by(ProjectStorageUsage.file_bytes.desc()).all()
+
+    projects = [
+        ProjectStorageUsageResponse(
+            project_id=usage.project_id,
+            project_name=name,
+            is_active=is_active is not False,
+            file_count=usage.file_count,
+            file_bytes=usage.file_bytes,
+            text_bytes=usage.text_bytes,
+            updated_at=usage.updated_at
+        )
+        for usage, name, is_active in rows
+    ]
+    blob_count, blob_bytes = db.query(
+        func.count(StoredFile.id), func.coalesce(func.sum(StoredFile.file_size), 0)
+    ).one()
+    quarantine = storage_gc.quarantine_usage()
+
+    return StorageReport(
+        projects=projects,
+        blob_count=blob_count,
+        blob_bytes=blob_bytes,
+        reclaimable_bytes=sum(p.file_bytes for p in projects if not p.is_active),
+        quarantine_files=quarantine["files"],
+        quarantine_bytes=quarantine["bytes"],
+        last_sweep=storage_gc.last_sweep
+    )
+
+
+@router.post("/storage/sweep", response_model=StorageSweepStats)
+def sweep_storage(
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Run an orphaned-upload sweep now (also refreshes the per-project totals)"""
+    get_admin_user(authorization, db)
+
+    stats = storage_gc.run_storage_sweep()
+    if stats is None:
+        raise HTTPException(status_code=409, detail="A storage sweep is already running")
+    return stats
+
+
+# ============== Re-extraction ==============
+
+def _job_response(job: ReextractionJob) -> ReextractionJobResponse:
+    return ReextractionJobResponse(
+        id=job.id,
+        status=job.status,
+        filters=json.loads(job.filters),
+        total=job.total,
+        processed=job.processed,
+        succeeded=job.succeeded,
+        failed=job.failed,
+        progress=round(100 * job.processed / job.total, 1) if job.total else 100.0,
+        last_document_id=job.last_document_id,
+        last_error=job.last_error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        heartbeat_at=job.heartbeat_at
+    )
+
+
+def _get_job(job_id: int, db: Session) -> ReextractionJob:
+    job = db.query(ReextractionJob).filter(ReextractionJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Re-extraction job not found")
+    return job
+
+
+@router.post("/reextraction", response_model=ReextractionJobResponse, status_code=201)
+def create_reextraction(
+    request: ReextractionRequest,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Start re-extracting every stored document matching the filters, in the background"""
+    get_admin_user(authorization, db)
+
+    job = reextraction.create_reextraction_job(db, request.model_dump())
+    reextraction.start_reextraction_job(job.id)
+    return _job_response(job)
+
+
+@router.get("/reextraction", response_model=List[ReextractionJobResponse])
+def list_reextractions(
+    limit: int = 20,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Most recent re-extraction jobs with their progress"""
+    get_admin_user(authorization, db)
+
+    jobs = db.query(ReextractionJob).order_by(ReextractionJob.id.desc()).limit(limit).all()
+    return [_job_response(job) for job in jobs]
+
+
+@router.get("/reextraction/{job_id}", response_model=ReextractionJobResponse)
+def get_reextraction(
+    job_id: int,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    get_admin_user(authorization, db)
+    return _job_response(_get_job(job_id, db))
+
+
+@router.post("/reextraction/{job_id}/pause", response_model=ReextractionJobResponse)
+def pause_reextraction(
+    job_id: int,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Stop a job at its next checkpoint; resume continues from there"""
+    get_admin_user(authorization, db)
+
+    job = _get_job(job_id, db)
+    if job.status not in (reextraction.JOB_QUEUED, reextraction.JOB_RUNNING):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    reextraction.set_reextraction_status(db, job, reextraction.JOB_PAUSED)
+    return _job_response(job)
+
+
+@router.post("/reextraction/{job_id}/resume", response_model=ReextractionJobResponse)
+def resume_reextraction(
+    job_id: int,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Continue a paused, failed or interrupted job from its checkpoint"""
+    get_admin_user(authorization, db)
+
+    job = _get_job(job_id, db)
+    if job.status in (reextraction.JOB_DONE, reextraction.JOB_CANCELLED):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    if job.status != reextraction.JOB_RUNNING:
+        reextraction.set_reextraction_status(db, job, reextraction.JOB_QUEUED)
+    reextraction.start_reextraction_job(job.id)
+    return _job_response(job)
+
+
+@router.post("/reextraction/{job_id}/cancel", response_model=ReextractionJobResponse)
+def cancel_reextraction(
+    job_id: int,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Stop a job for good; documents already re-extracted keep their new text"""
+    get_admin_user(authorization, db)
+
+    job = _get_job(job_id, db)
+    if job.status in (reextraction.JOB_DONE, reextraction.JOB_CANCELLED):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    reextraction.set_reextraction_status(db, job, reextraction.JOB_CANCELLED)
+    return _job_response(job)
+
+
+# ============== Technology dictionary ==============
+
+def _technology_response(technology: Technology) -> TechnologyResponse:
+    return TechnologyResponse(
+        id=technology.id,
+        name=technology.name,
+        category=technology.category,
+        aliases=json.loads(technology.aliases or "[]"),
+        is_active=technology.is_active is not False,
+        updated_at=technology.updated_at
+    )
+
+
+def _get_technology(technology_id: int, db: Session) -> Technology:
+    technology = db.query(Technology).filter(Technology.id == technology_id).first()
+    if not technology:
+        raise HTTPException(status_code=404, detail="Technology not found")
+    return technology
+
+
+def _check_name_free(name: str, db: Session, technology_id: Optional[int] = None):
+    query = db.query(Technology.id).filter(func.lower(Technology.name) == name.strip().lower())
+    if technology_id is not None:
+        query = query.filter(Technology.id != technology_id)
+    if query.first():
+        raise HTTPException(status_code=409, detail=f"Technology '{name}' already exists")
+
+
+def _clean_aliases(aliases: List[str]) -> str:
+    return json.dumps(sorted({alias.strip() for alias in aliases if alias.strip()}))
+
+
+@router.get("/technologies", response_model=List[TechnologyResponse])
+def list_technologies(
+    category: Optional[str] = None,
+    q: Optional[str] = None,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Technology dictionary used to detect the tech stack in documents"""
+    get_admin_user(authorization, db)
+
+    query = db.query(Technology)
+    if category:
+        query = query.filter(Technology.category == category)
+    if q:
+        query = query.filter(Technology.name.ilike(f"%{q}%"))
+    return [_technology_response(t) for t in query.order_by(Technology.name).all()]
+
+
+@router.post("/technologies", response_model=TechnologyResponse, status_code=201)
+def create_technology(
+    technology: TechnologyCreate,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    get_admin_user(authorization, db)
+    _check_name_free(technology.name, db)
+
+    db_technology = Technology(
+        name=technology.name.strip(),
+        category=technology.category,
+        aliases=_clean_aliases(technology.aliases)
+    )
+    db.add(db_technology)
+    db.commit()
+    db.refresh(db_technology)
+    return _technology_response(db_technology)
+
+
+@router.put("/technologies/{technology_id}", response_model=TechnologyResponse)
+def update_technology(
+    technology_id: int,
+    technology: TechnologyUpdate,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    get_admin_user(authorization, db)
+    db_technology = _get_technology(technology_id, db)
+
+    update_data = technology.model_dump(exclude_unset=True)
+    if "name" in update_data:
+        _check_name_free(update_data["name"], db, technology_id)
+        update_data["name"] = update_data["name"].strip()
+    if "aliases" in update_data:
+        update_data["aliases"] = _clean_aliases(update_data["aliases"] or [])
+    for field, value in update_data.items():
+        setattr(db_technology, field, value)
+    db.commit()
+    db.refresh(db_technology)
+    return _technology_response(db_technology)
+
+
+@router.delete("/technologies/{technology_id}", status_code=204)
+def delete_technology(
+    technology_id: int,
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    get_admin_user(authorization, db)
+    db.delete(_get_technology(technology_id, db))
+    db.commit()
+    return None
+
+
+@router.post("/technologies/import", response_model=TechnologyImportResult)
+def import_technology_dictionary(
+    technologies: List[TechnologyCreate],
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Add or update many entries at once (matched by name, case-insensitively)"""
+    get_admin_user(authorization, db)
+
+    created, updated = import_technologies(db, [t.model_dump() for t in technologies])
+    return TechnologyImportResult(
+        created=created,
+        updated=updated,
+        total=db.query(func.count(Technology.id)).scalar()
+    )
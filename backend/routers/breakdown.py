@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
+from datetime import datetime
 
 from database import get_db
 from models import BreakdownCategory, BreakdownItem, TestStrategy, Participant
@@ -8,10 +9,21 @@ from schemas import (
     BreakdownCategoryCreate, BreakdownCategoryUpdate, BreakdownCategoryResponse,
     BreakdownItemCreate, BreakdownItemUpdate, BreakdownItemResponse
 )
+from services.versioning import bump_breakdown_version, breakdown_etag, etag_matches, not_modified, set_etag
 
 router = APIRouter()
 
 
+def set_item_status(item, status):
+    """Set item status and keep completed_at in sync (used by completion forecasts)"""
+    if status == "completed":
+        if item.status != "completed" or item.completed_at is None:
+            item.completed_at = datetime.utcnow()
+    else:
+        item.completed_at = None
+    item.status = status
+
+
 # ============== Category Endpoints ==============
 
 def build_item_response(item, all_items):
@@ -86,14 +98,20 @@ def build_category_response(cat, all_categories):
 @router.get("/strategies/{strategy_id}/breakdowns", response_model=List[BreakdownCategoryResponse])
 def get_strategy_breakdowns(
     strategy_id: int,
+    response: Response,
     type: Optional[str] = None,
     flat: bool = False,  # If true, return flat list instead of tree
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """Get all breakdown categories with their items for a strategy (nested tree structure)"""
-    strategy = db.query(TestStrategy).filter(TestStrategy.id == strategy_id).first()
-    if not strategy:
+    # Version lookup doubles as the existence check; skip the tree load when unchanged
+    etag = breakdown_etag(db, strategy_id)
+    if etag is None:
         raise HTTPException(status_code=404, detail="Strategy not found")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     
     query = db.query(BreakdownCategory).options(
         joinedload(BreakdownCategory.items).joinedload(BreakdownItem.assignee)
@@ -158,6 +176,7 @@ def create_breakdown_category(
         duration_days=category.duration_days
     )
     db.add(db_category)
+    bump_breakdown_version(db, strategy_id=strategy_id)
     db.commit()
     db.refresh(db_category)
     
@@ -193,6 +212,7 @@ def update_breakdown_category(
     for key, value in update_dict.items():
         setattr(category, key, value)
     
+    bump_breakdown_version(db, strategy_id=category.strategy_id)
     db.commit()
     db.refresh(category)
     
@@ -220,6 +240,7 @@ def delete_breakdown_category(category_id: int, db: Session = Depends(get_db)):
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
+    bump_breakdown_version(db, strategy_id=category.strategy_id)
     db.delete(category)
     db.commit()
     return None
@@ -272,9 +293,11 @@ def create_breakdown_item(
         priority=item.priority,
         order_index=item.order_index if item.order_index else max_order,
         eta=item.eta,
-        duration_days=item.duration_days
+        duration_days=item.duration_days,
+        completed_at=datetime.utcnow() if item.status == "completed" else None
     )
     db.add(db_item)
+    bump_breakdown_version(db, strategy_id=category.strategy_id)
     db.commit()
     db.refresh(db_item)
     
@@ -337,8 +360,12 @@ def update_breakdown_item(
             raise HTTPException(status_code=400, detail="Assignee not found")
     
     for key, value in update_dict.items():
-        setattr(item, key, value)
+        if key == "status":
+            set_item_status(item, value)
+        else:
+            setattr(item, key, value)
     
+    bump_breakdown_version(db, strategy_id=item.category.strategy_id)
     db.commit()
     db.refresh(item)
     
@@ -379,7 +406,8 @@ def update_item_status(
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    item.status = status
+    set_item_status(item, status)
+    bump_breakdown_version(db, strategy_id=item.category.strategy_id)
     db.commit()
     db.refresh(item)
     
@@ -408,6 +436,7 @@ def delete_breakdown_item(item_id: int, db: Session = Depends(get_db)):
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     
+    bump_breakdown_version(db, strategy_id=item.category.strategy_id)
     db.delete(item)
     db.commit()
     return None
@@ -1,60 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, Response, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
+import asyncio
 import os
-import uuid
-import re
-import aiofiles
-import requests
 
 from database import get_db
-from models import Document, Project
-from schemas import DocumentResponse, NoteCreate
-from services.file_parser import extract_text_from_file
+from models import Document, DocumentPage, Project, UploadBatch, UploadBatchFile
+from schemas import (
+    DocumentResponse, NoteCreate, ExtractionStatusResponse, DocumentPageResponse, DocumentPageText,
+    UploadBatchResponse, UploadBatchFileStatus
+)
+from services.extraction import (
+    submit_extraction, pending_extraction_jobs, EXTRACTION_PENDING, EXTRACTION_DONE, EXTRACTION_FAILED
+)
+from services.document_text import (
+    set_document_text, copy_document_text, get_document_text, open_document_bytes, read_document_bytes
+)
+from services.parsers import supported_extensions
+from routers.shares import get_authenticated_user, user_can_access_project
+from services.search import index_document, copy_document_chunks
+from services.google_docs import extract_google_doc_content, is_google_doc_url, refresh_linked_documents
+from services.http_range import parse_byte_range, content_range, RangeNotSatisfiable, RangedFileResponse
+from services.storage import (
+    UPLOAD_DIR, TEMP_DIR, save_upload_stream, store_blob, release_blob, remove_unreferenced_file,
+    UploadTooLargeError
+)
 
 router = APIRouter()
 
-UPLOAD_DIR = "uploads"
+# Stored files are content-addressed, so a given ETag never changes
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
 
-
-def extract_google_doc_content(url: str) -> str:
-    """
-    Extract text content from a Google Docs URL.
-    Works for publicly shared documents (Anyone with the link can view).
-    """
-    # Extract document ID from various Google Docs URL formats
-    patterns = [
-        r'docs\.google\.com/document/d/([a-zA-Z0-9_-]+)',
-        r'drive\.google\.com/file/d/([a-zA-Z0-9_-]+)',
-        r'drive\.google\.com/open\?id=([a-zA-Z0-9_-]+)',
-    ]
-    
-    doc_id = None
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            doc_id = match.group(1)
-            break
-    
-    if not doc_id:
-        return f"Could not extract document ID from URL: {url}"
-    
-    # Try to export as plain text
-    export_url = f"https://docs.google.com/document/d/{doc_id}/export?format=txt"
-    
-    try:
-        response = requests.get(export_url, timeout=30)
-        if response.status_code == 200:
-            content = response.text
-            # Clean up the content
-            if content and len(content) > 50:
-                return content
-            else:
-                return f"Document appears to be empty or inaccessible. URL: {url}"
-        else:
-            return f"Could not fetch document (status {response.status_code}). Make sure it's shared with 'Anyone with the link'. URL: {url}"
-    except Exception as e:
-        return f"Error fetching document: {str(e)}. URL: {url}"
+# Files accepted by one /upload-batch request
+MAX_BATCH_FILES = 100
 
 
 def extract_confluence_content(url: str) -> str:
@@ -91,61 +70,415 @@ def get_document(document_id: int, db: Session = Depends(get_db)):
     return DocumentResponse.model_validate(document)
 
 
-@router.post("/upload", response_model=DocumentResponse, status_code=201)
-async def upload_document(
-    project_id: int = Form(...),
-    name: str = Form(...),
-    doc_type: str = Form(...),  # hld, prd, other
-    file: UploadFile = File(...)
+@router.get("/{document_id}/extraction", response_model=ExtractionStatusResponse)
+def get_extraction_status(document_id: int, db: Session = Depends(get_db)):
+    """Report background text extraction status for an uploaded document"""
+    row = db.query(
+        Document.id,
+        Document.extraction_status,
+        Document.extraction_error,
+        Document.content_bytes.isnot(None)
+    ).filter(Document.id == document_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    return ExtractionStatusResponse(
+        document_id=row[0],
+        extraction_status=row[1],
+        extraction_error=row[2],
+        has_content=bool(row[3]),
+        queued_jobs=pending_extraction_jobs()
+    )
+
+
+@router.get("/{document_id}/pages", response_model=List[DocumentPageResponse])
+def get_document_pages(document_id: int, db: Session = Depends(get_db)):
+    """Get the page layout of an extracted PDF (empty for other document types)"""
+    if not db.query(Document.id).filter(Document.id == document_id).first():
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    return db.query(DocumentPage).filter(
+        DocumentPage.document_id == document_id
+    ).order_by(DocumentPage.page_number).all()
+
+
+@router.get("/{document_id}/pages/{page_number}", response_model=DocumentPageText)
+def get_document_page(document_id: int, page_number: int, db: Session = Depends(get_db)):
+    """Get the text of a single PDF page without loading the whole document"""
+    page = db.query(DocumentPage).filter(
+        DocumentPage.document_id == document_id,
+        DocumentPage.page_number == page_number
+    ).first()
+    if not page:
+        raise HTTPException(status_code=404, detail="Page not found")
+    
+    text = ""
+    if page.byte_length:
+        # Inflates only the compressed frames that hold this page
+        text = read_document_bytes(
+            db, document_id, page.byte_offset, page.byte_offset + page.byte_length
+        ).decode("utf-8")
+    elif page.char_length and page.byte_offset is None:
+        # Layout stored before byte offsets existed
+        full_text = get_document_text(db, document_id) or ""
+        text = full_text[page.char_offset:page.char_offset + page.char_length]
+    
+    return DocumentPageText(
+        page_number=page.page_number,
+        char_offset=page.char_offset,
+        char_length=page.char_length,
+        byte_offset=page.byte_offset,
+        byte_length=page.byte_length,
+        error=page.error,
+        text=text
+    )
+
+
+@router.get("/{document_id}/content")
+def get_document_content(
+    document_id: int,
+    range: Optional[str] = Header(None),
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
 ):
-    db = next(get_db())
+    """
+    Stream a document's full text (UTF-8). Requires access to its project.
+    Supports a single "Range: bytes=..." request, e.g. for paging through
+    large documents.
+    """
+    user = get_authenticated_user(authorization, db)
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document or not document.project or not document.project.is_active:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if not user_can_access_project(user, document.project_id, db):
+        raise HTTPException(status_code=403, detail="You do not have access to this project")
+    total = document.content_bytes or 0
     
-    # Verify project exists
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    headers = {"Accept-Ranges": "bytes"}
+    try:
+        span = parse_byte_range(range, total)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{total}"})
     
-    # Validate file type
-    allowed_extensions = [".pdf", ".docx", ".doc", ".md", ".txt"]
-    file_ext = os.path.splitext(file.filename)[1].lower()
+    start, end = span or (0, total)
+    headers["Content-Length"] = str(end - start)
+    if span:
+        headers["Content-Range"] = content_range(start, end, total)
+    
+    return StreamingResponse(
+        open_document_bytes(db, document_id, start, end),
+        status_code=206 if span else 200,
+        media_type="text/plain; charset=utf-8",
+        headers=headers
+    )
+
+
+@router.api_route("/{document_id}/file", methods=["GET", "HEAD"])
+def download_document_file(
+    document_id: int,
+    range: Optional[str] = Header(None),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    authorization: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Download a document's original file. Requires access to its project.
+    Supports a single "Range: bytes=..." request and conditional requests
+    against the ETag (the file's SHA-256).
+    """
+    user = get_authenticated_user(authorization, db)
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document or not document.project or not document.project.is_active:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if not user_can_access_project(user, document.project_id, db):
+        raise HTTPException(status_code=403, detail="You do not have access to this project")
+
+    # Notes, links and pasted content have no stored file
+    file_path = document.file_path
+    if not file_path or not os.path.abspath(file_path).startswith(os.path.abspath(UPLOAD_DIR) + os.sep):
+        raise HTTPException(status_code=404, detail="Document has no file")
+    try:
+        stat_result = os.stat(file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    if document.content_hash:
+        etag = f'"{document.content_hash}"'
+        headers = {"Accept-Ranges": "bytes", "ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    else:
+        # Files stored before hashing; fall back to FileResponse's mtime/size ETag
+        etag = None
+        headers = {"Accept-Ranges": "bytes", "Cache-Control": "private, no-cache"}
+
+    if etag and if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    total = stat_result.st_size
+    try:
+        # A stale If-Range means the client's partial copy is outdated: send it all
+        span = parse_byte_range(range, total) if not if_range or if_range.strip() == etag else None
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{total}"})
+
+    start, end = span or (0, total)
+    if span:
+        headers["Content-Range"] = content_range(start, end, total)
+
+    return RangedFileResponse(
+        file_path,
+        start,
+        end,
+        stat_result,
+        status_code=206 if span else 200,
+        headers=headers,
+        filename=f"{document.name}.{document.file_type}",
+        content_disposition_type="inline"
+    )
+
+
+def _validate_extension(filename: Optional[str]) -> str:
+    """Lower-case extension of an upload, or 400 if no parser handles it"""
+    allowed_extensions = supported_extensions()
+    file_ext = os.path.splitext(filename or "")[1].lower()
     if file_ext not in allowed_extensions:
         raise HTTPException(
             status_code=400, 
             detail=f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}"
         )
+    return file_ext
+
+
+def _add_uploaded_document(
+    db: Session,
+    project_id: int,
+    name: str,
+    doc_type: str,
+    file_ext: str,
+    temp_path: str,
+    file_size: int,
+    content_hash: str,
+    queued: Optional[Set[str]] = None
+) -> Tuple[Document, bool]:
+    """
+    Move a streamed upload into content-addressed storage and add its Document
+    (uncommitted). Text already extracted from the same bytes is copied over.
     
-    # Create project upload directory
-    project_dir = os.path.join(UPLOAD_DIR, str(project_id))
-    os.makedirs(project_dir, exist_ok=True)
-    
-    # Generate unique filename
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = os.path.join(project_dir, unique_filename)
+    queued holds the content hashes of documents added earlier in the same
+    transaction that will be extracted (they aren't visible to queries yet);
+    this document's hash is added to it when it needs extraction.
     
-    # Save file
-    async with aiofiles.open(file_path, 'wb') as f:
-        content = await file.read()
-        await f.write(content)
+    Returns (document, needs_extraction); extraction is not needed when the
+    text was copied or another pending document's job will fill it in.
+    """
+    stored = store_blob(db, temp_path, file_size, content_hash, file_ext)
     
-    # Extract text content
-    content_text = extract_text_from_file(file_path, file_ext)
+    # Reuse text already extracted from the same bytes
+    extracted = db.query(Document.id).filter(
+        Document.content_hash == content_hash,
+        Document.extraction_status == EXTRACTION_DONE
+    ).first()
+    in_flight = extracted is None and (
+        content_hash in (queued or ())
+        or db.query(Document.id).filter(
+            Document.content_hash == content_hash,
+            Document.extraction_status == EXTRACTION_PENDING
+        ).first() is not None
+    )
     
-    # Save to database
+    # Text is extracted in the background
     db_document = Document(
         project_id=project_id,
         name=name,
         doc_type=doc_type,
-        file_path=file_path,
+        file_path=stored.file_path,
         file_type=file_ext[1:],  # Remove the dot
-        content_text=content_text
+        file_size=file_size,
+        content_hash=content_hash,
+        extraction_status=EXTRACTION_DONE if extracted else EXTRACTION_PENDING
     )
+    if extracted:
+        copy_document_text(db, extracted.id, db_document)
+        copy_document_chunks(db, extracted.id, db_document)
+        db_document.pages = [
+            DocumentPage(
+                page_number=page.page_number,
+                char_offset=page.char_offset,
+                char_length=page.char_length,
+                byte_offset=page.byte_offset,
+                byte_length=page.byte_length,
+                error=page.error
+            )
+            for page in db.query(DocumentPage).filter(
+                DocumentPage.document_id == extracted.id
+            ).order_by(DocumentPage.page_number)
+        ]
     db.add(db_document)
+    needs_extraction = not extracted and not in_flight
+    if needs_extraction and queued is not None:
+        queued.add(content_hash)
+    return db_document, needs_extraction
+
+
+@router.post("/upload", response_model=DocumentResponse, status_code=201)
+async def upload_document(
+    project_id: int = Form(...),
+    name: str = Form(...),
+    doc_type: str = Form(...),  # hld, prd, other
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    # Verify project exists
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    # Validate file type
+    file_ext = _validate_extension(file.filename)
+    
+    # Stream file to a temp path (bounded memory, size-limited), then into
+    # content-addressed storage shared by identical uploads
+    try:
+        temp_path, file_size, content_hash = await save_upload_stream(file, TEMP_DIR, file_ext)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    db_document, needs_extraction = _add_uploaded_document(
+        db, project_id, name, doc_type, file_ext, temp_path, file_size, content_hash
+    )
     db.commit()
     db.refresh(db_document)
     
+    if needs_extraction:
+        # A cache hit is decompressed and indexed right away; keep that off the event loop
+        queued = await asyncio.to_thread(
+            submit_extraction, db_document.id, db_document.file_path, file_ext, content_hash
+        )
+        if queued is None:
+            db.refresh(db_document)  # Served from the extraction cache (or failed to queue)
+    
     return DocumentResponse.model_validate(db_document)
 
 
+@router.post("/upload-batch", response_model=UploadBatchResponse, status_code=201)
+async def upload_document_batch(
+    project_id: int = Form(...),
+    doc_types: List[str] = Form(...),  # One per file (hld, prd, other), or one for all
+    files: List[UploadFile] = File(...),
+    names: Optional[List[str]] = Form(None),  # Defaults to the file names
+    db: Session = Depends(get_db)
+):
+    """
+    Upload many files at once. Every file is streamed to storage, then
+    extraction is queued for all of them together on the worker pool. Files
+    that are rejected (type, size) are reported per file without failing the
+    batch; poll GET /upload-batch/{id} for progress.
+    """
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_FILES} files per batch")
+    if len(doc_types) not in (1, len(files)):
+        raise HTTPException(status_code=400, detail="Provide one doc_type per file, or a single doc_type for all")
+    if names and len(names) != len(files):
+        raise HTTPException(status_code=400, detail="Provide one name per file")
+    doc_types = doc_types * len(files) if len(doc_types) == 1 else doc_types
+    
+    async def stream(file: UploadFile) -> Tuple[str, int, str, str]:
+        file_ext = _validate_extension(file.filename)
+        return (file_ext,) + await save_upload_stream(file, TEMP_DIR, file_ext)
+    
+    # Files are spooled by the multipart parser already; copy them into storage concurrently
+    results = await asyncio.gather(*(stream(file) for file in files), return_exceptions=True)
+    
+    interrupted = next((r for r in results if isinstance(r, BaseException) and not isinstance(r, Exception)), None)
+    if interrupted is not None:
+        # Cancelled (client gone, shutdown): drop what the other files streamed
+        for result in results:
+            if isinstance(result, tuple) and os.path.exists(result[1]):
+                os.remove(result[1])
+        raise interrupted
+    
+    batch = UploadBatch(project_id=project_id)
+    db.add(batch)
+    to_extract = []
+    queued: Set[str] = set()  # Duplicates within the batch share one extraction job
+    for position, (file, doc_type, result) in enumerate(zip(files, doc_types, results)):
+        entry = UploadBatchFile(position=position, filename=file.filename)
+        batch.files.append(entry)
+        if isinstance(result, HTTPException):
+            entry.error = result.detail
+            continue
+        if isinstance(result, UploadTooLargeError):
+            entry.error = str(result)
+            continue
+        if isinstance(result, Exception):
+            # The stream itself failed (e.g. disk full); its partial file is already removed
+            entry.error = f"Upload failed: {result}"[:500]
+            continue
+        file_ext, temp_path, file_size, content_hash = result
+        name = names[position] if names else os.path.splitext(file.filename)[0]
+        entry.document, needs_extraction = _add_uploaded_document(
+            db, project_id, name, doc_type, file_ext, temp_path, file_size, content_hash, queued
+        )
+        if needs_extraction:
+            to_extract.append(entry.document)
+    db.commit()
+    
+    # Off the event loop: cache hits are decompressed and indexed right away
+    for document in to_extract:
+        await asyncio.to_thread(
+            submit_extraction, document.id, document.file_path, f".{document.file_type}", document.content_hash
+        )
+    
+    db.refresh(batch)
+    return _batch_response(db, batch)
+
+
+@router.get("/upload-batch/{batch_id}", response_model=UploadBatchResponse)
+def get_upload_batch(batch_id: int, db: Session = Depends(get_db)):
+    """Per-file upload and extraction progress for a batch"""
+    batch = db.query(UploadBatch).filter(UploadBatch.id == batch_id).first()
+    if not batch:
+        raise HTTPException(status_code=404, detail="Upload batch not found")
+    return _batch_response(db, batch)
+
+
+def _batch_response(db: Session, batch: UploadBatch) -> UploadBatchResponse:
+    document_ids = [entry.document_id for entry in batch.files if entry.document_id]
+    documents = {
+        row.id: row for row in db.query(
+            Document.id, Document.extraction_status, Document.extraction_error
+        ).filter(Document.id.in_(document_ids))
+    } if document_ids else {}
+    
+    files = []
+    for entry in batch.files:
+        document = documents.get(entry.document_id)
+        if entry.error:
+            files.append(UploadBatchFileStatus(filename=entry.filename, status="rejected", error=entry.error))
+        elif document is None:
+            files.append(UploadBatchFileStatus(filename=entry.filename, status="deleted"))
+        else:
+            files.append(UploadBatchFileStatus(
+                filename=entry.filename,
+                document_id=document.id,
+                status=document.extraction_status or EXTRACTION_DONE,
+                error=document.extraction_error
+            ))
+    
+    return UploadBatchResponse(
+        id=batch.id,
+        project_id=batch.project_id,
+        created_at=batch.created_at,
+        total=len(files),
+        pending=sum(1 for f in files if f.status == EXTRACTION_PENDING),
+        done=sum(1 for f in files if f.status == EXTRACTION_DONE),
+        failed=sum(1 for f in files if f.status in (EXTRACTION_FAILED, "rejected")),
+        files=files
+    )
+
+
 @router.post("/note", response_model=DocumentResponse, status_code=201)
 def create_note(note: NoteCreate, db: Session = Depends(get_db)):
     """Create a free-text note/prompt without file upload"""
@@ -159,9 +492,10 @@ def create_note(note: NoteCreate, db: Session = Depends(get_db)):
         name=note.name,
         doc_type="note",
         file_type="text",
-        content_text=note.content,
         notes=note.notes
     )
+    set_document_text(db_document, note.content)
+    index_document(db_document, note.content)
     db.add(db_document)
     db.commit()
     db.refresh(db_document)
@@ -170,7 +504,7 @@ def create_note(note: NoteCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/link", response_model=DocumentResponse, status_code=201)
-def create_link(data: dict, db: Session = Depends(get_db)):
+async def create_link(data: dict, db: Session = Depends(get_db)):
     """Create a link document (Google Docs, Confluence, etc.)"""
     project_id = data.get('project_id')
     name = data.get('name')
@@ -188,9 +522,9 @@ def create_link(data: dict, db: Session = Depends(get_db)):
     # Try to extract content from the URL
     content_text = ""
     
-    if 'docs.google.com' in url or 'drive.google.com' in url:
-        # Google Docs - try to fetch content
-        content_text = extract_google_doc_content(url)
+    if is_google_doc_url(url):
+        # Google Docs - try to fetch content (cached and revalidated)
+        content_text = await extract_google_doc_content(url)
     elif 'confluence' in url.lower() or 'atlassian.net/wiki' in url:
         # Confluence - placeholder for now
         content_text = extract_confluence_content(url)
@@ -204,8 +538,9 @@ def create_link(data: dict, db: Session = Depends(get_db)):
         doc_type=doc_type,
         file_type="link",
         file_path=url,  # Store URL in file_path
-        content_text=content_text
     )
+    set_document_text(db_document, content_text)
+    index_document(db_document, content_text)
     db.add(db_document)
     db.commit()
     db.refresh(db_document)
@@ -213,6 +548,23 @@ def create_link(data: dict, db: Session = Depends(get_db)):
     return DocumentResponse.model_validate(db_document)
 
 
+@router.post("/refresh-links", status_code=202)
+def refresh_links(
+    background_tasks: BackgroundTasks,
+    project_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Re-pull the content of Google Docs link documents in the background"""
+    query = db.query(Document.id, Document.file_path).filter(Document.file_type == "link")
+    if project_id:
+        query = query.filter(Document.project_id == project_id)
+    document_ids = [document_id for document_id, url in query.all() if url and is_google_doc_url(url)]
+    
+    if document_ids:
+        background_tasks.add_task(refresh_linked_documents, document_ids)
+    return {"queued": len(document_ids)}
+
+
 @router.post("/paste", response_model=DocumentResponse, status_code=201)
 def create_pasted_document(data: dict, db: Session = Depends(get_db)):
     """Create a document from pasted content (copy-paste from Google Docs, etc.)"""
@@ -233,9 +585,10 @@ def create_pasted_document(data: dict, db: Session = Depends(get_db)):
         project_id=project_id,
         name=name,
         doc_type=doc_type,
-        file_type="pasted",
-        content_text=content
+        file_type="pasted"
     )
+    set_document_text(db_document, content)
+    index_document(db_document, content)
     db.add(db_document)
     db.commit()
     db.refresh(db_document)
@@ -264,11 +617,17 @@ def delete_document(document_id: int, db: Session = Depends(get_db)):
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Delete file if exists
-    if document.file_path and os.path.exists(document.file_path):
-        os.remove(document.file_path)
+    # Uploaded files are shared by content hash; only the last reference removes the file
+    file_to_remove = None
+    if document.content_hash and document.file_path:
+        file_to_remove = release_blob(db, document.file_path)
+    elif document.file_path and os.path.exists(document.file_path):
+        file_to_remove = document.file_path
     
     db.delete(document)
     db.commit()
+    
+    if file_to_remove:
+        remove_unreferenced_file(db, file_to_remove)
     return None
 
@@ -5,6 +5,7 @@ from typing import List, Optional
 from database import get_db
 from models import Participant, Project
 from schemas import ParticipantCreate, ParticipantUpdate, ParticipantResponse
+from services.versioning import bump_breakdown_version
 
 router = APIRouter()
 
@@ -126,6 +127,8 @@ def update_participant(
     for key, value in update_dict.items():
         setattr(participant, key, value)
     
+    # Name/team show up in breakdown-derived views of every strategy in the project
+    bump_breakdown_version(db, project_id=participant.project_id)
     db.commit()
     db.refresh(participant)
     
@@ -148,6 +151,7 @@ def delete_participant(participant_id: int, db: Session = Depends(get_db)):
     if not participant:
         raise HTTPException(status_code=404, detail="Participant not found")
     
+    bump_breakdown_version(db, project_id=participant.project_id)
     db.delete(participant)
     db.commit()
     return None
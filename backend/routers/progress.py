@@ -1,191 +1,316 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
+from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List
+from typing import Dict, List, Optional
+import hashlib
 
 from database import get_db
 from models import TestStrategy, BreakdownCategory, BreakdownItem, Participant
 from schemas import (
-    ProgressSummary, ParticipantProgress, CategoryProgress, StrategyProgress
+    ProgressSummary, ParticipantProgress, CategoryProgress, TeamProgress, StrategyProgress
 )
+from services.versioning import breakdown_etag, etag_matches, not_modified, set_etag
 
 router = APIRouter()
 
 
-@router.get("/strategies/{strategy_id}/progress", response_model=StrategyProgress)
-def get_strategy_progress(strategy_id: int, db: Session = Depends(get_db)):
-    """Get complete progress summary for a strategy"""
-    strategy = db.query(TestStrategy).filter(TestStrategy.id == strategy_id).first()
-    if not strategy:
-        raise HTTPException(status_code=404, detail="Strategy not found")
-    
-    # Get all items for this strategy
-    items = db.query(BreakdownItem).join(BreakdownCategory).filter(
+def get_progress_counts(db: Session, strategy_id: int):
+    """
+    Item counts for a strategy grouped by (category, assignee, status) in one SQL pass.
+    Every progress view (summary, participant, category, team) is derived from these rows.
+    """
+    return db.query(
+        BreakdownItem.category_id,
+        BreakdownItem.assignee_id,
+        Participant.name,
+        Participant.team,
+        BreakdownItem.status,
+        func.count(BreakdownItem.id)
+    ).join(BreakdownCategory).outerjoin(
+        Participant, BreakdownItem.assignee_id == Participant.id
+    ).filter(
         BreakdownCategory.strategy_id == strategy_id
+    ).group_by(
+        BreakdownItem.category_id,
+        BreakdownItem.assignee_id,
+        Participant.name,
+        Participant.team,
+        BreakdownItem.status
     ).all()
-    
-    # Calculate summary
-    total = len(items)
-    completed = sum(1 for item in items if item.status == "completed")
-    in_progress = sum(1 for item in items if item.status == "in_progress")
-    blocked = sum(1 for item in items if item.status == "blocked")
-    not_started = sum(1 for item in items if item.status == "not_started")
-    
-    summary = ProgressSummary(
+
+
+def _percentage(part: int, total: int) -> float:
+    return round((part / total * 100) if total > 0 else 0, 1)
+
+
+def summary_from_status_counts(by_status: Dict[str, int]) -> ProgressSummary:
+    total = sum(by_status.values())
+    completed = by_status.get("completed", 0)
+
+    return ProgressSummary(
         total_items=total,
         completed=completed,
-        in_progress=in_progress,
-        blocked=blocked,
-        not_started=not_started,
-        completion_percentage=round((completed / total * 100) if total > 0 else 0, 1)
+        in_progress=by_status.get("in_progress", 0),
+        blocked=by_status.get("blocked", 0),
+        not_started=by_status.get("not_started", 0),
+        completion_percentage=_percentage(completed, total)
     )
-    
-    # Get progress by participant
-    participant_progress = []
-    participants = db.query(Participant).join(BreakdownItem).join(BreakdownCategory).filter(
-        BreakdownCategory.strategy_id == strategy_id
-    ).distinct().all()
-    
-    for p in participants:
-        p_items = [item for item in items if item.assignee_id == p.id]
-        p_total = len(p_items)
-        p_completed = sum(1 for item in p_items if item.status == "completed")
-        
-        participant_progress.append(ParticipantProgress(
-            participant_id=p.id,
-            participant_name=p.name,
-            participant_team=p.team,
-            total_items=p_total,
-            completed=p_completed,
-            completion_percentage=round((p_completed / p_total * 100) if p_total > 0 else 0, 1)
-        ))
-    
+
+
+def build_summary(rows) -> ProgressSummary:
+    by_status = {}
+    for _, _, _, _, status, count in rows:
+        by_status[status] = by_status.get(status, 0) + count
+    return summary_from_status_counts(by_status)
+
+
+def build_participant_progress(rows) -> List[ParticipantProgress]:
+    totals = {}
+    for _, assignee_id, name, team, status, count in rows:
+        if assignee_id is None or name is None:
+            continue
+        entry = totals.setdefault(assignee_id, {"name": name, "team": team, "total": 0, "completed": 0})
+        entry["total"] += count
+        if status == "completed":
+            entry["completed"] += count
+
+    result = [
+        ParticipantProgress(
+            participant_id=participant_id,
+            participant_name=entry["name"],
+            participant_team=entry["team"],
+            total_items=entry["total"],
+            completed=entry["completed"],
+            completion_percentage=_percentage(entry["completed"], entry["total"])
+        )
+        for participant_id, entry in totals.items()
+    ]
+
     # Sort by completion percentage descending
-    participant_progress.sort(key=lambda x: x.completion_percentage, reverse=True)
-    
-    # Get progress by category
-    category_progress = []
-    categories = db.query(BreakdownCategory).filter(
-        BreakdownCategory.strategy_id == strategy_id
-    ).all()
-    
-    for cat in categories:
-        c_items = [item for item in items if item.category_id == cat.id]
-        c_total = len(c_items)
-        c_completed = sum(1 for item in c_items if item.status == "completed")
-        
-        category_progress.append(CategoryProgress(
-            category_id=cat.id,
-            category_name=cat.name,
-            category_type=cat.type,
-            total_items=c_total,
-            completed=c_completed,
-            completion_percentage=round((c_completed / c_total * 100) if c_total > 0 else 0, 1)
+    result.sort(key=lambda x: x.completion_percentage, reverse=True)
+    return result
+
+
+def build_category_progress(rows, categories) -> List[CategoryProgress]:
+    totals = {}
+    for category_id, _, _, _, status, count in rows:
+        entry = totals.setdefault(category_id, {"total": 0, "completed": 0})
+        entry["total"] += count
+        if status == "completed":
+            entry["completed"] += count
+
+    result = []
+    for cat_id, cat_name, cat_type in categories:
+        entry = totals.get(cat_id, {"total": 0, "completed": 0})
+        result.append(CategoryProgress(
+            category_id=cat_id,
+            category_name=cat_name,
+            category_type=cat_type,
+            total_items=entry["total"],
+            completed=entry["completed"],
+            completion_percentage=_percentage(entry["completed"], entry["total"])
+        ))
+    return result
+
+
+def build_team_progress(rows) -> List[TeamProgress]:
+    totals = {}
+    for _, assignee_id, name, team, status, count in rows:
+        # Items whose assignee no longer exists count as unassigned
+        key = team if assignee_id is not None and name is not None else None
+        entry = totals.setdefault(key, {"participants": set(), "by_status": {}})
+        if key is not None:
+            entry["participants"].add(assignee_id)
+        entry["by_status"][status] = entry["by_status"].get(status, 0) + count
+
+    result = []
+    for team, entry in totals.items():
+        by_status = entry["by_status"]
+        total = sum(by_status.values())
+        completed = by_status.get("completed", 0)
+        blocked = by_status.get("blocked", 0)
+        result.append(TeamProgress(
+            team=team,
+            participant_count=len(entry["participants"]),
+            total_items=total,
+            completed=completed,
+            in_progress=by_status.get("in_progress", 0),
+            blocked=blocked,
+            not_started=by_status.get("not_started", 0),
+            completion_percentage=_percentage(completed, total),
+            blocked_ratio=round(blocked / total, 3) if total > 0 else 0.0
         ))
-    
+
+    # Named teams by name, unassigned last
+    result.sort(key=lambda x: (x.team is None, x.team or ""))
+    return result
+
+
+def get_etag_or_404(db: Session, strategy_id: int) -> str:
+    """Cheap existence check + ETag for a strategy, run before any aggregate query"""
+    etag = breakdown_etag(db, strategy_id)
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    return etag
+
+
+# Upper bound on strategies per batch request
+MAX_BATCH_STRATEGIES = 200
+
+
+@router.get("/progress", response_model=Dict[int, ProgressSummary])
+def get_batch_progress(
+    response: Response,
+    strategy_ids: Optional[str] = Query(None, description="Comma-separated strategy ids, e.g. 1,2,3"),
+    project_id: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Get progress summaries for many strategies (by ids or project) in one grouped query"""
+    if not strategy_ids and project_id is None:
+        raise HTTPException(status_code=400, detail="strategy_ids or project_id is required")
+
+    version_query = db.query(TestStrategy.id, TestStrategy.breakdown_version)
+    # Outer joins so strategies without items still get a (zero) summary
+    query = db.query(
+        TestStrategy.id,
+        BreakdownItem.status,
+        func.count(BreakdownItem.id)
+    ).outerjoin(
+        BreakdownCategory, BreakdownCategory.strategy_id == TestStrategy.id
+    ).outerjoin(
+        BreakdownItem, BreakdownItem.category_id == BreakdownCategory.id
+    )
+
+    if strategy_ids:
+        try:
+            ids = sorted({int(s) for s in strategy_ids.split(",") if s.strip()})
+        except ValueError:
+            raise HTTPException(status_code=400, detail="strategy_ids must be comma-separated integers")
+        if len(ids) > MAX_BATCH_STRATEGIES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {MAX_BATCH_STRATEGIES} strategies per request"
+            )
+        query = query.filter(TestStrategy.id.in_(ids))
+        version_query = version_query.filter(TestStrategy.id.in_(ids))
+
+    if project_id is not None:
+        query = query.filter(TestStrategy.project_id == project_id)
+        version_query = version_query.filter(TestStrategy.project_id == project_id)
+
+    versions = ",".join(
+        f"{strategy_id}:{version or 0}"
+        for strategy_id, version in version_query.order_by(TestStrategy.id).all()
+    )
+    etag = f'W/"progress-{hashlib.sha1(versions.encode()).hexdigest()[:16]}"'
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    counts = {}
+    for strategy_id, status, count in query.group_by(TestStrategy.id, BreakdownItem.status).all():
+        by_status = counts.setdefault(strategy_id, {})
+        if status is not None:
+            by_status[status] = count
+
+    return {
+        strategy_id: summary_from_status_counts(by_status)
+        for strategy_id, by_status in counts.items()
+    }
+
+
+@router.get("/strategies/{strategy_id}/progress", response_model=StrategyProgress)
+def get_strategy_progress(
+    strategy_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Get complete progress summary for a strategy"""
+    etag = get_etag_or_404(db, strategy_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    rows = get_progress_counts(db, strategy_id)
+    categories = db.query(
+        BreakdownCategory.id, BreakdownCategory.name, BreakdownCategory.type
+    ).filter(
+        BreakdownCategory.strategy_id == strategy_id
+    ).order_by(BreakdownCategory.order_index).all()
+
     return StrategyProgress(
         strategy_id=strategy_id,
-        summary=summary,
-        by_participant=participant_progress,
-        by_category=category_progress
+        summary=build_summary(rows),
+        by_participant=build_participant_progress(rows),
+        by_category=build_category_progress(rows, categories),
+        by_team=build_team_progress(rows)
     )
 
 
 @router.get("/strategies/{strategy_id}/progress/summary", response_model=ProgressSummary)
-def get_progress_summary(strategy_id: int, db: Session = Depends(get_db)):
+def get_progress_summary(
+    strategy_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Get just the progress summary for a strategy"""
-    strategy = db.query(TestStrategy).filter(TestStrategy.id == strategy_id).first()
-    if not strategy:
-        raise HTTPException(status_code=404, detail="Strategy not found")
-    
-    # Count items by status
-    items = db.query(BreakdownItem).join(BreakdownCategory).filter(
-        BreakdownCategory.strategy_id == strategy_id
-    ).all()
-    
-    total = len(items)
-    completed = sum(1 for item in items if item.status == "completed")
-    in_progress = sum(1 for item in items if item.status == "in_progress")
-    blocked = sum(1 for item in items if item.status == "blocked")
-    not_started = sum(1 for item in items if item.status == "not_started")
-    
-    return ProgressSummary(
-        total_items=total,
-        completed=completed,
-        in_progress=in_progress,
-        blocked=blocked,
-        not_started=not_started,
-        completion_percentage=round((completed / total * 100) if total > 0 else 0, 1)
-    )
+    etag = get_etag_or_404(db, strategy_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return build_summary(get_progress_counts(db, strategy_id))
 
 
 @router.get("/strategies/{strategy_id}/progress/by-participant", response_model=List[ParticipantProgress])
-def get_progress_by_participant(strategy_id: int, db: Session = Depends(get_db)):
+def get_progress_by_participant(
+    strategy_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Get progress breakdown by participant"""
-    strategy = db.query(TestStrategy).filter(TestStrategy.id == strategy_id).first()
-    if not strategy:
-        raise HTTPException(status_code=404, detail="Strategy not found")
-    
-    # Get all items for this strategy
-    items = db.query(BreakdownItem).join(BreakdownCategory).filter(
-        BreakdownCategory.strategy_id == strategy_id
-    ).all()
-    
-    # Get unique participants
-    participants = db.query(Participant).join(BreakdownItem).join(BreakdownCategory).filter(
-        BreakdownCategory.strategy_id == strategy_id
-    ).distinct().all()
-    
-    result = []
-    for p in participants:
-        p_items = [item for item in items if item.assignee_id == p.id]
-        p_total = len(p_items)
-        p_completed = sum(1 for item in p_items if item.status == "completed")
-        
-        result.append(ParticipantProgress(
-            participant_id=p.id,
-            participant_name=p.name,
-            participant_team=p.team,
-            total_items=p_total,
-            completed=p_completed,
-            completion_percentage=round((p_completed / p_total * 100) if p_total > 0 else 0, 1)
-        ))
-    
-    # Sort by completion percentage descending
-    result.sort(key=lambda x: x.completion_percentage, reverse=True)
-    
-    return result
+    etag = get_etag_or_404(db, strategy_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return build_participant_progress(get_progress_counts(db, strategy_id))
 
 
 @router.get("/strategies/{strategy_id}/progress/by-category", response_model=List[CategoryProgress])
-def get_progress_by_category(strategy_id: int, db: Session = Depends(get_db)):
+def get_progress_by_category(
+    strategy_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Get progress breakdown by category"""
-    strategy = db.query(TestStrategy).filter(TestStrategy.id == strategy_id).first()
-    if not strategy:
-        raise HTTPException(status_code=404, detail="Strategy not found")
-    
-    categories = db.query(BreakdownCategory).options(
-        joinedload(BreakdownCategory.items)
+    etag = get_etag_or_404(db, strategy_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    categories = db.query(
+        BreakdownCategory.id, BreakdownCategory.name, BreakdownCategory.type
     ).filter(
         BreakdownCategory.strategy_id == strategy_id
     ).order_by(BreakdownCategory.order_index).all()
-    
-    result = []
-    for cat in categories:
-        c_total = len(cat.items) if cat.items else 0
-        c_completed = sum(1 for item in cat.items if item.status == "completed") if cat.items else 0
-        
-        result.append(CategoryProgress(
-            category_id=cat.id,
-            category_name=cat.name,
-            category_type=cat.type,
-            total_items=c_total,
-            completed=c_completed,
-            completion_percentage=round((c_completed / c_total * 100) if c_total > 0 else 0, 1)
-        ))
-    
-    return result
-
 
+    return build_category_progress(get_progress_counts(db, strategy_id), categories)
 
 
+@router.get("/strategies/{strategy_id}/progress/by-team", response_model=List[TeamProgress])
+def get_progress_by_team(
+    strategy_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Get progress breakdown by participant team (unassigned items grouped as team=null)"""
+    etag = get_etag_or_404(db, strategy_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return build_team_progress(get_progress_counts(db, strategy_id))
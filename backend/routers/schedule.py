@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func, DateTime
+from datetime import datetime
+
+from database import get_db
+from models import TestStrategy, BreakdownCategory, BreakdownItem, Participant
+from schemas import StrategySchedule, StrategyForecast
+from services.schedule import compute_schedule, schedule_cache
+from services.forecast import compute_forecast, forecast_cache
+
+router = APIRouter()
+
+
+@router.get("/strategies/{strategy_id}/schedule", response_model=StrategySchedule)
+def get_strategy_schedule(
+    strategy_id: int,
+    weeks: int = Query(12, ge=1, le=52),
+    db: Session = Depends(get_db)
+):
+    """Get weekly load, overdue/at-risk items and projected category finish dates"""
+    strategy = db.query(TestStrategy).filter(TestStrategy.id == strategy_id).first()
+    if not strategy:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+
+    today = datetime.utcnow().date()
+    version = strategy.breakdown_version or 0
+    cache_key = (strategy_id, version, today, weeks)
+    cached = schedule_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Plain column rows - no ORM objects for large breakdowns
+    items = db.query(
+        BreakdownItem.id,
+        BreakdownItem.title,
+        BreakdownItem.category_id,
+        BreakdownItem.assignee_id,
+        Participant.name,
+        Participant.team,
+        BreakdownItem.status,
+        BreakdownItem.priority,
+        BreakdownItem.eta,
+        BreakdownItem.duration_days
+    ).join(BreakdownCategory).outerjoin(
+        Participant, BreakdownItem.assignee_id == Participant.id
+    ).filter(BreakdownCategory.strategy_id == strategy_id).all()
+
+    categories = db.query(
+        BreakdownCategory.id,
+        BreakdownCategory.name,
+        BreakdownCategory.type,
+        BreakdownCategory.parent_id,
+        BreakdownCategory.eta
+    ).filter(
+        BreakdownCategory.strategy_id == strategy_id
+    ).order_by(BreakdownCategory.order_index).all()
+
+    result = StrategySchedule(
+        strategy_id=strategy_id,
+        breakdown_version=version,
+        as_of=today,
+        **compute_schedule(items, categories, today, weeks)
+    )
+    schedule_cache.set(cache_key, result)
+    return result
+
+
+@router.get("/strategies/{strategy_id}/forecast", response_model=StrategyForecast)
+def get_strategy_forecast(
+    strategy_id: int,
+    trials: int = Query(10000, ge=100, le=50000),
+    lookback_days: int = Query(56, ge=7, le=365),
+    db: Session = Depends(get_db)
+):
+    """Monte Carlo P50/P85/P95 completion dates from per-team completion history"""
+    strategy = db.query(TestStrategy).filter(TestStrategy.id == strategy_id).first()
+    if not strategy:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+
+    today = datetime.utcnow().date()
+    version = strategy.breakdown_version or 0
+    cache_key = (strategy_id, version, today, trials, lookback_days)
+    cached = forecast_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Items completed before completed_at existed fall back to their last update
+    items = db.query(
+        Participant.team,
+        BreakdownItem.status,
+        func.coalesce(BreakdownItem.completed_at, BreakdownItem.updated_at, type_=DateTime)
+    ).select_from(BreakdownItem).join(BreakdownCategory).outerjoin(
+        Participant, BreakdownItem.assignee_id == Participant.id
+    ).filter(BreakdownCategory.strategy_id == strategy_id).all()
+
+    result = StrategyForecast(
+        strategy_id=strategy_id,
+        breakdown_version=version,
+        as_of=today,
+        trials=trials,
+        lookback_days=lookback_days,
+        **compute_forecast(items, today, trials, lookback_days, seed=strategy_id * 100003 + version)
+    )
+    forecast_cache.set(cache_key, result)
+    return result
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from database import get_db
+from models import Project
+from schemas import DocumentSearchHit
+from services.search import search_project
+
+router = APIRouter()
+
+
+@router.get("/projects/{project_id}/documents/search", response_model=List[DocumentSearchHit])
+def search_project_documents(
+    project_id: int,
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Full-text search across a project's documents; ranked snippets with document/page references"""
+    if not db.query(Project.id).filter(Project.id == project_id).first():
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    return search_project(db, project_id, q, limit, offset)
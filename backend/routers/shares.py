@@ -34,6 +34,30 @@ def get_authenticated_user(authorization: str, db: Session) -> User:
     return user
 
 
+def user_can_access_project(user: User, project_id: int, db: Session) -> bool:
+    """
+    Whether a user may read a project's documents.
+    Projects are open to every signed-in user until they are shared with
+    specific people; from then on only admins, the people who shared it and
+    the people it (or one of its strategies) was shared with have access.
+    """
+    if user.is_admin:
+        return True
+
+    strategy_ids = db.query(TestStrategy.id).filter(TestStrategy.project_id == project_id)
+    shares = db.query(Share.shared_by_id, Share.shared_with_id, Share.shared_with_email).filter(
+        (Share.project_id == project_id) | Share.strategy_id.in_(strategy_ids),
+        (Share.shared_with_id != None) | (Share.shared_with_email != None),
+        Share.is_active == True
+    ).all()
+    if not shares:
+        return True
+    return any(
+        user.id in (shared_by_id, shared_with_id) or (email and email.lower() == user.email.lower())
+        for shared_by_id, shared_with_id, email in shares
+    )
+
+
 # ============== Create Share ==============
 
 @router.post("", response_model=ShareResponse)
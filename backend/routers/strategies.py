@@ -7,7 +7,9 @@ from database import get_db
 from models import TestStrategy, Project, TestPlan, Document, Participant
 from datetime import datetime
 from schemas import TestStrategyCreate, TestStrategyUpdate, TestStrategyResponse
-from services.content_generator import generate_strategy_content
+from services.content_generator import build_strategy_content
+from services.document_analysis import get_document_analyses
+from services.tech_dictionary import get_tech_automaton
 from services.confluence_client import ConfluenceClient, strategy_to_confluence_html
 from services.jira_client import JiraClient
 
@@ -212,7 +214,7 @@ def generate_from_documents(project_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Get all documents for the project
-    documents = db.query(Document).filter(Document.project_id == project_id).all()
+    documents = db.query(Document).filter(Document.project_id == project_id).order_by(Document.id).all()
     
     if not documents:
         raise HTTPException(
@@ -220,15 +222,10 @@ def generate_from_documents(project_id: int, db: Session = Depends(get_db)):
             detail="No documents found for this project. Please upload HLD/PRD documents first."
         )
     
-    # Convert to list of dicts
-    doc_list = [
-        {
-            'name': doc.name,
-            'doc_type': doc.doc_type,
-            'content_text': doc.content_text
-        }
-        for doc in documents
-    ]
+    # Stored per-document analyses; new or changed texts are analysed in parallel
+    # up to a deadline, and documents still being analysed are left out
+    results = get_document_analyses(db, documents, get_tech_automaton(db))
+    incomplete = set(results.incomplete)
     
     # Get participants for cross-team projects
     participants_list = []
@@ -246,8 +243,8 @@ def generate_from_documents(project_id: int, db: Session = Depends(get_db)):
         ]
     
     # Generate content with cross-team context
-    generated = generate_strategy_content(
-        doc_list, 
+    generated = build_strategy_content(
+        results.analyses,
         is_cross_team=project.is_cross_team,
         participants=participants_list
     )
@@ -258,7 +255,9 @@ def generate_from_documents(project_id: int, db: Session = Depends(get_db)):
         "is_cross_team": project.is_cross_team,
         "participant_count": len(participants_list),
         "generated_content": generated,
-        "document_count": len(documents)
+        "document_count": len(documents),
+        "partial": bool(incomplete),
+        "incomplete_documents": [document.name for document in documents if document.id in incomplete]
     }
 
 
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Optional, List, Dict
 
 
 # ============== Project Schemas ==============
@@ -51,7 +51,12 @@ class DocumentResponse(DocumentBase):
     project_id: int
     file_path: Optional[str] = None
     file_type: Optional[str] = None
-    content_text: Optional[str] = None
+    file_size: Optional[int] = None
+    content_hash: Optional[str] = None
+    content_preview: Optional[str] = None  # Full text via GET /documents/{id}/content
+    content_bytes: Optional[int] = None
+    content_words: Optional[int] = None
+    extraction_status: Optional[str] = None  # pending, done, failed (uploaded files only)
     notes: Optional[str] = None
     uploaded_at: datetime
 
@@ -59,6 +64,60 @@ class DocumentResponse(DocumentBase):
         from_attributes = True
 
 
+class ExtractionStatusResponse(BaseModel):
+    document_id: int
+    extraction_status: Optional[str] = None
+    extraction_error: Optional[str] = None
+    has_content: bool
+    queued_jobs: int  # Extraction jobs queued or running on this server
+
+
+class UploadBatchFileStatus(BaseModel):
+    filename: Optional[str] = None
+    document_id: Optional[int] = None
+    status: str  # pending, done, failed (extraction), rejected, deleted
+    error: Optional[str] = None
+
+
+class UploadBatchResponse(BaseModel):
+    id: int
+    project_id: int
+    created_at: datetime
+    total: int
+    pending: int
+    done: int
+    failed: int  # Rejected files and failed extractions
+    files: List[UploadBatchFileStatus]
+
+
+class DocumentPageResponse(BaseModel):
+    page_number: int
+    char_offset: int  # Position of the page's text in the document text
+    char_length: int
+    byte_offset: Optional[int] = None  # Same span in UTF-8 bytes (Range on /content)
+    byte_length: Optional[int] = None
+    error: Optional[str] = None  # Set when this page could not be extracted
+
+    class Config:
+        from_attributes = True
+
+
+class DocumentPageText(DocumentPageResponse):
+    text: str
+
+
+class DocumentSearchHit(BaseModel):
+    document_id: int
+    document_name: str
+    doc_type: str
+    page: Optional[int] = None
+    heading: Optional[str] = None
+    table_name: Optional[str] = None
+    char_offset: int  # Start of the matching chunk in the document text
+    snippet: str  # Matches wrapped in **...**
+    score: float  # Higher is more relevant
+
+
 class NoteCreate(BaseModel):
     project_id: int
     name: str = Field(..., min_length=1, max_length=200)
@@ -356,11 +415,101 @@ class CategoryProgress(BaseModel):
     completion_percentage: float
 
 
+class TeamProgress(BaseModel):
+    team: Optional[str] = None  # None = unassigned items
+    participant_count: int
+    total_items: int
+    completed: int
+    in_progress: int
+    blocked: int
+    not_started: int
+    completion_percentage: float
+    blocked_ratio: float  # blocked / total_items
+
+
 class StrategyProgress(BaseModel):
     strategy_id: int
     summary: ProgressSummary
     by_participant: List[ParticipantProgress]
     by_category: List[CategoryProgress]
+    by_team: List[TeamProgress] = []
+
+
+# ============== Schedule Schemas (Cross-Team) ==============
+
+class WeeklyLoad(BaseModel):
+    week_start: date
+    item_days: int  # Sum of scheduled item-days falling in this week
+    active_items: int  # Items whose scheduled window overlaps this week
+
+
+class ParticipantLoad(BaseModel):
+    participant_id: Optional[int] = None  # None = unassigned items
+    participant_name: Optional[str] = None
+    participant_team: Optional[str] = None
+    weekly: List[WeeklyLoad]
+    peak_item_days: int
+
+
+class ScheduleItemFlag(BaseModel):
+    item_id: int
+    title: str
+    category_id: int
+    assignee_id: Optional[int] = None
+    assignee_name: Optional[str] = None
+    status: str
+    priority: Optional[str] = None
+    eta: Optional[datetime] = None
+    days_late: int = 0
+
+
+class CategorySchedule(BaseModel):
+    category_id: int
+    category_name: str
+    category_type: str
+    parent_id: Optional[int] = None
+    eta: Optional[datetime] = None
+    projected_finish: Optional[date] = None
+    slip_days: Optional[int] = None  # projected_finish - eta (positive = late)
+    open_items: int
+    overdue_items: int
+    is_complete: bool
+
+
+class StrategySchedule(BaseModel):
+    strategy_id: int
+    breakdown_version: int
+    as_of: date
+    weeks: List[date]
+    participant_load: List[ParticipantLoad]
+    overdue: List[ScheduleItemFlag]
+    at_risk: List[ScheduleItemFlag]
+    categories: List[CategorySchedule]
+
+
+class TeamForecast(BaseModel):
+    team: Optional[str] = None  # None = unassigned items
+    remaining_items: int
+    completed_in_window: int
+    avg_daily_throughput: float
+    forecastable: bool  # False when there is remaining work but no completion history
+    p50: Optional[date] = None
+    p85: Optional[date] = None
+    p95: Optional[date] = None
+
+
+class StrategyForecast(BaseModel):
+    strategy_id: int
+    breakdown_version: int
+    as_of: date
+    trials: int
+    lookback_days: int
+    remaining_items: int
+    p50: Optional[date] = None
+    p85: Optional[date] = None
+    p95: Optional[date] = None
+    teams: List[TeamForecast]
+    teams_without_history: List[Optional[str]] = []
 
 
 # ============== User & Authentication Schemas ==============
@@ -449,3 +598,94 @@ class ShareListResponse(BaseModel):
     shares: List[ShareResponse]
     total: int
 
+
+
+# ============== Admin: Storage ==============
+
+class ProjectStorageUsageResponse(BaseModel):
+    project_id: int
+    project_name: Optional[str] = None
+    is_active: bool = True  # False: soft-deleted, its files are reclaimable
+    file_count: int
+    file_bytes: int  # Uploaded file bytes as referenced by documents (before dedup)
+    text_bytes: int  # Extracted text (uncompressed UTF-8)
+    updated_at: Optional[datetime] = None
+
+
+class StorageSweepStats(BaseModel):
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    scanned: int
+    quarantined: int
+    quarantined_bytes: int
+    restored: int
+    deleted: int
+    deleted_bytes: int
+    ref_counts_fixed: int
+
+
+class StorageReport(BaseModel):
+    projects: List[ProjectStorageUsageResponse]
+    blob_count: int
+    blob_bytes: int  # Physical bytes in content-addressed storage (after dedup)
+    reclaimable_bytes: int  # file_bytes of soft-deleted projects
+    quarantine_files: int
+    quarantine_bytes: int
+    last_sweep: Optional[StorageSweepStats] = None
+
+
+# ============== Admin: Re-extraction ==============
+
+class ReextractionRequest(BaseModel):
+    file_types: Optional[List[str]] = None  # e.g. ["pdf", "docx"]; all parseable types if empty
+    project_id: Optional[int] = None
+    outdated_parser: bool = False  # Text from an older parser version (or of unknown version)
+    empty_content: bool = False  # No extracted text
+    # With neither flag set, every document matching the type/project filters is re-extracted
+
+
+class ReextractionJobResponse(BaseModel):
+    id: int
+    status: str
+    filters: Dict
+    total: int
+    processed: int
+    succeeded: int
+    failed: int
+    progress: float  # 0-100
+    last_document_id: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+
+
+# ============== Admin: Technology dictionary ==============
+
+class TechnologyCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    category: Optional[str] = None
+    aliases: List[str] = []
+
+
+class TechnologyUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+    category: Optional[str] = None
+    aliases: Optional[List[str]] = None
+    is_active: Optional[bool] = None
+
+
+class TechnologyResponse(BaseModel):
+    id: int
+    name: str
+    category: Optional[str] = None
+    aliases: List[str]
+    is_active: bool
+    updated_at: Optional[datetime] = None
+
+
+class TechnologyImportResult(BaseModel):
+    created: int
+    updated: int
+    total: int  # Entries in the dictionary after the import
@@ -0,0 +1,121 @@
+"""
+Benchmark the single-pass text scanner against the previous per-extractor
+regex passes of the strategy content generator.
+
+    python scripts/benchmark_content_generator.py [--sizes 1,20] [--repeat 3]
+
+Two generated corpora per size (MB):
+  dense   PRD-like text (headings, prose with requirements, lists, tables);
+          every category fills up early, so the scan stops after a few pages
+  sparse  the same prose with no list items or requirements until the very
+          end, which forces a full pass over the text
+
+Reports the best of --repeat runs for each implementation. The previous
+implementation runs once per corpus (it is slow on the large one).
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.text_scanner import scan_text  # noqa: E402
+
+WORDS = (
+    "order payment customer account service gateway request response queue event report "
+    "invoice user session token profile search catalog inventory shipment notification"
+).split()
+
+
+def previous_extractors(text: str):
+    """The extractor passes this replaced, over the concatenated text"""
+    keywords = re.findall(r'\b[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*\b', text)[:20]
+    keywords += re.findall(r'(?:feature|module|component|service|api|endpoint|function)[\s:]+([^\n.]+)', text, re.I)[:10]
+    bullets = re.findall(r'[-•*]\s*([^\n]+)', text)
+    features = [b.strip() for b in bullets if len(b.strip()) > 5][:15]
+    numbered = re.findall(r'\d+[.)]\s*([^\n]+)', text)
+    features += [n.strip() for n in numbered if len(n.strip()) > 5][:15]
+    requirements = [r.strip() for r in re.findall(r'[^.]*(?:shall|must|should|will|need to)[^.]+\.', text, re.I)][:10]
+    return list(set(keywords)), features, requirements
+
+
+def _prose(rng: random.Random, sentences: int) -> str:
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+def _table(rng: random.Random, rows: int) -> str:
+    # Each row has a decimal: long period-free runs make the previous requirement
+    # regex backtrack quadratically, which is a separate problem
+    return "\n".join(
+        " | ".join([*(rng.choice(WORDS) for _ in range(4)), f"{rng.randint(1, 99) / 10} ms"])
+        for _ in range(rows)
+    )
+
+
+def dense_section(rng: random.Random, number: int) -> str:
+    return "\n".join([
+        f"## {number} Order Processing",
+        _prose(rng, 4),
+        f"The payment service shall confirm order {number} within two seconds.",
+        f"- Customer can track shipment {number}",
+        f"- Gateway retries failed request {number}",
+        f"1. Submit the invoice for account {number}",
+        f"2) Notify the user about session {number}",
+        _table(rng, 6),
+        "",
+    ])
+
+
+def sparse_section(rng: random.Random, number: int) -> str:
+    return "\n".join([_prose(rng, 5).lower(), _table(rng, 6), ""])
+
+
+def build_corpus(kind: str, size_mb: float, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    make = dense_section if kind == "dense" else sparse_section
+    target = int(size_mb * 1024 * 1024)
+    parts, size, number = [], 0, 0
+    while size < target:
+        number += 1
+        part = make(rng, number)
+        parts.append(part)
+        size += len(part) + 1
+    if kind == "sparse":
+        parts.append(dense_section(rng, number + 1))
+    return "\n".join(parts)
+
+
+def best_time(function, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,20", help="Comma-separated corpus sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'corpus':<14}{'previous':>12}{'scanner':>12}{'speedup':>10}")
+    for size in (float(s) for s in args.sizes.split(",")):
+        for kind in ("dense", "sparse"):
+            text = build_corpus(kind, size)
+            previous = best_time(previous_extractors, text, 1)
+            scanner = best_time(scan_text, text, args.repeat)
+            label = f"{kind} {size:g} MB"
+            print(f"{label:<14}{previous:>11.3f}s{scanner:>11.3f}s{previous / scanner:>9.1f}x", flush=True)
+
+
+if __name__ == "__main__":
+    main()
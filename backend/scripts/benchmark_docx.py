@@ -0,0 +1,122 @@
+"""
+Benchmark the streaming DOCX parser against the previous python-docx
+implementation on a generated 300-page, table-heavy document.
+
+    python scripts/benchmark_docx.py [--pages 300] [--rows 12] [--keep path.docx]
+
+Reports wall time (best of --repeat runs) and peak Python memory (tracemalloc)
+for each parser, and checks that both produce the same table rows.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.parsers import TextChunk, split_long_text  # noqa: E402
+from services.parsers.docx_parser import parse_docx  # noqa: E402
+
+
+def parse_docx_object_model(file_path: str):
+    """The python-docx parser this replaced (docx parser version 2)"""
+    from docx import Document
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+    doc = Document(file_path)
+    heading = None
+    tables = 0
+    for element in doc.element.body.iterchildren():
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag == "p":
+            paragraph = Paragraph(element, doc)
+            text = paragraph.text
+            if not text.strip():
+                continue
+            style = paragraph.style.name if paragraph.style is not None else ""
+            if style.startswith("Heading") or style == "Title":
+                heading = text.strip()
+            for part in split_long_text(text):
+                yield TextChunk(text=part, heading=heading)
+        elif tag == "tbl":
+            tables += 1
+            for row in Table(element, doc).rows:
+                row_text = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+                if row_text:
+                    yield TextChunk(text=" | ".join(row_text), heading=heading, table=f"Table {tables}")
+
+
+def build_document(path: str, pages: int, rows: int):
+    """One heading, two paragraphs and a rows x 6 requirements table per page"""
+    from docx import Document
+    from docx.enum.text import WD_BREAK
+
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "HLD - Payments Platform - Confidential"
+    doc.sections[0].footer.paragraphs[0].text = "Internal use only"
+    for page in range(1, pages + 1):
+        doc.add_heading(f"{page}. Component {page}", level=1)
+        doc.add_paragraph(f"Component {page} handles requests for module {page % 17}. " * 6)
+        doc.add_paragraph("The service shall validate every request and log the outcome. " * 4)
+        table = doc.add_table(rows=rows + 1, cols=6)
+        for col, title in enumerate(["ID", "Requirement", "Priority", "Owner", "Status", "Notes"]):
+            table.cell(0, col).text = title
+        for row in range(1, rows + 1):
+            values = [
+                f"REQ-{page}-{row}",
+                f"The system shall process event {row} of component {page} within 200 ms",
+                ["High", "Medium", "Low"][row % 3],
+                f"Team {row % 5}",
+                "Draft",
+                "See design section" if row % 2 else ""
+            ]
+            for col, value in enumerate(values):
+                table.cell(row, col).text = value
+        doc.add_paragraph().add_run().add_break(WD_BREAK.PAGE)
+    doc.save(path)
+
+
+def measure(parser, path: str, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = list(parser(path))
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    list(parser(path))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--rows", type=int, default=12, help="Table rows per page")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keep", help="Write the generated document here instead of a temp file")
+    args = parser.parse_args()
+
+    path = args.keep or os.path.join(tempfile.mkdtemp(), "benchmark.docx")
+    build_document(path, args.pages, args.rows)
+    print(f"{path}: {args.pages} pages, {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+
+    results = {}
+    for name, implementation in (("python-docx (v2)", parse_docx_object_model), ("iterparse (v3)", parse_docx)):
+        seconds, peak, chunks = measure(implementation, path, args.repeat)
+        results[name] = chunks
+        print(f"{name:18} {seconds * 1000:9.1f} ms   peak {peak / 1024 / 1024:7.1f} MB   {len(chunks)} chunks")
+
+    old_rows, new_rows = ([chunk.text for chunk in chunks if chunk.table] for chunks in results.values())
+    print("table rows match" if old_rows == new_rows else "table rows DIFFER")
+
+    if not args.keep:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Regression benchmark for requirement extraction on pathological inputs.
+
+    python scripts/benchmark_requirements.py [--size 200000] [--previous]
+
+Each input is scanned (services.text_scanner) and tokenized
+(services.document_tokens, which segments sentences too) at 1x, 2x and 4x
+--size characters. Both must stay linear: the script fails (exit 1) if
+quadrupling the input costs more than MAX_SCALING times as much. --previous also times the regex this replaced,
+which is quadratic on most of these inputs (minutes per input even at
+--size 20000).
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.document_tokens import tokenize  # noqa: E402
+from services.text_scanner import scan_text  # noqa: E402
+
+# Allowed time ratio between the 4x and 1x inputs (linear would be ~4)
+MAX_SCALING = 8.0
+
+PREVIOUS = re.compile(r'[^.]*(?:shall|must|should|will|need to)[^.]+\.', re.I)
+
+INPUTS = {
+    # Period-free table rows pasted from a spreadsheet
+    "table rows": lambda n: "\n".join(
+        "| order | payment | status | owner |" for _ in range(n // 36)
+    ),
+    # One huge line of words without any punctuation
+    "single line": lambda n: "word " * (n // 5),
+    # Modal verbs with nothing after them and no period
+    "dangling modals": lambda n: "the service shall\n" * (n // 18),
+    # Table-of-contents dot leaders
+    "dot leaders": lambda n: ("Introduction " + "." * 200 + " 5\n") * (n // 216),
+    # One unbroken run of periods
+    "period run": lambda n: "." * n,
+    # A run of periods that doesn't end a sentence ("....x")
+    "period run, word": lambda n: "." * n + "x",
+    # Abbreviations that never end a sentence
+    "abbreviations": lambda n: "e.g. " * (n // 5) + "must work.",
+    # Code block without any periods after the fence
+    "code block": lambda n: "```\n" + "if (x) { will(y) }\n" * (n // 19),
+    # Modal inside a word, repeated
+    "near misses": lambda n: "willing shallow mustard " * (n // 24),
+}
+
+
+def timed(function, text: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200_000, help="Base input size in characters")
+    parser.add_argument("--previous", action="store_true", help="Also time the previous regex (slow)")
+    args = parser.parse_args()
+
+    print(f"{'input':<28}{'1x':>10}{'2x':>10}{'4x':>10}{'4x/1x':>8}" + (f"{'previous 1x':>14}" if args.previous else ""))
+    failures = []
+    for name, make in INPUTS.items():
+        for label, function in (("scan", scan_text), ("tokenize", tokenize)):
+            times = [timed(function, make(args.size * factor)) for factor in (1, 2, 4)]
+            # Sub-millisecond timings are noise; compare against a 1 ms floor
+            scaling = times[2] / max(times[0], 0.001)
+            line = f"{f'{name} ({label})':<28}" + "".join(f"{t * 1000:>8.1f}ms" for t in times) + f"{scaling:>8.1f}"
+            if args.previous and function is scan_text:
+                text = make(args.size)
+                line += f"{timed(PREVIOUS.findall, text, 1):>13.2f}s"
+            print(line, flush=True)
+            if scaling > MAX_SCALING:
+                failures.append(f"{name} ({label})")
+
+    if failures:
+        print(f"Super-linear scaling on: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Local stand-in for the Google Docs export endpoint, for testing link ingestion
+without network access.
+
+Serves GET /document/d/<doc_id>/export with the text of <dir>/<doc_id>.txt,
+a strong ETag and Last-Modified, and answers conditional requests with 304.
+Point the backend at it with:
+
+    GOOGLE_DOCS_EXPORT_URL=http://127.0.0.1:8765/document/d/{doc_id}/export?format=txt
+
+Run standalone (python scripts/google_docs_stub.py --dir docs/ --port 8765) or
+in-process via start_stub_server({"doc_id": "text", ...}), which returns the
+server; server.docs can be edited and server.requests counts requests per doc.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+_EXPORT_PATH = re.compile(r'^/document/d/([a-zA-Z0-9_-]+)/export')
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        match = _EXPORT_PATH.match(self.path)
+        text = self.server.load(match.group(1)) if match else None
+        if text is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        doc_id = match.group(1)
+        with self.server.lock:
+            self.server.requests[doc_id] = self.server.requests.get(doc_id, 0) + 1
+        body = text.encode("utf-8")
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(usegmt=True))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, docs: Optional[Dict[str, str]] = None, directory: Optional[str] = None):
+        super().__init__(address, _StubHandler)
+        self.docs = docs if docs is not None else {}
+        self.directory = directory
+        self.requests: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def load(self, doc_id: str) -> Optional[str]:
+        if doc_id in self.docs:
+            return self.docs[doc_id]
+        if self.directory:
+            path = os.path.join(self.directory, f"{doc_id}.txt")
+            if os.path.isfile(path):
+                with open(path, encoding="utf-8") as f:
+                    return f.read()
+        return None
+
+    @property
+    def export_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/document/d/{{doc_id}}/export?format=txt"
+
+
+def start_stub_server(docs: Dict[str, str], port: int = 0) -> StubServer:
+    """Serve docs from a background thread; call server.shutdown() when done"""
+    server = StubServer(("127.0.0.1", port), docs=docs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dir", required=True, help="Directory of <doc_id>.txt files")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = StubServer(("127.0.0.1", args.port), directory=args.dir)
+    print(f"Serving {args.dir} at {server.export_url}")
+    server.serve_forever()
@@ -0,0 +1,103 @@
+"""
+Re-extract stored documents in bulk, e.g. after a parser upgrade.
+
+    python scripts/reextract.py --outdated                  # Text from older parser versions
+    python scripts/reextract.py --empty --file-type pdf     # PDFs without text
+    python scripts/reextract.py --project 3 --file-type docx --file-type doc
+    python scripts/reextract.py --resume 12                 # Continue job 12 from its checkpoint
+    python scripts/reextract.py --list
+
+Run from backend/ against the production database (DATABASE_URL). The job is
+recorded in reextraction_jobs like the ones started from the admin API, so its
+progress is visible there and it can be paused or cancelled from either side.
+Ctrl-C pauses the job at its checkpoint. Keep --concurrency low (default 1)
+when the API server is running on the same host; --delay spaces out
+submissions further.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal, init_db  # noqa: E402
+from models import ReextractionJob  # noqa: E402
+from services import reextraction  # noqa: E402
+from services.extraction import shutdown_extraction_pool  # noqa: E402
+
+
+def _print_job(job: ReextractionJob):
+    percent = 100 * job.processed / job.total if job.total else 100.0
+    print(f"job {job.id} [{job.status}] {job.processed}/{job.total} ({percent:.1f}%) "
+          f"ok={job.succeeded} failed={job.failed} checkpoint=#{job.last_document_id}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file-type", action="append", dest="file_types", help="Extension without dot (repeatable)")
+    parser.add_argument("--project", type=int, dest="project_id")
+    parser.add_argument("--outdated", action="store_true", help="Text from an older (or unknown) parser version")
+    parser.add_argument("--empty", action="store_true", help="Documents without extracted text")
+    parser.add_argument("--resume", type=int, metavar="JOB_ID")
+    parser.add_argument("--list", action="store_true", help="Show recent jobs and exit")
+    parser.add_argument("--dry-run", action="store_true", help="Count matching documents and exit")
+    parser.add_argument("--concurrency", type=int, default=1, help="Documents in flight (default 1)")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds between submissions")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.list:
+            for job in db.query(ReextractionJob).order_by(ReextractionJob.id.desc()).limit(20):
+                _print_job(job)
+                print(f"    filters={job.filters}")
+            return 0
+
+        if args.resume:
+            job = db.get(ReextractionJob, args.resume)
+            if job is None:
+                print(f"No job {args.resume}", file=sys.stderr)
+                return 1
+        else:
+            filters = {
+                "file_types": args.file_types,
+                "project_id": args.project_id,
+                "outdated_parser": args.outdated,
+                "empty_content": args.empty,
+            }
+            if args.dry_run:
+                print(f"{reextraction.matching_documents(db, filters).count()} documents match {json.dumps(filters)}")
+                return 0
+            job = reextraction.create_reextraction_job(db, filters)
+            print(f"Created job {job.id} for {job.total} documents")
+        job_id = job.id
+    finally:
+        db.close()
+
+    try:
+        status = reextraction.run_reextraction_job(
+            job_id, concurrency=args.concurrency, delay=args.delay, on_progress=_print_job
+        )
+    except KeyboardInterrupt:
+        db = SessionLocal()
+        try:
+            job = db.get(ReextractionJob, job_id)
+            reextraction.set_reextraction_status(db, job, reextraction.JOB_PAUSED)
+        finally:
+            db.close()
+        print(f"Paused job {job_id}; continue with --resume {job_id}")
+        return 130
+    finally:
+        shutdown_extraction_pool()
+
+    if status is None:
+        print(f"Job {job_id} is finished, running in another process, or was taken over by one", file=sys.stderr)
+        return 1
+    return 0 if status == reextraction.JOB_DONE else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,109 +3,63 @@ Service for generating test strategy content from uploaded documents.
 Analyzes HLD/PRD documents and suggests content for each strategy section.
 """
 
-import re
 from typing import Dict, List, Optional
 
-
-def extract_keywords(text: str) -> List[str]:
-    """Extract important keywords from text"""
-    # Common tech/feature words to look for
-    keywords = []
-    
-    # Find capitalized words (likely feature names)
-    caps = re.findall(r'\b[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*\b', text)
-    keywords.extend(caps[:20])
-    
-    # Find words after common prefixes
-    features = re.findall(r'(?:feature|module|component|service|api|endpoint|function)[\s:]+([^\n.]+)', text, re.I)
-    keywords.extend(features[:10])
-    
-    return list(set(keywords))
-
-
-def extract_features(text: str) -> List[str]:
-    """Extract feature names from document"""
-    features = []
-    
-    # Look for bullet points
-    bullets = re.findall(r'[-•*]\s*([^\n]+)', text)
-    features.extend([b.strip() for b in bullets if len(b.strip()) > 5][:15])
-    
-    # Look for numbered items
-    numbered = re.findall(r'\d+[.)]\s*([^\n]+)', text)
-    features.extend([n.strip() for n in numbered if len(n.strip()) > 5][:15])
-    
-    return features
-
-
-def extract_requirements(text: str) -> List[str]:
-    """Extract requirements from text"""
-    requirements = []
-    
-    # Look for "shall", "must", "should" statements
-    reqs = re.findall(r'[^.]*(?:shall|must|should|will|need to)[^.]+\.', text, re.I)
-    requirements.extend([r.strip() for r in reqs][:10])
-    
-    return requirements
+from services.document_analysis import TextAnalysis, analyze_text
+from services.tech_dictionary import TechAutomaton, default_tech_automaton
+from services.text_scanner import merge_scans
 
 
-def extract_tech_stack(text: str) -> List[str]:
-    """Extract technology mentions"""
-    tech_keywords = [
-        'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue',
-        'node', 'express', 'django', 'flask', 'spring', 'docker', 'kubernetes',
-        'aws', 'azure', 'gcp', 'postgresql', 'mysql', 'mongodb', 'redis',
-        'api', 'rest', 'graphql', 'microservice', 'kafka', 'rabbitmq',
-        'jenkins', 'github', 'gitlab', 'ci/cd', 'terraform', 'nginx'
-    ]
-    
-    found = []
-    text_lower = text.lower()
-    for tech in tech_keywords:
-        if tech in text_lower:
-            found.append(tech.title())
-    
-    return found
-
-
-def generate_strategy_content(documents: List[Dict], is_cross_team: bool = False, participants: List[Dict] = None) -> Dict[str, str]:
+def generate_strategy_content(
+    documents: List[Dict],
+    is_cross_team: bool = False,
+    participants: List[Dict] = None,
+    tech_automaton: Optional[TechAutomaton] = None
+) -> Dict[str, str]:
     """
     Generate test strategy content based on uploaded documents.
     
     Args:
-        documents: List of document dicts with 'content_text', 'doc_type', 'name'
+        documents: List of document dicts with 'content_text', 'doc_type', 'name' and
+            optionally 'tokens' (stored token stream; tokenized here if missing)
         is_cross_team: Whether this is a cross-team E2E strategy
         participants: List of participant dicts for cross-team projects
+        tech_automaton: Compiled technology dictionary (the bundled seed dictionary if omitted)
     
     Returns:
         Dict with suggested content for each strategy section
     """
+    tech_automaton = tech_automaton or default_tech_automaton()
+    analyses = [
+        analyze_text(doc['content_text'], tech_automaton, doc.get('tokens'))
+        for doc in documents
+        if (doc.get('content_text') or '').strip()
+    ]
+    return build_strategy_content(analyses, is_cross_team, participants)
+
+
+def build_strategy_content(
+    analyses: List[TextAnalysis],
+    is_cross_team: bool = False,
+    participants: List[Dict] = None
+) -> Dict[str, str]:
+    """
+    Strategy sections from per-document analyses (services.document_analysis),
+    merged in document order as if the documents were one text.
+    """
     participants = participants or []
     
-    # Combine all document content
-    all_text = ""
-    hld_text = ""
-    prd_text = ""
-    
-    for doc in documents:
-        content = doc.get('content_text', '') or ''
-        all_text += content + "\n\n"
-        
-        if doc.get('doc_type') == 'hld':
-            hld_text += content + "\n"
-        elif doc.get('doc_type') == 'prd':
-            prd_text += content + "\n"
-    
-    if not all_text.strip():
+    if not analyses:
         return {
             "error": "No document content available. Please upload documents with text content."
         }
     
     # Extract information
-    features = extract_features(all_text)
-    requirements = extract_requirements(all_text)
-    tech_stack = extract_tech_stack(all_text)
-    keywords = extract_keywords(all_text)
+    scan = merge_scans(analysis.scan for analysis in analyses)
+    features = scan.features
+    requirements = scan.requirements
+    tech_stack = list(dict.fromkeys(tech for analysis in analyses for tech in analysis.technologies))
+    keywords = scan.keywords
     
     # Generate content for each section
     result = {}
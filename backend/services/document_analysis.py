@@ -0,0 +1,327 @@
+"""
+Memoized per-document analysis for strategy generation.
+
+A document's analysis - its text scan (list items, requirements, keywords;
+services.text_scanner) and the technologies it mentions
+(services.tech_dictionary) - is stored in document_analyses keyed by the
+SHA-256 of its text and ANALYZER_VERSION. Generating a strategy then only
+analyses documents whose text has no stored analysis yet, and documents with
+the same text (e.g. copies in other projects) share one row. When the
+technology dictionary changes, only the technology names are recomputed,
+from the stored token stream.
+
+Texts that do need analysing are fanned out to a process pool, so a project
+with many large new documents takes about as long as its largest few, not as
+long as all of them in turn. Workers compile the dictionary once when they
+start and get each text's stored token stream along with it. The pool gets
+ANALYSIS_DEADLINE_SECONDS: analyses not finished by then are left out (the
+caller reports them as incomplete) and stored when they do finish, so the
+next generation picks them up; analyses that fail are logged and left out
+the same way. Results are always returned in document order, whatever order
+the workers finish in.
+
+Bump ANALYZER_VERSION when the scanner's output changes; rows of other
+versions, and of texts no document has any more, are dropped by the storage
+sweep.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Document, DocumentAnalysis
+from services.document_text import get_document_text
+from services.document_tokens import load_document_tokens, tokenize
+from services.tech_dictionary import TechAutomaton
+from services.text_scanner import TextScan, scan_text
+
+ANALYZER_VERSION = 1
+
+# Worker processes; defaults to one per core
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "0")) or (os.cpu_count() or 1)
+
+# Seconds a strategy generation waits for document analyses
+ANALYSIS_DEADLINE_SECONDS = float(os.getenv("ANALYSIS_DEADLINE_SECONDS", "30"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_key: Optional[str] = None  # Dictionary key the pool's workers were started with
+_pool_lock = threading.Lock()
+
+# In each worker process: the dictionary automaton, built once at worker start
+_worker_automaton: Optional[TechAutomaton] = None
+
+
+class TextAnalysis(NamedTuple):
+    scan: TextScan
+    technologies: List[str]
+
+
+class AnalysisResults(NamedTuple):
+    analyses: List[TextAnalysis]
+    # Documents whose analysis missed the deadline or failed, in document order
+    incomplete: List[int]
+
+
+def _init_worker(entries: List[Tuple[str, List[str]]]):
+    global _worker_automaton
+    _worker_automaton = TechAutomaton(entries)
+
+
+def get_analysis_pool(automaton: TechAutomaton) -> ProcessPoolExecutor:
+    """
+    Lazily create the shared analysis pool. Its workers compile automaton's
+    dictionary once at start; a pool started with another dictionary is
+    retired, and the analyses other requests queued on it still run there.
+    """
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None and _pool_key != automaton.key:
+            _pool.shutdown(wait=False)
+            _pool = None
+        if _pool is None:
+            # spawn: forking a threaded server process is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=ANALYSIS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(automaton.entries,)
+            )
+            _pool_key = automaton.key
+        return _pool
+
+
+def _retire_pool(pool: ProcessPoolExecutor):
+    """Stop handing out pool (broken or already retired); its queued jobs still run."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def shutdown_analysis_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def analyze_text(text: str, automaton: TechAutomaton, tokens: Optional[Iterable[str]] = None) -> TextAnalysis:
+    """Analysis of one document text; tokens is its stored token stream, if any"""
+    if tokens is None:
+        tokens = tokenize(text).tokens
+    return TextAnalysis(scan_text(text), automaton.find(tokens))
+
+
+def _analyze_in_worker(text: str, stored: Optional[Tuple[List[str], array]]) -> TextAnalysis:
+    """Pool job: analyse one text; stored is its (vocabulary, token ids) if it has a token stream"""
+    tokens = None
+    if stored is not None:
+        vocabulary, token_ids = stored
+        tokens = (vocabulary[token_id] for token_id in token_ids)
+    return analyze_text(text, _worker_automaton, tokens)
+
+
+def _stored_tokens(db: Session, document_id: int) -> Optional[List[str]]:
+    stored = load_document_tokens(db, document_id)
+    return list(stored.tokens()) if stored is not None else None
+
+
+def _backfill_text_hashes(db: Session, documents: List[Document]):
+    """Hash the text of documents stored before text hashes were recorded"""
+    changed = False
+    for document in documents:
+        if document.text_hash is None:
+            text = get_document_text(db, document.id)
+            if text is not None:
+                document.text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+                changed = True
+    if changed:
+        db.commit()
+
+
+def _store_analysis(db: Session, text_hash: str, analysis: TextAnalysis, dictionary_key: str):
+    db.add(DocumentAnalysis(
+        text_hash=text_hash,
+        analyzer_version=ANALYZER_VERSION,
+        scan=json.dumps(analysis.scan),
+        technologies=json.dumps(analysis.technologies),
+        dictionary_key=dictionary_key
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # Stored concurrently by another request; ours is identical
+
+
+def _store_late(text_hash: str, dictionary_key: str, future: Future):
+    """Done-callback for analyses that missed the deadline (runs on the pool's callback thread)"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    db = SessionLocal()
+    try:
+        _store_analysis(db, text_hash, future.result(), dictionary_key)
+    finally:
+        db.close()
+
+
+def _analyze_missing(
+    db: Session,
+    missing: Dict[str, int],
+    automaton: TechAutomaton,
+    deadline: float
+) -> Dict[str, TextAnalysis]:
+    """
+    Analyse and store the texts without a stored analysis (text hash -> a
+    document with that text). Returns those finished within deadline seconds;
+    texts whose analysis fails are logged and left out.
+    """
+    started = time.monotonic()
+    futures: Dict[str, Future] = {}
+    pools: Dict[str, ProcessPoolExecutor] = {}  # Pool each job was submitted to
+    analyses: Dict[str, TextAnalysis] = {}
+
+    if len(missing) > 1 and ANALYSIS_WORKERS > 1:
+        pool = get_analysis_pool(automaton)
+        try:
+            for text_hash, document_id in missing.items():
+                text = get_document_text(db, document_id)
+                if text is not None:
+                    # Send the packed token stream along so workers don't re-tokenize
+                    stored = load_document_tokens(db, document_id)
+                    job = (_analyze_in_worker, text, (stored.vocabulary, stored.token_ids) if stored is not None else None)
+                    try:
+                        futures[text_hash] = pool.submit(*job)
+                    except RuntimeError:
+                        # Retired for another dictionary since we got it, or broken
+                        _retire_pool(pool)
+                        pool = get_analysis_pool(automaton)
+                        futures[text_hash] = pool.submit(*job)
+                    pools[text_hash] = pool
+        except RuntimeError:
+            # No usable pool; analyse in this thread instead
+            _retire_pool(pool)
+            for future in futures.values():
+                future.cancel()
+            futures = {}
+
+    if not futures:
+        # One text (or one worker) isn't worth the round trip to a process
+        for text_hash, document_id in missing.items():
+            if time.monotonic() - started >= deadline:
+                break
+            text = get_document_text(db, document_id)
+            if text is None:
+                continue
+            try:
+                analyses[text_hash] = analyze_text(text, automaton, _stored_tokens(db, document_id))
+            except Exception as e:
+                print(f"Analysis of document {document_id} failed: {e}")
+                continue
+            _store_analysis(db, text_hash, analyses[text_hash], automaton.key)
+        return analyses
+
+    wait(futures.values(), timeout=max(deadline - (time.monotonic() - started), 0))
+    for text_hash, future in futures.items():
+        if not future.done():
+            # Queued jobs are dropped; running ones are stored when they finish
+            if not future.cancel():
+                future.add_done_callback(lambda f, text_hash=text_hash: _store_late(text_hash, automaton.key, f))
+        elif future.cancelled():
+            pass  # The server shut the pool down before this job started
+        elif isinstance(future.exception(), BrokenProcessPool):
+            # A worker died (e.g. out of memory); the next request gets a fresh pool
+            _retire_pool(pools[text_hash])
+        elif future.exception() is not None:
+            # Left out like a timeout; the rest of the project still gets a strategy
+            print(f"Analysis of document {missing[text_hash]} failed: {future.exception()}")
+        else:
+            analyses[text_hash] = future.result()
+            _store_analysis(db, text_hash, analyses[text_hash], automaton.key)
+    return analyses
+
+
+def get_document_analyses(
+    db: Session,
+    documents: List[Document],
+    automaton: TechAutomaton,
+    deadline: float = ANALYSIS_DEADLINE_SECONDS
+) -> AnalysisResults:
+    """
+    Analyses of the documents that have text, in document order. Stored
+    analyses are reused; texts without one are analysed in parallel, and
+    documents whose analysis takes longer than deadline seconds, or fails,
+    are left out and listed as incomplete.
+    """
+    documents = [document for document in documents if document.content_bytes]
+    _backfill_text_hashes(db, documents)
+    # (id, hash) pairs, so commits below don't expire (and reload) the documents
+    keys = [(document.id, document.text_hash) for document in documents if document.text_hash]
+
+    entries = {
+        entry.text_hash: entry
+        for entry in db.query(
+            DocumentAnalysis.id, DocumentAnalysis.text_hash, DocumentAnalysis.scan,
+            DocumentAnalysis.technologies, DocumentAnalysis.dictionary_key
+        ).filter(
+            DocumentAnalysis.text_hash.in_({text_hash for _, text_hash in keys}),
+            DocumentAnalysis.analyzer_version == ANALYZER_VERSION
+        )
+    }
+
+    analyses: Dict[str, TextAnalysis] = {}
+    missing: Dict[str, int] = {}
+    for document_id, text_hash in keys:
+        if text_hash in analyses or text_hash in missing:
+            continue
+        entry = entries.get(text_hash)
+
+        if entry is None:
+            missing[text_hash] = document_id
+            continue
+        scan = TextScan(*json.loads(entry.scan))
+        if entry.dictionary_key == automaton.key:
+            analysis = TextAnalysis(scan, json.loads(entry.technologies))
+        else:
+            tokens = _stored_tokens(db, document_id)
+            if tokens is None:
+                tokens = tokenize(get_document_text(db, document_id) or "").tokens
+            analysis = TextAnalysis(scan, automaton.find(tokens))
+            db.query(DocumentAnalysis).filter(DocumentAnalysis.id == entry.id).update({
+                DocumentAnalysis.technologies: json.dumps(analysis.technologies),
+                DocumentAnalysis.dictionary_key: automaton.key
+            }, synchronize_session=False)
+            db.commit()
+        analyses[text_hash] = analysis
+
+    if missing:
+        analyses.update(_analyze_missing(db, missing, automaton, deadline))
+
+    return AnalysisResults(
+        [analyses[text_hash] for _, text_hash in keys if text_hash in analyses],
+        [document_id for document_id, text_hash in keys if text_hash in missing and text_hash not in analyses]
+    )
+
+
+def purge_stale_analyses(db: Session) -> int:
+    """Drop analyses from other analyzer versions or of texts no document has; returns rows deleted"""
+    referenced = db.query(Document.text_hash).filter(Document.text_hash.isnot(None))
+    deleted = db.query(DocumentAnalysis).filter(or_(
+        DocumentAnalysis.analyzer_version != ANALYZER_VERSION,
+        DocumentAnalysis.text_hash.notin_(referenced)
+    )).delete(synchronize_session=False)
+    db.commit()
+    return deleted
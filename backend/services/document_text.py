@@ -0,0 +1,156 @@
+"""
+Compressed storage for document text.
+Full text lives in the document_contents table as independently zlib-compressed
+frames of FRAME_BYTES (UTF-8) each, so a byte range can be served by fetching
+and inflating only the frames it overlaps. Document rows keep just a short
+preview and byte/word counts for listings.
+
+Setting or copying text also refreshes the document's normalized token
+stream (services.document_tokens) and its text hash.
+"""
+
+import hashlib
+import json
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import Document, DocumentContent, DocumentPage
+from services.document_tokens import set_document_tokens, copy_document_tokens
+
+# Uncompressed bytes per frame
+FRAME_BYTES = 256 * 1024
+
+# Characters kept on the Document row for listings
+PREVIEW_CHARS = 300
+
+
+def make_preview(text: str) -> str:
+    """First PREVIEW_CHARS characters with whitespace collapsed"""
+    return " ".join(text[:PREVIEW_CHARS * 2].split())[:PREVIEW_CHARS].rstrip()
+
+
+def set_document_text(document: Document, text: Optional[str]):
+    """Replace a document's text (compressed) and refresh its preview, counts and tokens"""
+    if text is None:
+        document.content = None
+        document.content_preview = None
+        document.content_bytes = None
+        document.content_words = None
+        document.text_hash = None
+        set_document_tokens(document, None)
+        return
+
+    data = text.encode("utf-8")
+    frames = [zlib.compress(data[i:i + FRAME_BYTES], 6) for i in range(0, len(data), FRAME_BYTES)]
+    if document.content is None:
+        document.content = DocumentContent()
+    document.content.data = b"".join(frames)
+    document.content.frame_sizes = json.dumps([len(frame) for frame in frames])
+    document.content_preview = make_preview(text)
+    document.content_bytes = len(data)
+    document.content_words = len(text.split())
+    document.text_hash = hashlib.sha256(data).hexdigest()
+    set_document_tokens(document, text)
+
+
+def copy_document_text(db: Session, source_id: int, document: Document):
+    """Give document the same text as source_id without recompressing"""
+    source = db.query(DocumentContent).filter(DocumentContent.document_id == source_id).first()
+    preview = db.query(
+        Document.content_preview, Document.content_bytes, Document.content_words, Document.text_hash
+    ).filter(Document.id == source_id).first()
+    if source is None or preview is None:
+        set_document_text(document, None)
+        return
+
+    document.content = DocumentContent(data=source.data, frame_sizes=source.frame_sizes)
+    document.content_preview, document.content_bytes, document.content_words, document.text_hash = preview
+    copy_document_tokens(db, source_id, document)
+
+
+def get_document_text(db: Session, document_id: int) -> Optional[str]:
+    """Full text of a document, or None if it has none"""
+    row = db.query(DocumentContent.data, DocumentContent.frame_sizes).filter(
+        DocumentContent.document_id == document_id
+    ).first()
+    if row is None:
+        return None
+    return b"".join(_inflate_frames(row.data, json.loads(row.frame_sizes))).decode("utf-8")
+
+
+def _inflate_frames(data: bytes, frame_sizes: List[int]) -> Iterator[bytes]:
+    offset = 0
+    for size in frame_sizes:
+        yield zlib.decompress(data[offset:offset + size])
+        offset += size
+
+
+def open_document_bytes(db: Session, document_id: int, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Iterator over the UTF-8 text of a document from byte start up to (excluding)
+    end, one frame at a time. Only the compressed frames overlapping the range
+    are read from the database, and they are read up front, so the iterator
+    can outlive the session (e.g. in a StreamingResponse).
+    """
+    row = db.query(DocumentContent.frame_sizes, Document.content_bytes).join(
+        Document, Document.id == DocumentContent.document_id
+    ).filter(DocumentContent.document_id == document_id).first()
+    if row is None:
+        return iter(())
+    frame_sizes = json.loads(row.frame_sizes)
+    total = row.content_bytes or 0
+    end = total if end is None else min(end, total)
+    if start >= end:
+        return iter(())
+
+    first, last = start // FRAME_BYTES, (end - 1) // FRAME_BYTES
+    compressed_start = sum(frame_sizes[:first])
+    compressed_length = sum(frame_sizes[first:last + 1])
+    # SUBSTR on BLOB/bytea is 1-based and byte-addressed
+    data = db.query(
+        func.substr(DocumentContent.data, compressed_start + 1, compressed_length)
+    ).filter(DocumentContent.document_id == document_id).scalar()
+
+    return _slice_frames(data, frame_sizes[first:last + 1], first * FRAME_BYTES, start, end)
+
+
+def _slice_frames(data: bytes, frame_sizes: List[int], position: int, start: int, end: int) -> Iterator[bytes]:
+    for chunk in _inflate_frames(data, frame_sizes):
+        yield chunk[max(start - position, 0):min(end - position, len(chunk))]
+        position += len(chunk)
+
+
+def read_document_bytes(db: Session, document_id: int, start: int, end: int) -> bytes:
+    return b"".join(open_document_bytes(db, document_id, start, end))
+
+
+def build_pages(
+    text: Optional[str],
+    layout: List[Tuple[int, int, int, Optional[str]]]
+) -> List[DocumentPage]:
+    """
+    DocumentPage rows for a (page_number, char_offset, char_length, error) layout,
+    with the matching UTF-8 byte offsets so single pages can be range-read.
+    """
+    pages = []
+    char_position = byte_position = 0
+    for number, offset, length, error in sorted(layout, key=lambda page: page[1]):
+        if text:
+            byte_position += len(text[char_position:offset].encode("utf-8"))
+            byte_length = len(text[offset:offset + length].encode("utf-8"))
+            char_position = offset
+        else:
+            byte_length = 0
+        pages.append(DocumentPage(
+            page_number=number,
+            char_offset=offset,
+            char_length=length,
+            byte_offset=byte_position,
+            byte_length=byte_length,
+            error=error
+        ))
+    pages.sort(key=lambda page: page.page_number)
+    return pages
@@ -0,0 +1,268 @@
+"""
+Ingest-time normalization and token store for document text.
+
+Every time a document's text is set (services.document_text) it is normalized
+once - Unicode NFKC, invisible/bidi characters dropped, quotes and dashes
+unified, Hebrew points removed and acronyms joined as in search - and turned
+into a lowercased token stream with sentence boundaries and detected heading
+lines. The result is stored compactly in document_tokens: a per-document
+vocabulary plus uint32 arrays of token ids and sentence ends, all zlib
+compressed, so strategy generation, search and similarity features can reuse
+it without re-parsing the text.
+
+Bump NORMALIZER_VERSION when the output changes; stored streams from older
+versions are rebuilt in the background on startup (start_token_backfill);
+until then, readers fall back to tokenizing the text.
+"""
+
+import json
+import re
+import threading
+import unicodedata
+import zlib
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Document, DocumentTokens
+from services.search import normalize_search_text
+
+NORMALIZER_VERSION = 2
+
+# Longest line treated as a heading candidate
+MAX_HEADING_CHARS = 120
+
+_CLEANUP = {
+    # Soft hyphen, zero-width and bidi control characters, BOM
+    **{ord(c): None for c in "\u00ad\u200b\u200c\u200d\u200e\u200f\u202a\u202b\u202c\u202d\u202e"
+                             "\u2066\u2067\u2068\u2069\ufeff"},
+    **{ord(c): "'" for c in "\u2018\u2019\u201a\u201b\u2032"},
+    **{ord(c): '"' for c in "\u201c\u201d\u201e\u201f\u2033"},
+    **{ord(c): "-" for c in "\u2010\u2011\u2012\u2212"},
+    **{ord(c): " - " for c in "\u2013\u2014\u2015"},  # En/em dashes separate words
+    **{c: " " for c in range(32) if chr(c) not in "\n\t"},
+}
+
+# Words keep inner ./-/'/+/# joins: "ci/cd", "node.js", "c++", "o'brien", "v2.1", and a
+# leading "." at the start of a word (".net"), which makes it a different word
+TOKEN = re.compile(r"(?:(?<![\w.])\.)?[^\W_]+(?:[.'/+#-][^\W_]+)*[+#]*")
+# Only the first character of a punctuation run may start a match (no quadratic retries on "....x")
+SENTENCE_END = re.compile(r"(?<![.!?])[.!?]+(?=\s|$)")
+ABBREVIATIONS = {"e.g", "i.e", "etc", "vs", "mr", "mrs", "dr", "no", "fig", "approx"}
+
+MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+(.+?)\s*#*$")
+NUMBERED_HEADING = re.compile(r"^\d+(?:\.\d+)*\.?\s+(?=\S)")
+LIST_ITEM = re.compile("^(?:[-*\u2022\u25aa\u25e6]|\\(?[a-z0-9]\\))\\s")
+
+
+class TokenStream(NamedTuple):
+    tokens: List[str]
+    sentence_ends: List[int]  # Exclusive token index ending each sentence
+    headings: List[Tuple[int, str]]  # (token index where the heading starts, heading text)
+
+
+class StoredTokens(NamedTuple):
+    vocabulary: List[str]
+    token_ids: array
+    sentence_ends: array
+    headings: List[Tuple[int, str]]
+
+    def tokens(self) -> Iterator[str]:
+        vocabulary = self.vocabulary
+        return (vocabulary[token_id] for token_id in self.token_ids)
+
+    def sentences(self) -> Iterator[List[str]]:
+        start = 0
+        for end in self.sentence_ends:
+            yield [self.vocabulary[token_id] for token_id in self.token_ids[start:end]]
+            start = end
+
+
+def normalize_text(text: str) -> str:
+    """Unicode cleanup applied before tokenizing"""
+    text = unicodedata.normalize("NFKC", text.replace("\r\n", "\n").replace("\r", "\n"))
+    return normalize_search_text(text.translate(_CLEANUP))
+
+
+def _heading(line: str, previous_blank: bool) -> Optional[str]:
+    """The heading text if this (stripped, non-empty) line looks like a heading"""
+    if len(line) > MAX_HEADING_CHARS:
+        return None
+    match = MARKDOWN_HEADING.match(line)
+    if match:
+        return match.group(1)
+    numbered = NUMBERED_HEADING.match(line)
+    title = line[numbered.end():] if numbered else line
+    if LIST_ITEM.match(line) or " | " in line or title[-1] in ".,;:!?" or SENTENCE_END.search(title):
+        return None
+    if numbered and len(line.split()) <= 12:
+        return line
+    # A short stand-alone line starting with a capital (or Hebrew) letter
+    first = line[0]
+    if previous_blank and len(line.split()) <= 8 and (first.isupper() or "\u05D0" <= first <= "\u05EA"):
+        return line
+    return None
+
+
+def tokenize(text: str) -> TokenStream:
+    """Normalize text and split it into lowercased tokens, sentences and headings"""
+    tokens: List[str] = []
+    sentence_ends: List[int] = []
+    headings: List[Tuple[int, str]] = []
+
+    def end_sentence():
+        if tokens and (not sentence_ends or sentence_ends[-1] < len(tokens)):
+            sentence_ends.append(len(tokens))
+
+    previous_blank = True
+    for line in normalize_text(text).split("\n"):
+        stripped = line.strip()
+        if not stripped:
+            end_sentence()
+            previous_blank = True
+            continue
+
+        heading = _heading(stripped, previous_blank)
+        if heading or LIST_ITEM.match(stripped):
+            end_sentence()  # Headings and list items never continue a sentence
+        if heading:
+            headings.append((len(tokens), heading))
+            tokens.extend(word.lower() for word in TOKEN.findall(stripped))
+            end_sentence()
+            previous_blank = False
+            continue
+
+        position = 0
+        for end in SENTENCE_END.finditer(stripped):
+            words = TOKEN.findall(stripped, position, end.start())
+            tokens.extend(word.lower() for word in words)
+            if words and words[-1].lower() not in ABBREVIATIONS:
+                end_sentence()
+            position = end.end()
+        tokens.extend(word.lower() for word in TOKEN.findall(stripped, position))
+        previous_blank = False
+
+    end_sentence()
+    return TokenStream(tokens, sentence_ends, headings)
+
+
+def _pack(values) -> bytes:
+    return zlib.compress(array("I", values).tobytes(), 6)
+
+
+def _unpack(data: bytes) -> array:
+    values = array("I")
+    values.frombytes(zlib.decompress(data))
+    return values
+
+
+def set_document_tokens(document: Document, text: Optional[str]):
+    """Rebuild a document's token stream for its new text (in place, like its content row)"""
+    if text is None:
+        document.tokens = None
+        return
+
+    stream = tokenize(text)
+    ids: Dict[str, int] = {}
+    token_ids = [ids.setdefault(token, len(ids)) for token in stream.tokens]
+    if document.tokens is None:
+        document.tokens = DocumentTokens()
+    document.tokens.normalizer_version = NORMALIZER_VERSION
+    document.tokens.token_count = len(token_ids)
+    document.tokens.vocabulary = zlib.compress("\n".join(ids).encode("utf-8"), 6)
+    document.tokens.token_ids = _pack(token_ids)
+    document.tokens.sentence_ends = _pack(stream.sentence_ends)
+    document.tokens.headings = json.dumps(stream.headings, ensure_ascii=False)
+
+
+def copy_document_tokens(db: Session, source_id: int, document: Document):
+    """Give document the same token stream as source_id without re-tokenizing"""
+    source = db.query(DocumentTokens).filter(DocumentTokens.document_id == source_id).first()
+    if source is None:
+        document.tokens = None
+        return
+    document.tokens = DocumentTokens(
+        normalizer_version=source.normalizer_version,
+        token_count=source.token_count,
+        vocabulary=source.vocabulary,
+        token_ids=source.token_ids,
+        sentence_ends=source.sentence_ends,
+        headings=source.headings
+    )
+
+
+def load_document_tokens(db: Session, document_id: int) -> Optional[StoredTokens]:
+    """A document's stored token stream, or None if it has none (or an outdated one)"""
+    row = db.query(DocumentTokens).filter(
+        DocumentTokens.document_id == document_id,
+        DocumentTokens.normalizer_version == NORMALIZER_VERSION
+    ).first()
+    if row is None:
+        return None
+    vocabulary = zlib.decompress(row.vocabulary).decode("utf-8")
+    return StoredTokens(
+        vocabulary=vocabulary.split("\n") if vocabulary else [],
+        token_ids=_unpack(row.token_ids),
+        sentence_ends=_unpack(row.sentence_ends),
+        headings=[tuple(heading) for heading in json.loads(row.headings)]
+    )
+
+
+def load_document_vocabulary(db: Session, document_id: int) -> Optional[Set[str]]:
+    """Distinct tokens of a document, without unpacking its token stream"""
+    row = db.query(DocumentTokens.vocabulary).filter(
+        DocumentTokens.document_id == document_id,
+        DocumentTokens.normalizer_version == NORMALIZER_VERSION
+    ).first()
+    if row is None:
+        return None
+    vocabulary = zlib.decompress(row.vocabulary).decode("utf-8")
+    return set(vocabulary.split("\n")) if vocabulary else set()
+
+
+def backfill_document_tokens(batch_size: int = 50):
+    """Build token streams for documents that have text but none (or an outdated one)"""
+    from services.document_text import get_document_text
+
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            documents = db.query(Document).outerjoin(
+                DocumentTokens, DocumentTokens.document_id == Document.id
+            ).filter(
+                Document.id > last_id,
+                Document.content_bytes.isnot(None),
+                or_(DocumentTokens.document_id.is_(None), DocumentTokens.normalizer_version != NORMALIZER_VERSION)
+            ).order_by(Document.id).limit(batch_size).all()
+            if not documents:
+                break
+            for document in documents:
+                set_document_tokens(document, get_document_text(db, document.id))
+            try:
+                db.commit()
+            except IntegrityError:
+                # A document was (re)extracted meanwhile and has a current stream;
+                # redo the batch, which no longer includes it
+                db.rollback()
+                continue
+            last_id = documents[-1].id
+    finally:
+        db.close()
+
+
+def start_token_backfill() -> threading.Thread:
+    """Run backfill_document_tokens in the background (a whole archive can take a while)"""
+    def run():
+        try:
+            backfill_document_tokens()
+        except Exception as e:
+            print(f"Token backfill failed: {e}")
+
+    thread = threading.Thread(target=run, daemon=True, name="token-backfill")
+    thread.start()
+    return thread
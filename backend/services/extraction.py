@@ -0,0 +1,485 @@
+"""
+Background text extraction for uploaded documents.
+CPU-bound parsing (PyPDF2 / python-docx) runs in a process pool so it never
+blocks the API event loop; results are written back to the Document row when
+each job finishes.
+
+PDFs are split into page ranges extracted in parallel across the pool; the
+per-page layout (offset/length into content_text) is stored as DocumentPage
+rows, and a page that fails to parse is recorded on that page only.
+
+Every stored result is also split into search chunks (services.search).
+
+Successful results are saved to the extraction cache, which is checked before
+any job is queued.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+from database import SessionLocal
+from models import Document
+from services.document_text import set_document_text, build_pages
+from services.search import index_document, page_spans
+from services.extraction_cache import get_cached_extraction, store_extraction
+from services.file_parser import ChunkSpan, extract_document, parser_for
+from services.parsers.pdf_parser import count_pdf_pages, extract_pdf_pages, join_pdf_pages
+
+# Document.extraction_status values
+EXTRACTION_PENDING = "pending"
+EXTRACTION_DONE = "done"
+EXTRACTION_FAILED = "failed"
+
+# Worker processes; defaults to one per core
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "0")) or (os.cpu_count() or 1)
+
+# Pages per PDF extraction job
+PDF_PAGES_PER_JOB = int(os.getenv("PDF_PAGES_PER_JOB", "20"))
+
+# Called with True once a job's result is stored, False if it failed or was cancelled
+DoneCallback = Callable[[bool], None]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pending_jobs = 0
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """Lazily create the shared extraction pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded server process is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown_extraction_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _replace_broken_pool(broken: ProcessPoolExecutor):
+    """Drop a pool one of whose workers died (e.g. out of memory); the next job starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(fn: Callable, *args) -> Tuple[ProcessPoolExecutor, Future]:
+    """Submit a job to the pool, replacing the pool once if it is broken"""
+    pool = get_extraction_pool()
+    try:
+        return pool, pool.submit(fn, *args)
+    except BrokenProcessPool:
+        _replace_broken_pool(pool)
+        pool = get_extraction_pool()
+        return pool, pool.submit(fn, *args)
+
+
+def _worker_died(pool: ProcessPoolExecutor, future: Future) -> bool:
+    """Whether a finished job failed only because a worker of its pool died (the pool is then replaced)"""
+    if future.cancelled() or not isinstance(future.exception(), BrokenProcessPool):
+        return False
+    _replace_broken_pool(pool)
+    return True
+
+
+def pending_extraction_jobs() -> int:
+    """Number of documents with extraction queued or running in this process"""
+    return _pending_jobs
+
+
+def _finish_job():
+    global _pending_jobs
+    with _pool_lock:
+        _pending_jobs -= 1
+
+
+def _write_result(
+    document_id: int,
+    content_hash: Optional[str],
+    file_ext: str,
+    content_text: Optional[str],
+    error: Optional[str],
+    pages: Optional[List[Tuple[int, int, int, Optional[str]]]] = None,
+    spans: Optional[List[ChunkSpan]] = None,
+    cache: bool = True,
+    reextract: bool = False
+) -> bool:
+    """
+    Write an extraction result back to its document, and to any other pending
+    document with the same content hash (runs on the pool's callback thread),
+    and index it for search. Returns whether text was stored.
+    
+    A failed re-extraction leaves documents that already have text untouched.
+    """
+    if content_text is None and error is None:
+        error = "No text could be extracted from the file"
+    if spans is None and pages:
+        spans = page_spans(pages)
+    parser_name, parser_version = parser_for(file_ext) or (None, None)
+
+    db = SessionLocal()
+    try:
+        if cache and content_hash and error is None:
+            store_extraction(db, content_hash, file_ext, content_text, pages, spans)
+
+        query = db.query(Document)
+        if content_hash:
+            query = query.filter(or_(
+                Document.id == document_id,
+                and_(Document.content_hash == content_hash, Document.extraction_status == EXTRACTION_PENDING)
+            ))
+        else:
+            query = query.filter(Document.id == document_id)
+
+        # Documents deleted while extracting simply aren't matched
+        for document in query.all():
+            if error and reextract and document.content_bytes is not None:
+                continue
+            set_document_text(document, content_text)
+            document.extraction_status = EXTRACTION_FAILED if error else EXTRACTION_DONE
+            document.extraction_error = error
+            document.parser_name, document.parser_version = parser_name, parser_version
+            document.pages = build_pages(content_text, pages or [])
+            index_document(document, content_text, spans)
+        db.commit()
+        return error is None
+    finally:
+        db.close()
+
+
+def _store_result(
+    document_id: int,
+    content_hash: Optional[str],
+    file_ext: str,
+    pool: ProcessPoolExecutor,
+    future: Future,
+    retry: Optional[Callable[[], None]],
+    on_done: Optional[DoneCallback] = None,
+    reextract: bool = False
+):
+    """Done-callback for a whole-file extraction job; retry resubmits it (once) if its worker died"""
+    _finish_job()
+    if retry is not None and _worker_died(pool, future):
+        retry()
+        return
+    if future.cancelled():
+        if on_done:
+            on_done(False)
+        return
+
+    try:
+        (content_text, spans), error = future.result(), None
+    except Exception as e:
+        content_text, spans, error = None, None, str(e)[:1000]
+    stored = False
+    try:
+        stored = _write_result(document_id, content_hash, file_ext, content_text, error, spans=spans, reextract=reextract)
+    finally:
+        if on_done:
+            on_done(stored)
+
+
+class _PdfJob:
+    """Collects page-range results for one PDF and stores them when the last range finishes"""
+
+    def __init__(
+        self,
+        document_id: int,
+        file_path: str,
+        content_hash: Optional[str],
+        ranges: int,
+        on_done: Optional[DoneCallback] = None,
+        reextract: bool = False
+    ):
+        self.document_id = document_id
+        self.file_path = file_path
+        self.content_hash = content_hash
+        self.on_done = on_done
+        self.reextract = reextract
+        self.remaining = ranges
+        self.pages = []
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def submit_range(self, start: int, end: int, retried: bool = False):
+        pool, future = _submit(extract_pdf_pages, self.file_path, start, end)
+        future.add_done_callback(lambda f: self.range_done(pool, start, end, f, retried))
+
+    def range_done(self, pool: ProcessPoolExecutor, start: int, end: int, future: Future, retried: bool = False):
+        if not retried and _worker_died(pool, future):
+            # Another job may have crashed the worker; give this range one more go
+            try:
+                self.submit_range(start, end, retried=True)
+                return
+            except BrokenProcessPool as e:
+                self.range_failed(start, end, e)
+            except RuntimeError:
+                self.abandon(1)  # Pool shut down; the document stays pending
+            return
+        with self.lock:
+            if future.cancelled():
+                self.cancelled = True
+            else:
+                try:
+                    self.pages.extend(future.result())
+                except Exception as e:
+                    # The worker itself failed (e.g. crashed) - fail this range only
+                    self.pages.extend((index + 1, None, str(e)[:500]) for index in range(start, end))
+            self.remaining -= 1
+            if self.remaining:
+                return
+        self._complete()
+
+    def range_failed(self, start: int, end: int, error: Exception):
+        """Record a range that no working pool could take as failed pages"""
+        with self.lock:
+            self.pages.extend((index + 1, None, str(error)[:500]) for index in range(start, end))
+            self.remaining -= 1
+            if self.remaining:
+                return
+        self._complete()
+
+    def abandon(self, ranges: int):
+        """Account for ranges that could not be submitted"""
+        with self.lock:
+            self.cancelled = True
+            self.remaining -= ranges
+            if self.remaining:
+                return
+        self._complete()
+
+    def _complete(self):
+        _finish_job()
+        stored = False
+        try:
+            if self.cancelled:
+                return  # Server shutting down; resumed as pending on next start
+            content_text, layout = join_pdf_pages(self.pages)
+            failed = sum(1 for page in layout if page[3])
+            error = f"{failed} of {len(layout)} pages could not be extracted" if failed else None
+            if content_text is None:
+                stored = _write_result(
+                    self.document_id, self.content_hash, ".pdf", None, error, layout, reextract=self.reextract
+                )
+            else:
+                # Partial text is still usable; page-level errors stay on the pages. It
+                # isn't cached, so a later upload or re-extraction can recover the pages
+                stored = _write_result(
+                    self.document_id, self.content_hash, ".pdf", content_text, None, layout,
+                    cache=not failed, reextract=self.reextract
+                )
+        finally:
+            if self.on_done:
+                self.on_done(stored)
+
+
+def _finish_pdf_early(
+    document_id: int,
+    content_hash: Optional[str],
+    error: Optional[str],
+    on_done: Optional[DoneCallback],
+    reextract: bool
+):
+    """Store the outcome of a PDF that never got to page extraction (unreadable or empty)"""
+    _finish_job()
+    try:
+        _write_result(document_id, content_hash, ".pdf", None, error, [], reextract=reextract)
+    finally:
+        if on_done:
+            on_done(False)
+
+
+def _fan_out_pdf(
+    document_id: int,
+    file_path: str,
+    content_hash: Optional[str],
+    pool: ProcessPoolExecutor,
+    future: Future,
+    retry: Optional[Callable[[], None]],
+    on_done: Optional[DoneCallback] = None,
+    reextract: bool = False
+):
+    """Done-callback for the page count: split the PDF into page ranges across the pool"""
+    if retry is not None and _worker_died(pool, future):
+        _finish_job()
+        retry()
+        return
+    if future.cancelled():
+        _finish_job()
+        if on_done:
+            on_done(False)
+        return
+    try:
+        page_count = future.result()
+    except Exception as e:
+        _finish_pdf_early(document_id, content_hash, f"Could not open PDF: {str(e)[:1000]}", on_done, reextract)
+        return
+    if page_count == 0:
+        _finish_pdf_early(document_id, content_hash, None, on_done, reextract)
+        return
+
+    ranges = [
+        (start, min(start + PDF_PAGES_PER_JOB, page_count))
+        for start in range(0, page_count, PDF_PAGES_PER_JOB)
+    ]
+    job = _PdfJob(document_id, file_path, content_hash, len(ranges), on_done, reextract)
+    submitted = 0
+    try:
+        for start, end in ranges:
+            job.submit_range(start, end)
+            submitted += 1
+    except BrokenProcessPool as e:
+        # Broken again right after being replaced; the rest fail as pages
+        for start, end in ranges[submitted:]:
+            job.range_failed(start, end, e)
+    except RuntimeError:
+        # Pool shut down mid fan-out; the document stays pending
+        job.abandon(len(ranges) - submitted)
+
+
+def _queue_extraction(
+    document_id: int,
+    file_path: str,
+    file_ext: str,
+    content_hash: Optional[str],
+    on_done: Optional[DoneCallback],
+    reextract: bool,
+    retried: bool = False
+) -> Future:
+    """Submit the extraction job for one file; a job whose worker dies is resubmitted once"""
+    global _pending_jobs
+    # Counted before submitting: a fast job's callback can run before submit() returns
+    with _pool_lock:
+        _pending_jobs += 1
+    try:
+        if file_ext == ".pdf":
+            pool, future = _submit(count_pdf_pages, file_path)
+        else:
+            pool, future = _submit(extract_document, file_path, file_ext)
+    except BaseException:
+        _finish_job()
+        raise
+
+    retry = None if retried else (
+        lambda: _requeue_extraction(document_id, file_path, file_ext, content_hash, on_done, reextract)
+    )
+    if file_ext == ".pdf":
+        callback = lambda f: _fan_out_pdf(document_id, file_path, content_hash, pool, f, retry, on_done, reextract)
+    else:
+        callback = lambda f: _store_result(document_id, content_hash, file_ext, pool, f, retry, on_done, reextract)
+    future.add_done_callback(callback)
+    return future
+
+
+def _requeue_extraction(
+    document_id: int,
+    file_path: str,
+    file_ext: str,
+    content_hash: Optional[str],
+    on_done: Optional[DoneCallback],
+    reextract: bool
+):
+    """Resubmit a job whose worker died (runs on the pool's callback thread)"""
+    try:
+        _queue_extraction(document_id, file_path, file_ext, content_hash, on_done, reextract, retried=True)
+    except BrokenProcessPool as e:
+        _fail_unqueued(document_id, content_hash, file_ext, e, on_done, reextract)
+    except RuntimeError:
+        # Pool shut down; the document stays pending and is resumed on next start
+        if on_done:
+            on_done(False)
+
+
+def _fail_unqueued(
+    document_id: int,
+    content_hash: Optional[str],
+    file_ext: str,
+    error: Exception,
+    on_done: Optional[DoneCallback],
+    reextract: bool
+):
+    """Mark a document failed whose job could not be submitted to any working pool"""
+    try:
+        _write_result(
+            document_id, content_hash, file_ext, None, f"Extraction workers unavailable: {error}"[:1000],
+            reextract=reextract
+        )
+    finally:
+        if on_done:
+            on_done(False)
+
+
+def submit_extraction(
+    document_id: int,
+    file_path: str,
+    file_ext: str,
+    content_hash: Optional[str] = None,
+    on_done: Optional[DoneCallback] = None,
+    reextract: bool = False
+) -> Optional[Future]:
+    """
+    Queue text extraction for a stored file; the document row (and pending
+    documents sharing content_hash) is updated when done.
+    
+    Cached results are written immediately and no job is queued (returns None);
+    that includes decompressing and indexing them, so call this from a worker
+    thread, not the event loop. None is also returned when no working pool
+    could take the job and the document was marked failed. on_done is called
+    once the result is stored (or the job failed); reextract keeps a
+    document's existing text if extraction fails.
+    """
+    if content_hash:
+        db = SessionLocal()
+        try:
+            cached = get_cached_extraction(db, content_hash, file_ext)
+        finally:
+            db.close()
+        if cached is not None:
+            content_text, pages, spans = cached
+            _write_result(document_id, content_hash, file_ext, content_text, None, pages, spans, cache=False)
+            if on_done:
+                on_done(True)
+            return None
+
+    try:
+        return _queue_extraction(document_id, file_path, file_ext, content_hash, on_done, reextract)
+    except BrokenProcessPool as e:
+        _fail_unqueued(document_id, content_hash, file_ext, e, on_done, reextract)
+        return None
+
+
+def resume_pending_extractions():
+    """Re-queue documents left pending by a previous run (e.g. server restart)"""
+    db = SessionLocal()
+    try:
+        pending = db.query(Document.id, Document.file_path, Document.file_type, Document.content_hash).filter(
+            Document.extraction_status == EXTRACTION_PENDING
+        ).all()
+    finally:
+        db.close()
+
+    # One job per distinct file; it fills every pending document with that hash
+    seen = set()
+    for document_id, file_path, file_type, content_hash in pending:
+        key = content_hash or document_id
+        if key in seen:
+            continue
+        seen.add(key)
+        submit_extraction(document_id, file_path, f".{file_type}", content_hash)
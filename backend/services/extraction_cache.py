@@ -0,0 +1,87 @@
+"""
+Persistent cache of text extraction results.
+Entries are keyed by (sha256, parser_name, parser_version), so re-uploading or
+re-extracting the same bytes skips parsing, and bumping one parser's version (see
+services.parsers) invalidates only that parser's entries.
+Text is stored zlib-compressed in the extraction_cache table.
+"""
+
+import json
+import zlib
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import ExtractionCacheEntry
+from services.file_parser import ChunkSpan, parser_for
+from services.parsers import registered_parsers
+
+PageLayout = List[Tuple[int, int, int, Optional[str]]]
+
+
+def get_cached_extraction(
+    db: Session, sha256: str, file_ext: str
+) -> Optional[Tuple[str, Optional[PageLayout], Optional[List[ChunkSpan]]]]:
+    """Cached (content_text, page_layout, chunk_layout) for a file, or None on a miss"""
+    parser = parser_for(file_ext)
+    if parser is None:
+        return None
+
+    entry = db.query(
+        ExtractionCacheEntry.content_zlib, ExtractionCacheEntry.page_layout, ExtractionCacheEntry.chunk_layout
+    ).filter(
+        ExtractionCacheEntry.sha256 == sha256,
+        ExtractionCacheEntry.parser_name == parser[0],
+        ExtractionCacheEntry.parser_version == parser[1]
+    ).first()
+    if entry is None:
+        return None
+
+    pages = [tuple(page) for page in json.loads(entry.page_layout)] if entry.page_layout else None
+    spans = [tuple(span) for span in json.loads(entry.chunk_layout)] if entry.chunk_layout else None
+    return zlib.decompress(entry.content_zlib).decode("utf-8"), pages, spans
+
+
+def store_extraction(
+    db: Session,
+    sha256: str,
+    file_ext: str,
+    content_text: str,
+    pages: Optional[PageLayout] = None,
+    spans: Optional[List[ChunkSpan]] = None
+):
+    """Cache an extraction result. Runs in the caller's transaction; the caller commits."""
+    parser = parser_for(file_ext)
+    if parser is None:
+        return
+
+    try:
+        with db.begin_nested():
+            db.add(ExtractionCacheEntry(
+                sha256=sha256,
+                parser_name=parser[0],
+                parser_version=parser[1],
+                content_zlib=zlib.compress(content_text.encode("utf-8"), 6),
+                page_layout=json.dumps(pages) if pages is not None else None,
+                chunk_layout=json.dumps(spans) if spans is not None else None
+            ))
+    except IntegrityError:
+        pass  # Another job cached the same bytes first
+
+
+def purge_stale_entries() -> int:
+    """Delete entries written by parser versions that are no longer current"""
+    current = [
+        and_(ExtractionCacheEntry.parser_name == parser.name, ExtractionCacheEntry.parser_version == parser.version)
+        for parser in registered_parsers()
+    ]
+    db = SessionLocal()
+    try:
+        deleted = db.query(ExtractionCacheEntry).filter(~or_(*current)).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+    finally:
+        db.close()
@@ -1,99 +1,83 @@
 """
 File parser service for extracting text from uploaded documents.
-Supports PDF, DOCX, and Markdown files.
+Formats are handled by the parser plugins in services.parsers; this module
+joins their chunk stream into a single document string.
 """
 
-import os
-from typing import Optional
+from typing import List, Optional, Tuple
 
+from services.parsers import CHUNK_SEPARATOR, get_parser
 
-def extract_text_from_file(file_path: str, file_ext: str) -> Optional[str]:
+# (offset, length, heading, page, table) of each parser chunk in the joined text
+ChunkSpan = Tuple[int, int, Optional[str], Optional[int], Optional[str]]
+
+
+def parser_for(file_ext: str) -> Optional[Tuple[str, int]]:
+    """(parser_name, parser_version) used for a file extension, or None if unsupported"""
+    parser = get_parser(file_ext)
+    return (parser.name, parser.version) if parser else None
+
+
+def extract_text_from_file(file_path: str, file_ext: str, sha256: Optional[str] = None) -> Optional[str]:
     """
     Extract text content from a file based on its extension.
     
     Args:
         file_path: Path to the file
         file_ext: File extension (e.g., '.pdf', '.docx')
+        sha256: Hash of the file; when given, the extraction cache is consulted
+            first and filled on a miss
     
     Returns:
         Extracted text content or None if extraction fails
     """
-    try:
-        if file_ext == '.pdf':
-            return extract_from_pdf(file_path)
-        elif file_ext in ['.docx', '.doc']:
-            return extract_from_docx(file_path)
-        elif file_ext == '.md':
-            return extract_from_markdown(file_path)
-        elif file_ext == '.txt':
-            return extract_from_text(file_path)
-        else:
-            return None
-    except Exception as e:
-        print(f"Error extracting text from {file_path}: {e}")
-        return None
-
-
-def extract_from_pdf(file_path: str) -> Optional[str]:
-    """Extract text from PDF file"""
-    try:
-        from PyPDF2 import PdfReader
-        
-        reader = PdfReader(file_path)
-        text_parts = []
-        
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                text_parts.append(text)
-        
-        return "\n\n".join(text_parts) if text_parts else None
-    except Exception as e:
-        print(f"PDF extraction error: {e}")
-        return None
-
-
-def extract_from_docx(file_path: str) -> Optional[str]:
-    """Extract text from Word document"""
-    try:
-        from docx import Document
+    if sha256:
+        from database import SessionLocal
+        from services.extraction_cache import get_cached_extraction, store_extraction
         
-        doc = Document(file_path)
-        text_parts = []
-        
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                text_parts.append(paragraph.text)
-        
-        # Also extract from tables
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = [cell.text.strip() for cell in row.cells if cell.text.strip()]
-                if row_text:
-                    text_parts.append(" | ".join(row_text))
-        
-        return "\n\n".join(text_parts) if text_parts else None
-    except Exception as e:
-        print(f"DOCX extraction error: {e}")
-        return None
-
-
-def extract_from_markdown(file_path: str) -> Optional[str]:
-    """Extract text from Markdown file"""
+        db = SessionLocal()
+        try:
+            cached = get_cached_extraction(db, sha256, file_ext)
+            if cached is not None:
+                return cached[0]
+            content_text = extract_text_from_file(file_path, file_ext)
+            if content_text is not None:
+                store_extraction(db, sha256, file_ext, content_text)
+                db.commit()
+            return content_text
+        finally:
+            db.close()
+    
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        return extract_document(file_path, file_ext)[0]
     except Exception as e:
-        print(f"Markdown extraction error: {e}")
+        print(f"Error extracting text from {file_path}: {e}")
         return None
 
 
-def extract_from_text(file_path: str) -> Optional[str]:
-    """Extract text from plain text file"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    except Exception as e:
-        print(f"Text extraction error: {e}")
-        return None
-
+def extract_document(file_path: str, file_ext: str) -> Tuple[Optional[str], List[ChunkSpan]]:
+    """
+    Extract text plus the location and metadata of every parser chunk in it,
+    so the text can later be split for search along the parser's structure.
+    Parser errors propagate to the caller.
+    
+    Returns:
+        (content_text or None, [(offset, length, heading, page, table), ...])
+    """
+    parser = get_parser(file_ext)
+    if parser is None:
+        return None, []
+    
+    parts = []
+    spans = []
+    offset = 0
+    for chunk in parser.parse(file_path):
+        if not chunk.text.strip():
+            continue
+        if parts:
+            offset += len(CHUNK_SEPARATOR)
+        parts.append(chunk.text)
+        spans.append((offset, len(chunk.text), chunk.heading, chunk.page, chunk.table))
+        offset += len(chunk.text)
+    
+    return (CHUNK_SEPARATOR.join(parts) if parts else None), spans
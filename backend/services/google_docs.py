@@ -0,0 +1,221 @@
+"""
+Google Docs ingestion for link documents.
+
+Docs are exported as plain text through one shared httpx.AsyncClient, with at
+most GOOGLE_DOCS_MAX_CONCURRENCY exports in flight. Each export is cached on
+disk by doc id (<id>.txt plus <id>.json holding its ETag / Last-Modified), and
+every later fetch is a conditional GET: a 304 serves the cached text, and a
+network failure falls back to it. Concurrent fetches of the same doc share one
+request, so linking a doc from several projects costs a single download.
+"""
+
+import asyncio
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from database import SessionLocal
+from models import Document
+from services.document_text import get_document_text, set_document_text
+from services.search import index_document
+
+# Export endpoint; {doc_id} is substituted (point it at a stub server for tests)
+GOOGLE_DOCS_EXPORT_URL = os.getenv(
+    "GOOGLE_DOCS_EXPORT_URL", "https://docs.google.com/document/d/{doc_id}/export?format=txt"
+)
+
+# On-disk export cache (kept outside uploads/, which the storage sweeper owns)
+GOOGLE_DOCS_CACHE_DIR = os.getenv("GOOGLE_DOCS_CACHE_DIR", os.path.join("cache", "google_docs"))
+
+# Exports in flight at once across the process
+GOOGLE_DOCS_MAX_CONCURRENCY = int(os.getenv("GOOGLE_DOCS_MAX_CONCURRENCY", "4"))
+
+GOOGLE_DOCS_TIMEOUT = 30
+
+_DOC_ID_PATTERNS = [
+    re.compile(r'docs\.google\.com/document/d/([a-zA-Z0-9_-]+)'),
+    re.compile(r'drive\.google\.com/file/d/([a-zA-Z0-9_-]+)'),
+    re.compile(r'drive\.google\.com/open\?id=([a-zA-Z0-9_-]+)'),
+]
+
+_client: Optional[httpx.AsyncClient] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def is_google_doc_url(url: str) -> bool:
+    return 'docs.google.com' in url or 'drive.google.com' in url
+
+
+def parse_google_doc_id(url: str) -> Optional[str]:
+    """Document ID from the various Google Docs / Drive URL formats"""
+    for pattern in _DOC_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _get_client() -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    """Lazily create the shared client and concurrency limit (on the running loop)"""
+    global _client, _semaphore
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=GOOGLE_DOCS_TIMEOUT, follow_redirects=True)
+        _semaphore = asyncio.Semaphore(GOOGLE_DOCS_MAX_CONCURRENCY)
+    return _client, _semaphore
+
+
+async def close_google_docs_client():
+    global _client, _semaphore
+    if _client is not None:
+        await _client.aclose()
+        _client = _semaphore = None
+
+
+def _cache_paths(doc_id: str) -> Tuple[str, str]:
+    base = os.path.join(GOOGLE_DOCS_CACHE_DIR, doc_id)
+    return base + ".txt", base + ".json"
+
+
+def _read_cache(doc_id: str) -> Optional[Tuple[str, Dict]]:
+    text_path, meta_path = _cache_paths(doc_id)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(text_path, encoding="utf-8") as f:
+            return f.read(), meta
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_cache(doc_id: str, text: str, meta: Dict):
+    """Write text then metadata, each via rename, so readers never see a torn entry"""
+    os.makedirs(GOOGLE_DOCS_CACHE_DIR, exist_ok=True)
+    text_path, meta_path = _cache_paths(doc_id)
+    for path, data in ((text_path, text), (meta_path, json.dumps(meta))):
+        with open(path + ".part", "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(path + ".part", path)
+
+
+async def _fetch(doc_id: str) -> Tuple[Optional[str], Optional[str]]:
+    """(text, error) for one doc, revalidating the cached copy if there is one"""
+    cached = await asyncio.to_thread(_read_cache, doc_id)
+    headers = {}
+    if cached:
+        meta = cached[1]
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    client, semaphore = _get_client()
+    try:
+        async with semaphore:
+            response = await client.get(GOOGLE_DOCS_EXPORT_URL.format(doc_id=doc_id), headers=headers)
+    except httpx.HTTPError as e:
+        if cached:
+            return cached[0], None
+        return None, f"Error fetching document: {str(e) or type(e).__name__}"
+
+    if response.status_code == 304 and cached:
+        return cached[0], None
+    if response.status_code != 200:
+        if cached:
+            return cached[0], None
+        return None, f"Could not fetch document (status {response.status_code}). Make sure it's shared with 'Anyone with the link'"
+
+    text = response.text
+    await asyncio.to_thread(_write_cache, doc_id, text, {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched_at": datetime.utcnow().isoformat()
+    })
+    return text, None
+
+
+async def fetch_google_doc(doc_id: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Export a Google Doc as plain text.
+    Returns (text, error); concurrent calls for the same doc share one fetch.
+    """
+    task = _inflight.get(doc_id)
+    if task is None:
+        task = asyncio.ensure_future(_fetch(doc_id))
+        _inflight[doc_id] = task
+        task.add_done_callback(lambda _: _inflight.pop(doc_id, None))
+    # Shielded: a cancelled caller must not cancel the fetch others are waiting on
+    return await asyncio.shield(task)
+
+
+async def extract_google_doc_content(url: str) -> str:
+    """
+    Text content for a Google Docs URL, or a message explaining why there is none.
+    Works for publicly shared documents (Anyone with the link can view).
+    """
+    doc_id = parse_google_doc_id(url)
+    if not doc_id:
+        return f"Could not extract document ID from URL: {url}"
+
+    text, error = await fetch_google_doc(doc_id)
+    if error:
+        return f"{error}. URL: {url}"
+    if not text or len(text) <= 50:
+        return f"Document appears to be empty or inaccessible. URL: {url}"
+    return text
+
+
+def _link_urls(document_ids: List[int]) -> List[Tuple[int, str]]:
+    db = SessionLocal()
+    try:
+        return db.query(Document.id, Document.file_path).filter(Document.id.in_(document_ids)).all()
+    finally:
+        db.close()
+
+
+def _store_link_texts(texts: Dict[int, str]) -> int:
+    """Update documents whose linked text changed; returns how many did"""
+    db = SessionLocal()
+    updated = 0
+    try:
+        for document in db.query(Document).filter(Document.id.in_(list(texts))).all():
+            text = texts[document.id]
+            if get_document_text(db, document.id) == text:
+                continue
+            set_document_text(document, text)
+            index_document(document, text)
+            updated += 1
+        db.commit()
+        return updated
+    finally:
+        db.close()
+
+
+async def refresh_linked_documents(document_ids: List[int]) -> int:
+    """
+    Re-fetch the Google Docs behind link documents (each doc once, however
+    many documents link it) and store any text that changed. Failed fetches
+    leave the stored text alone. Returns the number of documents updated.
+    """
+    by_doc: Dict[str, List[int]] = {}
+    for document_id, url in await asyncio.to_thread(_link_urls, document_ids):
+        doc_id = parse_google_doc_id(url or "")
+        if doc_id:
+            by_doc.setdefault(doc_id, []).append(document_id)
+
+    doc_ids = list(by_doc)
+    results = await asyncio.gather(*(fetch_google_doc(doc_id) for doc_id in doc_ids))
+
+    texts = {}
+    for doc_id, (text, error) in zip(doc_ids, results):
+        if error or not text or len(text) <= 50:
+            continue
+        for document_id in by_doc[doc_id]:
+            texts[document_id] = text
+    if not texts:
+        return 0
+    return await asyncio.to_thread(_store_link_texts, texts)
@@ -0,0 +1,104 @@
+"""
+HTTP Range header handling for byte-addressed responses.
+"""
+
+import os
+from typing import Optional, Tuple
+
+import anyio
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+
+class RangeNotSatisfiable(Exception):
+    """The requested range lies entirely outside the resource"""
+
+
+def parse_byte_range(range_header: Optional[str], total: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "bytes=..." header into a half-open (start, end) span.
+
+    Returns None when the whole resource should be served (no header, another
+    unit, several ranges or bad syntax - all of which may be ignored per RFC 9110).
+
+    Raises:
+        RangeNotSatisfiable: if the range starts past the end of the resource,
+            or the resource is empty (no range of it is satisfiable)
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.strip().partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            # Suffix range: the last N bytes
+            suffix = int(last)
+            if suffix <= 0 or total == 0:
+                raise RangeNotSatisfiable()
+            return max(total - suffix, 0), total
+        start = int(first)
+        end = int(last) + 1 if last else total
+    except ValueError:
+        return None
+
+    if start >= total:
+        raise RangeNotSatisfiable()
+    if end <= start:
+        return None
+    return start, min(end, total)
+
+
+def content_range(start: int, end: int, total: int) -> str:
+    return f"bytes {start}-{end - 1}/{total}"
+
+
+class RangedFileResponse(FileResponse):
+    """
+    FileResponse for the byte span [start, end) of a file.
+
+    The body goes out through the ASGI "http.response.zerocopysend" extension
+    (sendfile) when the server offers it, and is otherwise read from the
+    file in large chunks starting at the span's offset.
+    """
+    chunk_size = 256 * 1024
+
+    def __init__(self, path: str, start: int, end: int, stat_result: os.stat_result, **kwargs):
+        super().__init__(path, stat_result=stat_result, **kwargs)
+        self.start = start
+        self.end = end
+        self.headers["content-length"] = str(end - start)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        if scope["method"].upper() == "HEAD" or self.start >= self.end:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.fileno(),
+                    "offset": self.start,
+                    "count": self.end - self.start,
+                    "more_body": False
+                })
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.start)
+                remaining = self.end - self.start
+                while remaining:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break  # File shrank underneath us
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        if self.background is not None:
+            await self.background()
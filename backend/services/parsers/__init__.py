@@ -0,0 +1,118 @@
+"""
+Document parser registry.
+
+Each parser turns a file into a stream of TextChunk objects (text plus
+heading/page/table metadata) so consumers can process documents with bounded
+memory. Parsers live in modules named *_parser in this package and register
+themselves with @register_parser; adding a format means adding a module,
+not editing a dispatcher.
+"""
+
+import importlib
+import pkgutil
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Separator between chunks in a document's joined text
+CHUNK_SEPARATOR = "\n\n"
+
+# Soft upper bound on a single chunk; parsers split longer blocks
+MAX_CHUNK_CHARS = 8000
+
+
+@dataclass
+class TextChunk:
+    text: str
+    heading: Optional[str] = None  # Nearest preceding heading
+    page: Optional[int] = None  # 1-based page, for paginated formats
+    table: Optional[str] = None  # Table or sheet the chunk belongs to
+
+
+@dataclass(frozen=True)
+class Parser:
+    name: str
+    # Bump when the parser's output changes; invalidates its cached extractions
+    version: int
+    extensions: Tuple[str, ...]
+    parse: Callable[[str], Iterator[TextChunk]]
+
+
+_parsers: Dict[str, Parser] = {}
+_loaded = False
+_load_lock = threading.Lock()
+
+
+def register_parser(name: str, version: int, extensions: Iterable[str]):
+    """Decorator registering a parse(file_path) -> Iterator[TextChunk] function"""
+    def decorator(parse: Callable[[str], Iterator[TextChunk]]):
+        parser = Parser(name=name, version=version, extensions=tuple(extensions), parse=parse)
+        for ext in parser.extensions:
+            _parsers[ext] = parser
+        return parse
+    return decorator
+
+
+def _load_plugins():
+    global _loaded
+    if _loaded:
+        return
+    with _load_lock:
+        if not _loaded:
+            for module in pkgutil.iter_modules(__path__):
+                if module.name.endswith("_parser"):
+                    importlib.import_module(f"{__name__}.{module.name}")
+            _loaded = True
+
+
+def get_parser(file_ext: str) -> Optional[Parser]:
+    """Parser registered for a file extension (e.g. '.pdf'), or None"""
+    _load_plugins()
+    return _parsers.get(file_ext.lower())
+
+
+def registered_parsers() -> List[Parser]:
+    _load_plugins()
+    return list({parser.name: parser for parser in _parsers.values()}.values())
+
+
+def supported_extensions() -> List[str]:
+    _load_plugins()
+    return sorted(_parsers)
+
+
+def iter_chunks(file_path: str, file_ext: str) -> Iterator[TextChunk]:
+    """Stream chunks from a file; yields nothing for unsupported extensions"""
+    parser = get_parser(file_ext)
+    if parser is None:
+        return iter(())
+    return parser.parse(file_path)
+
+
+def join_chunks(chunks: Iterable[TextChunk]) -> Optional[str]:
+    """Join chunk text into one document string, or None if there was no text"""
+    parts = [chunk.text for chunk in chunks if chunk.text.strip()]
+    return CHUNK_SEPARATOR.join(parts) if parts else None
+
+
+def split_long_text(text: str, limit: int = MAX_CHUNK_CHARS) -> Iterator[str]:
+    """Split an over-long block on line boundaries (or hard, for single huge lines)"""
+    if len(text) <= limit:
+        yield text
+        return
+    buffer = []
+    size = 0
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if buffer:
+                yield "\n".join(buffer)
+                buffer, size = [], 0
+            yield line[:limit]
+            line = line[limit:]
+        if size + len(line) > limit and buffer:
+            yield "\n".join(buffer)
+            buffer, size = [], 0
+        buffer.append(line)
+        size += len(line) + 1
+    if buffer:
+        yield "\n".join(buffer)
@@ -0,0 +1,174 @@
+"""
+Word (.docx) parser. word/document.xml is read with iterparse straight from
+the zip archive and elements are cleared as they are consumed, so no object
+model is built and memory stays bounded on large, table-heavy documents.
+
+Body paragraphs and tables are emitted in document order; Heading/Title-styled
+paragraphs label the chunks that follow, and each table row becomes one
+" | "-joined chunk tagged with its table (cells merged across rows are
+emitted once). Header parts come first and footer parts last, each distinct
+text once.
+"""
+
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Optional, Set, Tuple
+
+from services.parsers import TextChunk, register_parser, split_long_text
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+
+PARAGRAPH = f"{{{W_NS}}}p"
+TABLE = f"{{{W_NS}}}tbl"
+ROW = f"{{{W_NS}}}tr"
+CELL = f"{{{W_NS}}}tc"
+TEXT = f"{{{W_NS}}}t"
+TAB = f"{{{W_NS}}}tab"
+BREAKS = (f"{{{W_NS}}}br", f"{{{W_NS}}}cr")
+NO_BREAK_HYPHEN = f"{{{W_NS}}}noBreakHyphen"
+STYLE = f"{{{W_NS}}}style"
+STYLE_NAME = f"{{{W_NS}}}name"
+PARAGRAPH_STYLE = f"{{{W_NS}}}pPr/{{{W_NS}}}pStyle"
+VAL = f"{{{W_NS}}}val"
+STYLE_ID = f"{{{W_NS}}}styleId"
+STYLE_TYPE = f"{{{W_NS}}}type"
+# Legacy (VML) duplicate of drawing content such as text boxes
+FALLBACK = f"{{{MC_NS}}}Fallback"
+
+_PART_NUMBER = re.compile(r"(\d*)\.xml$")
+
+
+def _heading_styles(archive: zipfile.ZipFile) -> Set[str]:
+    """Style ids of paragraph styles named Heading N / Title (ids are localized, names are not)"""
+    headings = set()
+    try:
+        styles = archive.open("word/styles.xml")
+    except KeyError:
+        return headings
+    with styles:
+        for _, element in ET.iterparse(styles):
+            if element.tag != STYLE:
+                continue
+            name_element = element.find(STYLE_NAME)
+            name = (name_element.get(VAL, "") if name_element is not None else "").lower()
+            if element.get(STYLE_TYPE) == "paragraph" and (name.startswith("heading") or name == "title"):
+                headings.add(element.get(STYLE_ID))
+            element.clear()
+    return headings
+
+
+def _paragraph_text(element) -> str:
+    parts = []
+    for node in element.iter():
+        tag = node.tag
+        if tag == TEXT:
+            parts.append(node.text or "")
+        elif tag == TAB:
+            parts.append("\t")
+        elif tag in BREAKS:
+            parts.append("\n")
+        elif tag == NO_BREAK_HYPHEN:
+            parts.append("-")
+    return "".join(parts)
+
+
+def _iter_blocks(stream, heading_styles: Set[str]) -> Iterator[Tuple[str, object, object]]:
+    """
+    ("paragraph", text, is_heading) and ("row", cells, table_number) tuples in
+    document order for one WordprocessingML part.
+    """
+    tables = 0
+    table_depth = 0
+    fallback_depth = 0
+    row: Optional[List[str]] = None
+    cell: Optional[List[str]] = None
+
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        tag = element.tag
+        if tag == FALLBACK:
+            fallback_depth += 1 if event == "start" else -1
+            if event == "end":
+                element.clear()
+            continue
+        if fallback_depth:
+            continue
+
+        if event == "start":
+            if tag == TABLE:
+                table_depth += 1
+                if table_depth == 1:
+                    tables += 1
+            elif tag == ROW and table_depth == 1:
+                row = []
+            elif tag == CELL and table_depth == 1:
+                cell = []
+            continue
+
+        if tag == PARAGRAPH:
+            text = _paragraph_text(element)
+            style = element.find(PARAGRAPH_STYLE)
+            is_heading = style is not None and style.get(VAL) in heading_styles
+            # Cleared so an enclosing paragraph (text box host) doesn't repeat it
+            element.clear()
+            if table_depth:
+                if cell is not None:
+                    cell.append(text)
+            elif text.strip():
+                yield "paragraph", text, is_heading
+        elif tag == CELL and table_depth == 1 and cell is not None:
+            text = " ".join(" ".join(cell).split())
+            if text and row is not None:
+                row.append(text)
+            cell = None
+            element.clear()
+        elif tag == ROW and table_depth == 1 and row is not None:
+            if row:
+                yield "row", row, tables
+            row = None
+            element.clear()
+        elif tag == TABLE:
+            table_depth -= 1
+            element.clear()
+
+
+def _part_names(archive: zipfile.ZipFile, kind: str) -> List[str]:
+    """word/header1.xml, word/header2.xml, ... in numeric order"""
+    names = [name for name in archive.namelist() if name.startswith(f"word/{kind}") and name.endswith(".xml")]
+    return sorted(names, key=lambda name: int(_PART_NUMBER.search(name).group(1) or 0))
+
+
+def _header_footer_chunks(archive: zipfile.ZipFile, kind: str, heading_styles: Set[str]) -> Iterator[TextChunk]:
+    label = kind.capitalize()
+    seen = set()
+    for name in _part_names(archive, kind):
+        with archive.open(name) as part:
+            lines = [
+                " ".join(value.split()) if block == "paragraph" else " | ".join(value)
+                for block, value, _ in _iter_blocks(part, heading_styles)
+            ]
+        text = "\n".join(line for line in lines if line)
+        if text and text not in seen:
+            seen.add(text)
+            yield TextChunk(text=text, heading=label)
+
+
+@register_parser("docx", version=3, extensions=[".docx", ".doc"])
+def parse_docx(file_path: str) -> Iterator[TextChunk]:
+    with zipfile.ZipFile(file_path) as archive:
+        heading_styles = _heading_styles(archive)
+        yield from _header_footer_chunks(archive, "header", heading_styles)
+
+        heading: Optional[str] = None
+        with archive.open("word/document.xml") as content:
+            for block, value, extra in _iter_blocks(content, heading_styles):
+                if block == "row":
+                    yield TextChunk(text=" | ".join(value), heading=heading, table=f"Table {extra}")
+                    continue
+                if extra:
+                    heading = value.strip()
+                for part in split_long_text(value):
+                    yield TextChunk(text=part, heading=heading)
+
+        yield from _header_footer_chunks(archive, "footer", heading_styles)
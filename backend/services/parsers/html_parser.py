@@ -0,0 +1,111 @@
+"""
+HTML parser (stdlib html.parser). The file is fed to the parser in blocks, so
+memory stays bounded; text is flushed at block-level tags, h1-h6 become
+headings and table rows become " | "-joined chunks tagged with their table.
+"""
+
+from html.parser import HTMLParser
+from typing import Iterator, List, Optional
+
+from services.parsers import TextChunk, register_parser, split_long_text
+
+READ_SIZE = 64 * 1024
+
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "header", "footer", "li", "ul", "ol", "br",
+    "blockquote", "pre", "dd", "dt", "figcaption", "main", "aside", "nav", "hr",
+}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+SKIP_TAGS = {"script", "style", "noscript", "template", "head"}
+
+
+class _ChunkingParser(HTMLParser):
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chunks: List[TextChunk] = []
+        self.text: List[str] = []
+        self.heading: Optional[str] = None
+        self.in_heading = False
+        self.skip_depth = 0
+        self.tables = 0
+        self.table_depth = 0
+        self.row: Optional[List[str]] = None
+        self.cell: Optional[List[str]] = None
+
+    def _flush(self):
+        text = " ".join("".join(self.text).split())
+        self.text = []
+        if not text:
+            return
+        if self.in_heading:
+            self.heading = text
+        for part in split_long_text(text):
+            self.chunks.append(TextChunk(text=part, heading=self.heading))
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == "table":
+            self._flush()
+            self.table_depth += 1
+            if self.table_depth == 1:
+                self.tables += 1
+        elif tag == "tr" and self.table_depth:
+            self.row = []
+        elif tag in ("td", "th") and self.row is not None:
+            self.cell = []
+        elif tag in HEADING_TAGS:
+            self._flush()
+            self.in_heading = True
+        elif tag in BLOCK_TAGS and self.cell is None:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(self.skip_depth - 1, 0)
+        elif tag in ("td", "th") and self.cell is not None:
+            cell = " ".join("".join(self.cell).split())
+            if cell and self.row is not None:
+                self.row.append(cell)
+            self.cell = None
+        elif tag == "tr" and self.row is not None:
+            if self.row:
+                self.chunks.append(TextChunk(
+                    text=" | ".join(self.row), heading=self.heading, table=f"Table {self.tables}"
+                ))
+            self.row = None
+        elif tag == "table":
+            self.table_depth = max(self.table_depth - 1, 0)
+        elif tag in HEADING_TAGS:
+            self._flush()
+            self.in_heading = False
+        elif tag in BLOCK_TAGS and self.cell is None:
+            self._flush()
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.cell is not None:
+            self.cell.append(data)
+        elif self.row is None:
+            self.text.append(data)
+
+    def drain(self) -> List[TextChunk]:
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+
+@register_parser("html", version=1, extensions=[".html", ".htm"])
+def parse_html(file_path: str) -> Iterator[TextChunk]:
+    parser = _ChunkingParser()
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            block = f.read(READ_SIZE)
+            if not block:
+                break
+            parser.feed(block)
+            yield from parser.drain()
+    parser.close()
+    parser._flush()
+    yield from parser.drain()
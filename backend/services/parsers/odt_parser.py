@@ -0,0 +1,83 @@
+"""
+OpenDocument text (.odt) parser. content.xml is read with iterparse straight
+from the zip archive and elements are cleared as they are consumed, so memory
+stays bounded; text:h elements become headings and table rows become
+" | "-joined chunks tagged with their table.
+"""
+
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Optional
+
+from services.parsers import TextChunk, register_parser, split_long_text
+
+TEXT_NS = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+TABLE_NS = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+
+HEADING = f"{{{TEXT_NS}}}h"
+PARAGRAPH = f"{{{TEXT_NS}}}p"
+TABLE = f"{{{TABLE_NS}}}table"
+ROW = f"{{{TABLE_NS}}}table-row"
+CELL = f"{{{TABLE_NS}}}table-cell"
+TAB = f"{{{TEXT_NS}}}tab"
+LINE_BREAK = f"{{{TEXT_NS}}}line-break"
+SPACES = f"{{{TEXT_NS}}}s"
+
+
+def _element_text(element) -> str:
+    """Text of a paragraph, honouring ODF tab/space/line-break elements"""
+    parts = [element.text or ""]
+    for child in element:
+        if child.tag == TAB:
+            parts.append("\t")
+        elif child.tag == LINE_BREAK:
+            parts.append("\n")
+        elif child.tag == SPACES:
+            parts.append(" " * int(child.get(f"{{{TEXT_NS}}}c", "1")))
+        else:
+            parts.append(_element_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+@register_parser("odt", version=1, extensions=[".odt"])
+def parse_odt(file_path: str) -> Iterator[TextChunk]:
+    heading: Optional[str] = None
+    tables = 0
+    table_depth = 0
+    row: Optional[List[str]] = None
+    
+    with zipfile.ZipFile(file_path) as archive, archive.open("content.xml") as content:
+        for event, element in ET.iterparse(content, events=("start", "end")):
+            tag = element.tag
+            if event == "start":
+                if tag == TABLE:
+                    table_depth += 1
+                    if table_depth == 1:
+                        tables += 1
+                elif tag == ROW and table_depth == 1:
+                    row = []
+                continue
+            
+            if tag == TABLE:
+                table_depth -= 1
+                element.clear()
+            elif tag == CELL and row is not None:
+                cell = " ".join(_element_text(element).split())
+                if cell:
+                    row.append(cell)
+                element.clear()
+            elif tag == ROW and row is not None:
+                if row:
+                    yield TextChunk(text=" | ".join(row), heading=heading, table=f"Table {tables}")
+                row = None
+                element.clear()
+            elif tag in (HEADING, PARAGRAPH) and not table_depth:
+                text = _element_text(element).strip()
+                element.clear()
+                if not text:
+                    continue
+                if tag == HEADING:
+                    heading = text
+                for part in split_long_text(text):
+                    yield TextChunk(text=part, heading=heading)
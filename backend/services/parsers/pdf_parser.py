@@ -0,0 +1,78 @@
+"""
+PDF parser (PyPDF2). One chunk per page; pages are extracted independently so
+a corrupt page only loses itself. The page-range helpers are also used by the
+background extractor to spread large PDFs across worker processes.
+"""
+
+from typing import Iterator, List, Optional, Tuple
+
+from services.parsers import CHUNK_SEPARATOR, TextChunk, register_parser
+
+
+@register_parser("pdf", version=3, extensions=[".pdf"])
+def parse_pdf(file_path: str) -> Iterator[TextChunk]:
+    from PyPDF2 import PdfReader
+    
+    reader = PdfReader(file_path)
+    for index in range(len(reader.pages)):
+        try:
+            text = reader.pages[index].extract_text()
+        except Exception as e:
+            print(f"PDF page {index + 1} extraction error: {e}")
+            continue
+        if text and text.strip():
+            yield TextChunk(text=text, page=index + 1)
+
+
+def count_pdf_pages(file_path: str) -> int:
+    """Number of pages in a PDF (reads the page tree only, not page content)"""
+    from PyPDF2 import PdfReader
+    
+    return len(PdfReader(file_path).pages)
+
+
+def extract_pdf_pages(file_path: str, start: int, end: int) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """
+    Extract text from pages [start, end) of a PDF.
+    
+    Returns:
+        List of (page_number, text, error) with 1-based page numbers;
+        text is None when the page failed
+    """
+    from PyPDF2 import PdfReader
+    
+    reader = PdfReader(file_path)
+    results = []
+    for index in range(start, end):
+        try:
+            results.append((index + 1, reader.pages[index].extract_text() or "", None))
+        except Exception as e:
+            results.append((index + 1, None, str(e)[:500]))
+    return results
+
+
+def join_pdf_pages(
+    pages: List[Tuple[int, Optional[str], Optional[str]]]
+) -> Tuple[Optional[str], List[Tuple[int, int, int, Optional[str]]]]:
+    """
+    Join per-page text into one document string (same text as parse_pdf chunks joined).
+    
+    Returns:
+        (content_text, [(page_number, offset, length, error), ...]) where offset and
+        length locate each page's text inside content_text (length 0 for empty or
+        failed pages). content_text is None if no page yielded any text.
+    """
+    text_parts = []
+    layout = []
+    offset = 0
+    for page_number, text, error in sorted(pages, key=lambda page: page[0]):
+        if not text or not text.strip():
+            layout.append((page_number, offset, 0, error))
+            continue
+        if text_parts:
+            offset += len(CHUNK_SEPARATOR)
+        text_parts.append(text)
+        layout.append((page_number, offset, len(text), error))
+        offset += len(text)
+    
+    return (CHUNK_SEPARATOR.join(text_parts) if text_parts else None), layout
@@ -0,0 +1,74 @@
+"""
+Plain text and Markdown parsers. Files are read line by line and emitted as
+blank-line separated blocks; Markdown blocks carry the nearest heading, and
+pipe tables are tagged as tables.
+"""
+
+import re
+from typing import Iterator, List, Optional
+
+from services.parsers import MAX_CHUNK_CHARS, TextChunk, register_parser, split_long_text
+
+MARKDOWN_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)\s*#*\s*$")
+
+
+def _blocks(file_path: str) -> Iterator[List[str]]:
+    """Blank-line separated groups of lines, capped at MAX_CHUNK_CHARS"""
+    block: List[str] = []
+    size = 0
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                if block:
+                    yield block
+                block, size = [], 0
+                continue
+            if size + len(line) > MAX_CHUNK_CHARS and block:
+                yield block
+                block, size = [], 0
+            block.append(line)
+            size += len(line) + 1
+    if block:
+        yield block
+
+
+@register_parser("text", version=2, extensions=[".txt"])
+def parse_text(file_path: str) -> Iterator[TextChunk]:
+    for block in _blocks(file_path):
+        for text in split_long_text("\n".join(block)):
+            yield TextChunk(text=text)
+
+
+@register_parser("markdown", version=2, extensions=[".md"])
+def parse_markdown(file_path: str) -> Iterator[TextChunk]:
+    heading: Optional[str] = None
+    tables = 0
+    in_fence = False
+    for block in _blocks(file_path):
+        lines: List[str] = []
+        for line in block:
+            if line.lstrip().startswith(("```", "~~~")):
+                in_fence = not in_fence
+            match = None if in_fence else MARKDOWN_HEADING.match(line)
+            if match:
+                # A heading starts a new chunk and labels the ones after it
+                if lines:
+                    yield from _markdown_chunks(lines, heading, None)
+                    lines = []
+                heading = match.group(1)
+                yield TextChunk(text=line, heading=heading)
+            else:
+                lines.append(line)
+        if not lines:
+            continue
+        table = None
+        if all(line.lstrip().startswith("|") for line in lines):
+            tables += 1
+            table = f"Table {tables}"
+        yield from _markdown_chunks(lines, heading, table)
+
+
+def _markdown_chunks(lines: List[str], heading: Optional[str], table: Optional[str]) -> Iterator[TextChunk]:
+    for text in split_long_text("\n".join(lines)):
+        yield TextChunk(text=text, heading=heading, table=table)
@@ -0,0 +1,88 @@
+"""
+Excel (.xlsx) parser. Worksheets are read with iterparse straight from the zip
+archive, one row at a time; each non-empty row becomes a " | "-joined chunk
+tagged with its sheet name. Only the shared-strings table is held in memory.
+"""
+
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Tuple
+
+from services.parsers import TextChunk, register_parser
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+SHARED_STRING = f"{{{MAIN_NS}}}si"
+TEXT = f"{{{MAIN_NS}}}t"
+SHEET = f"{{{MAIN_NS}}}sheet"
+ROW = f"{{{MAIN_NS}}}row"
+CELL = f"{{{MAIN_NS}}}c"
+VALUE = f"{{{MAIN_NS}}}v"
+INLINE_STRING = f"{{{MAIN_NS}}}is"
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as f:
+        for _, element in ET.iterparse(f):
+            if element.tag == SHARED_STRING:
+                # Rich text runs each carry their own <t>
+                strings.append("".join(t.text or "" for t in element.iter(TEXT)))
+                element.clear()
+    return strings
+
+
+def _sheets(archive: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """(sheet name, archive path) in workbook order"""
+    with archive.open("xl/_rels/workbook.xml.rels") as f:
+        targets = {
+            rel.get("Id"): rel.get("Target")
+            for rel in ET.parse(f).getroot().iter(f"{{{PKG_REL_NS}}}Relationship")
+        }
+    with archive.open("xl/workbook.xml") as f:
+        sheets = []
+        for sheet in ET.parse(f).getroot().iter(SHEET):
+            target = targets.get(sheet.get(f"{{{REL_NS}}}id"))
+            if target:
+                path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(f"xl/{target}")
+                sheets.append((sheet.get("name"), path))
+    return sheets
+
+
+def _cell_value(cell, shared: List[str]) -> str:
+    cell_type = cell.get("t")
+    if cell_type == "inlineStr":
+        inline = cell.find(INLINE_STRING)
+        return "".join(t.text or "" for t in inline.iter(TEXT)) if inline is not None else ""
+    value = cell.find(VALUE)
+    if value is None or value.text is None:
+        return ""
+    if cell_type == "s":
+        index = int(value.text)
+        return shared[index] if index < len(shared) else ""
+    if cell_type == "b":
+        return "TRUE" if value.text == "1" else "FALSE"
+    return value.text
+
+
+@register_parser("xlsx", version=1, extensions=[".xlsx"])
+def parse_xlsx(file_path: str) -> Iterator[TextChunk]:
+    with zipfile.ZipFile(file_path) as archive:
+        shared = _shared_strings(archive)
+        for name, path in _sheets(archive):
+            if path not in archive.namelist():
+                continue
+            with archive.open(path) as f:
+                for _, element in ET.iterparse(f):
+                    if element.tag != ROW:
+                        continue
+                    values = [_cell_value(cell, shared).strip() for cell in element.iter(CELL)]
+                    element.clear()
+                    values = [value for value in values if value]
+                    if values:
+                        yield TextChunk(text=" | ".join(values), heading=name, table=name)
@@ -0,0 +1,368 @@
+"""
+Bulk re-extraction of stored documents.
+
+A ReextractionJob re-runs text extraction (services.extraction, reextract
+mode) for every uploaded document matching its filters - file types, project,
+text produced by an outdated parser version, or no text at all. Documents are
+walked in id order on the shared worker pool with at most
+REEXTRACTION_CONCURRENCY of them in flight, and the job backs off while the
+pool is busy with other work, so uploads keep priority. A failed re-extraction
+never replaces text a document already has.
+
+Progress is checkpointed as the highest document id below which everything has
+been processed, together with the counters, so a paused, interrupted or
+crashed job resumes where it stopped. A job can run in the API process
+(admin endpoints) or from scripts/reextract.py. The process running it is
+recorded as the job's owner (host, pid and a per-process token) and keeps a
+heartbeat; another process takes a running job over only once its owner is
+gone - at once for a dead process on the same host (e.g. after a restart),
+otherwise when the heartbeat goes stale. A runner that finds its job taken
+over stops without writing further progress.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Document, ReextractionJob
+from services.extraction import (
+    EXTRACTION_PENDING, EXTRACTION_WORKERS, pending_extraction_jobs, submit_extraction
+)
+from services.parsers import registered_parsers
+
+# Documents re-extracted at once by one job
+REEXTRACTION_CONCURRENCY = int(os.getenv("REEXTRACTION_CONCURRENCY", "0")) or max(1, EXTRACTION_WORKERS // 2)
+
+# Documents loaded per query
+REEXTRACTION_BATCH_SIZE = 200
+
+# Seconds between checkpoint / heartbeat writes
+CHECKPOINT_SECONDS = 5
+
+# A running job whose heartbeat is older than this was interrupted
+STALE_HEARTBEAT = timedelta(minutes=2)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_PAUSED = "paused"
+JOB_DONE = "done"
+JOB_CANCELLED = "cancelled"
+JOB_FAILED = "failed"
+
+# Identifies this process as a job's owner; the token tells it apart from an
+# earlier process that had the same pid (e.g. pid 1 of a restarted container)
+OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:12]}"
+
+_threads: Dict[int, threading.Thread] = {}
+_threads_lock = threading.Lock()
+
+
+def matching_documents(db: Session, filters: Dict):
+    """
+    Query of (id, file_path, file_type, content_hash) for stored documents
+    matching a job's filters: file_types (without dot), project_id,
+    outdated_parser and empty_content. Documents already pending are skipped.
+    """
+    parsers = registered_parsers()
+    extensions = sorted({ext[1:] for parser in parsers for ext in parser.extensions})
+    query = db.query(Document.id, Document.file_path, Document.file_type, Document.content_hash).filter(
+        Document.file_path.isnot(None),
+        Document.file_type.in_(extensions),
+        or_(Document.extraction_status.is_(None), Document.extraction_status != EXTRACTION_PENDING)
+    )
+
+    if filters.get("file_types"):
+        query = query.filter(Document.file_type.in_([t.lower().lstrip(".") for t in filters["file_types"]]))
+    if filters.get("project_id"):
+        query = query.filter(Document.project_id == filters["project_id"])
+
+    conditions = []
+    if filters.get("outdated_parser"):
+        conditions.append(Document.parser_version.is_(None))
+        for parser in parsers:
+            conditions.append(and_(
+                Document.file_type.in_([ext[1:] for ext in parser.extensions]),
+                or_(Document.parser_name != parser.name, Document.parser_version != parser.version)
+            ))
+    if filters.get("empty_content"):
+        conditions.append(or_(Document.content_bytes.is_(None), Document.content_bytes == 0))
+    if conditions:
+        # Either criterion selects a document when both are requested
+        query = query.filter(or_(*conditions))
+    return query
+
+
+def create_reextraction_job(db: Session, filters: Dict) -> ReextractionJob:
+    job = ReextractionJob(
+        status=JOB_QUEUED,
+        filters=json.dumps(filters),
+        total=matching_documents(db, filters).count()
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    """Whether the process that owns a job may still be running it"""
+    if not owner or owner == OWNER:
+        return False  # Nobody, or this process (which starts one runner per job)
+    host, pid, _ = (owner.rsplit(":", 2) + ["", ""])[:3]
+    if host != socket.gethostname() or not pid.isdigit() or int(pid) <= 0:
+        return True  # Another host: only a stale heartbeat tells
+    pid = int(pid)
+    if pid == os.getpid():
+        return False  # An earlier process that had our pid
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists, under another user
+    return True
+
+
+def _claim(db: Session, job_id: int) -> bool:
+    """Make this process the job's owner, unless it is finished or a live process runs it"""
+    job = db.query(
+        ReextractionJob.status, ReextractionJob.owner, ReextractionJob.heartbeat_at
+    ).filter(ReextractionJob.id == job_id).first()
+    db.rollback()
+    if job is None or job.status in (JOB_DONE, JOB_CANCELLED):
+        return False
+    now = datetime.utcnow()
+    if (job.status == JOB_RUNNING and job.heartbeat_at is not None
+            and job.heartbeat_at >= now - STALE_HEARTBEAT and _owner_alive(job.owner)):
+        return False
+
+    # Only if nobody claimed it since we looked
+    claimed = db.query(ReextractionJob).filter(
+        ReextractionJob.id == job_id,
+        ReextractionJob.status == job.status,
+        ReextractionJob.owner.is_(None) if job.owner is None else ReextractionJob.owner == job.owner,
+        ReextractionJob.heartbeat_at.is_(None) if job.heartbeat_at is None
+        else ReextractionJob.heartbeat_at == job.heartbeat_at
+    ).update({
+        ReextractionJob.status: JOB_RUNNING,
+        ReextractionJob.owner: OWNER,
+        ReextractionJob.heartbeat_at: now,
+        ReextractionJob.finished_at: None
+    }, synchronize_session=False)
+    db.commit()
+    return bool(claimed)
+
+
+class _Progress:
+    """Completion bookkeeping shared with the extraction callbacks"""
+
+    def __init__(self, concurrency: int):
+        self.slots = threading.Semaphore(concurrency)
+        self.lock = threading.Lock()
+        self.submitted: List[int] = []
+        self.completed: Dict[int, Optional[str]] = {}  # document id -> error (None on success)
+        self.in_flight = 0
+
+    def started(self, document_id: int):
+        with self.lock:
+            self.submitted.append(document_id)
+            self.in_flight += 1
+
+    def finished(self, document_id: int, error: Optional[str]):
+        with self.lock:
+            self.completed[document_id] = error
+            self.in_flight -= 1
+        self.slots.release()
+
+
+def _checkpoint(db: Session, job: ReextractionJob, progress: _Progress) -> Optional[str]:
+    """
+    Advance the job's cursor over the completed prefix of submitted documents,
+    save counters and heartbeat, and return the job's status (which the
+    admin endpoints may have changed to paused or cancelled). Returns None,
+    writing nothing, if another process has taken the job over.
+    """
+    owner = db.query(ReextractionJob.owner).filter(ReextractionJob.id == job.id).scalar()
+    if owner != OWNER:
+        db.rollback()
+        return None
+
+    with progress.lock:
+        advanced = 0
+        for document_id in progress.submitted:
+            if document_id not in progress.completed:
+                break
+            error = progress.completed.pop(document_id)
+            job.processed += 1
+            if error is None:
+                job.succeeded += 1
+            else:
+                job.failed += 1
+                job.last_error = f"Document {document_id}: {error}"[:1000]
+            job.last_document_id = document_id
+            advanced += 1
+        del progress.submitted[:advanced]
+
+    job.heartbeat_at = datetime.utcnow()
+    db.commit()
+    status = db.query(ReextractionJob.status).filter(ReextractionJob.id == job.id).scalar()
+    if status == JOB_QUEUED:
+        # Paused and resumed before this runner noticed: carry on
+        job.status = status = JOB_RUNNING
+        db.commit()
+    return status
+
+
+def run_reextraction_job(
+    job_id: int,
+    concurrency: int = REEXTRACTION_CONCURRENCY,
+    delay: float = 0.0,
+    on_progress: Optional[Callable[[ReextractionJob], None]] = None
+) -> Optional[str]:
+    """
+    Run (or resume) a job in this thread until it finishes, is paused or
+    cancelled. delay adds a pause between submissions for gentler throttling.
+    Returns the final status, or None if the job could not be claimed or was
+    taken over by another process.
+    """
+    db = SessionLocal()
+    try:
+        if not _claim(db, job_id):
+            return None
+        job = db.get(ReextractionJob, job_id)
+        if job.started_at is None:
+            job.started_at = datetime.utcnow()
+            db.commit()
+        filters = json.loads(job.filters)
+        progress = _Progress(concurrency)
+        status = JOB_RUNNING
+        last_checkpoint = time.monotonic()
+        cursor = job.last_document_id
+
+        def checkpoint() -> Optional[str]:
+            nonlocal last_checkpoint
+            last_checkpoint = time.monotonic()
+            current = _checkpoint(db, job, progress)
+            if on_progress and current is not None:
+                on_progress(job)
+            return current
+
+        def checkpoint_due() -> bool:
+            return time.monotonic() - last_checkpoint >= CHECKPOINT_SECONDS
+
+        while status == JOB_RUNNING:
+            batch = matching_documents(db, filters).filter(
+                Document.id > cursor
+            ).order_by(Document.id).limit(REEXTRACTION_BATCH_SIZE).all()
+            if not batch:
+                break
+            db.rollback()  # Don't hold a read transaction while the batch runs
+            cursor = batch[-1].id
+
+            for document_id, file_path, file_type, content_hash in batch:
+                # Wait for a slot, then yield to other extraction work (uploads) while
+                # the pool is saturated; checkpoints keep the heartbeat fresh and pick
+                # up pause/cancel meanwhile
+                acquired = False
+                while status == JOB_RUNNING and not acquired:
+                    acquired = progress.slots.acquire(timeout=CHECKPOINT_SECONDS)
+                    if not acquired:
+                        status = checkpoint()
+                while status == JOB_RUNNING and pending_extraction_jobs() - progress.in_flight >= EXTRACTION_WORKERS:
+                    time.sleep(0.5)
+                    if checkpoint_due():
+                        status = checkpoint()
+                if status != JOB_RUNNING:
+                    if acquired:
+                        progress.slots.release()
+                    break
+
+                progress.started(document_id)
+                if not os.path.isfile(file_path):
+                    progress.finished(document_id, "Stored file is missing")
+                else:
+                    try:
+                        submit_extraction(
+                            document_id, file_path, f".{file_type}", content_hash,
+                            on_done=lambda stored, document_id=document_id: progress.finished(
+                                document_id, None if stored else "Extraction failed"
+                            ),
+                            reextract=True
+                        )
+                    except Exception as e:
+                        progress.finished(document_id, str(e))
+
+                if checkpoint_due():
+                    status = checkpoint()
+                    if status != JOB_RUNNING:
+                        break
+                if delay:
+                    time.sleep(delay)
+
+        # Let in-flight documents finish so the checkpoint covers them
+        for _ in range(concurrency):
+            while not progress.slots.acquire(timeout=CHECKPOINT_SECONDS):
+                _checkpoint(db, job, progress)
+        if status is not None:
+            status = _checkpoint(db, job, progress)
+
+        if status == JOB_RUNNING:
+            job.status = status = JOB_DONE
+            job.finished_at = datetime.utcnow()
+            db.commit()
+        if on_progress and status is not None:
+            on_progress(job)
+        return status
+    except Exception as e:
+        db.rollback()
+        db.query(ReextractionJob).filter(ReextractionJob.id == job_id, ReextractionJob.owner == OWNER).update({
+            ReextractionJob.status: JOB_FAILED,
+            ReextractionJob.last_error: str(e)[:1000]
+        }, synchronize_session=False)
+        db.commit()
+        raise
+    finally:
+        db.close()
+
+
+def start_reextraction_job(job_id: int) -> bool:
+    """Run a job on a background thread of this process; False if it is already running here"""
+    with _threads_lock:
+        thread = _threads.get(job_id)
+        if thread is not None and thread.is_alive():
+            return False
+        thread = threading.Thread(target=run_reextraction_job, args=(job_id,), daemon=True,
+                                  name=f"reextraction-{job_id}")
+        _threads[job_id] = thread
+        thread.start()
+        return True
+
+
+def set_reextraction_status(db: Session, job: ReextractionJob, status: str):
+    """Pause or cancel a job; its runner stops at the next checkpoint"""
+    job.status = status
+    if status == JOB_CANCELLED:
+        job.finished_at = datetime.utcnow()
+    db.commit()
+
+
+def resume_reextraction_jobs():
+    """Restart jobs left running or queued by a previous process (e.g. server restart)"""
+    db = SessionLocal()
+    try:
+        job_ids = [job_id for job_id, in db.query(ReextractionJob.id).filter(
+            ReextractionJob.status.in_([JOB_QUEUED, JOB_RUNNING])
+        )]
+    finally:
+        db.close()
+    for job_id in job_ids:
+        start_reextraction_job(job_id)
@@ -0,0 +1,220 @@
+"""
+Schedule analysis for cross-team breakdowns.
+Computes per-participant weekly load, overdue / at-risk items and projected
+category finish dates from the ETA and duration of breakdown items.
+
+All per-item work is done with NumPy array operations so a strategy with tens
+of thousands of items is analysed without Python-level nested loops.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.cache import VersionedCache
+
+# Items due within this many days (and not yet completed) are flagged at-risk
+AT_RISK_DAYS = 3
+
+# Results keyed by (strategy_id, breakdown_version, today, weeks)
+schedule_cache = VersionedCache(maxsize=256)
+
+_NO_DATE = np.iinfo(np.int64).min
+
+
+def _to_days(values: Sequence, origin: np.datetime64) -> np.ndarray:
+    """Convert datetimes (or None) to int day offsets from origin; None -> _NO_DATE"""
+    arr = np.array(values, dtype="datetime64[D]")
+    days = (arr - origin).astype(np.int64)
+    days[np.isnat(arr)] = _NO_DATE
+    return days
+
+
+def _to_date(offset: int, origin: date) -> Optional[date]:
+    if offset == _NO_DATE:
+        return None
+    return origin + timedelta(days=int(offset))
+
+
+def compute_schedule(
+    items: List[tuple],
+    categories: List[tuple],
+    today: date,
+    weeks: int = 12
+) -> Dict:
+    """
+    Analyse the schedule of a strategy's breakdown.
+
+    Args:
+        items: Rows of (id, title, category_id, assignee_id, assignee_name,
+               assignee_team, status, priority, eta, duration_days)
+        categories: Rows of (id, name, type, parent_id, eta)
+        today: Reference date for overdue / at-risk checks
+        weeks: Number of weeks of load to report, starting with the current week
+
+    Returns:
+        Dict with 'weeks', 'participant_load', 'overdue', 'at_risk' and 'categories'
+    """
+    origin = np.datetime64(today, "D")
+    week_start = today - timedelta(days=today.weekday())
+    week_origin = np.datetime64(week_start, "D")
+    week_starts = [week_start + timedelta(weeks=w) for w in range(weeks)]
+
+    if items:
+        cols = list(zip(*items))
+    else:
+        cols = [()] * 10
+    ids = np.array(cols[0], dtype=np.int64)
+    category_ids = np.array(cols[2], dtype=np.int64)
+    assignee_ids = np.array([a if a is not None else -1 for a in cols[3]], dtype=np.int64)
+    status = np.array(cols[6], dtype=object).astype(str)
+    eta = _to_days(cols[8], origin)
+    raw_duration = np.array(cols[9], dtype=float)
+    has_duration = ~np.isnan(raw_duration)
+    duration = np.where(has_duration & (raw_duration >= 1), raw_duration, 1).astype(np.int64)
+
+    has_eta = eta != _NO_DATE
+    is_open = status != "completed"
+
+    # ---------- Overdue / at-risk ----------
+    overdue = is_open & has_eta & (eta < 0)
+    planned_start = np.where(has_eta, eta - duration + 1, _NO_DATE)
+    late_start = (status == "not_started") & has_eta & has_duration & (planned_start < 0)
+    at_risk = is_open & ~overdue & (
+        (has_eta & (eta <= AT_RISK_DAYS)) | late_start | (status == "blocked")
+    )
+
+    def flagged(mask: np.ndarray) -> List[Dict]:
+        idx = np.flatnonzero(mask)
+        sort_key = np.where(has_eta[idx], eta[idx], np.iinfo(np.int64).max)
+        idx = idx[np.argsort(sort_key, kind="stable")]
+        return [
+            {
+                "item_id": int(ids[i]),
+                "title": items[i][1],
+                "category_id": int(category_ids[i]),
+                "assignee_id": items[i][3],
+                "assignee_name": items[i][4],
+                "status": items[i][6],
+                "priority": items[i][7],
+                "eta": items[i][8],
+                "days_late": int(-eta[i]) if has_eta[i] and eta[i] < 0 else 0,
+            }
+            for i in idx
+        ]
+
+    # ---------- Weekly load per participant ----------
+    # Each open item with an ETA occupies the days [eta - duration + 1, eta].
+    # Difference arrays + cumsum give per-day occupancy without iterating items.
+    horizon = weeks * 7
+    offset = int((origin - week_origin).astype(np.int64))
+    loaded = is_open & has_eta
+    participant_keys, first_idx, participant_idx = np.unique(
+        assignee_ids[loaded], return_index=True, return_inverse=True
+    )
+
+    starts = np.clip(planned_start[loaded] + offset, 0, horizon)
+    ends = np.clip(eta[loaded] + offset + 1, 0, horizon)
+    visible = ends > starts
+
+    n_participants = len(participant_keys)
+    day_diff = np.zeros((n_participants, horizon + 1), dtype=np.int64)
+    np.add.at(day_diff, (participant_idx[visible], starts[visible]), 1)
+    np.add.at(day_diff, (participant_idx[visible], ends[visible]), -1)
+    item_days = np.cumsum(day_diff[:, :horizon], axis=1).reshape(n_participants, weeks, 7).sum(axis=2)
+
+    week_diff = np.zeros((n_participants, weeks + 1), dtype=np.int64)
+    np.add.at(week_diff, (participant_idx[visible], starts[visible] // 7), 1)
+    np.add.at(week_diff, (participant_idx[visible], (ends[visible] - 1) // 7 + 1), -1)
+    active_items = np.cumsum(week_diff[:, :weeks], axis=1)
+
+    loaded_rows = np.flatnonzero(loaded)
+    participant_load = []
+    for p, key in enumerate(participant_keys):
+        row = items[loaded_rows[first_idx[p]]]
+        participant_load.append({
+            "participant_id": int(key) if key >= 0 else None,
+            "participant_name": row[4] if key >= 0 else None,
+            "participant_team": row[5] if key >= 0 else None,
+            "weekly": [
+                {"week_start": week_starts[w], "item_days": int(item_days[p, w]), "active_items": int(active_items[p, w])}
+                for w in range(weeks)
+            ],
+            "peak_item_days": int(item_days[p].max()) if weeks else 0,
+        })
+
+    # ---------- Projected category finish ----------
+    # Open items finish no earlier than today (+ full duration if not started yet)
+    earliest = np.where(status == "not_started", duration, 0)
+    item_finish = np.where(has_eta, np.maximum(eta, earliest), np.where(has_duration, earliest, _NO_DATE))
+    item_finish = np.where(is_open, item_finish, _NO_DATE)
+
+    cat_cols = list(zip(*categories)) if categories else [()] * 5
+    cat_ids = np.array(cat_cols[0], dtype=np.int64)
+    n_categories = len(cat_ids)
+    order = np.argsort(cat_ids)
+    sorted_ids = cat_ids[order]
+
+    def cat_index(values: np.ndarray) -> np.ndarray:
+        """Map category ids to row positions; unknown ids -> -1"""
+        if not n_categories:
+            return np.full(len(values), -1, dtype=np.int64)
+        pos = np.clip(np.searchsorted(sorted_ids, values), 0, n_categories - 1)
+        return np.where(sorted_ids[pos] == values, order[pos], -1)
+
+    item_cat = cat_index(category_ids)
+    known = item_cat >= 0
+    projected = np.full(n_categories, _NO_DATE, dtype=np.int64)
+    np.maximum.at(projected, item_cat[known], item_finish[known])
+    open_count = np.bincount(item_cat[known & is_open], minlength=n_categories)
+    overdue_count = np.bincount(item_cat[known & overdue], minlength=n_categories)
+    total_count = np.bincount(item_cat[known], minlength=n_categories)
+
+    # Roll sub-categories up into their parents, deepest level first.
+    # Loops run once per tree level, never per item.
+    parent_of = cat_index(np.array([p if p is not None else -1 for p in cat_cols[3]], dtype=np.int64))
+    child_idx = np.flatnonzero(parent_of >= 0)
+    depth = np.zeros(n_categories, dtype=np.int64)
+    for _ in range(n_categories):
+        new_depth = np.zeros(n_categories, dtype=np.int64)
+        new_depth[child_idx] = depth[parent_of[child_idx]] + 1
+        if np.array_equal(new_depth, depth):
+            break
+        depth = new_depth
+    for level in range(int(depth.max()) if n_categories else 0, 0, -1):
+        level_idx = child_idx[depth[child_idx] == level]
+        level_parents = parent_of[level_idx]
+        np.maximum.at(projected, level_parents, projected[level_idx])
+        np.add.at(open_count, level_parents, open_count[level_idx])
+        np.add.at(overdue_count, level_parents, overdue_count[level_idx])
+        np.add.at(total_count, level_parents, total_count[level_idx])
+
+    cat_eta = _to_days(cat_cols[4], origin)
+    category_results = []
+    for c in range(n_categories):
+        finish = _to_date(projected[c], today)
+        planned = categories[c][4]
+        slip = None
+        if finish is not None and cat_eta[c] != _NO_DATE:
+            slip = int(projected[c] - cat_eta[c])
+        category_results.append({
+            "category_id": int(cat_ids[c]),
+            "category_name": categories[c][1],
+            "category_type": categories[c][2],
+            "parent_id": categories[c][3],
+            "eta": planned,
+            "projected_finish": finish,
+            "slip_days": slip,
+            "open_items": int(open_count[c]),
+            "overdue_items": int(overdue_count[c]),
+            "is_complete": bool(total_count[c] > 0 and open_count[c] == 0),
+        })
+
+    return {
+        "weeks": week_starts,
+        "participant_load": participant_load,
+        "overdue": flagged(overdue),
+        "at_risk": flagged(at_risk),
+        "categories": category_results,
+    }
@@ -0,0 +1,360 @@
+"""
+Project-wide full-text search over document chunks.
+
+Document text is split into chunks of up to INDEX_CHUNK_CHARS at ingest
+(following parser chunk boundaries, so chunks keep their heading/page/table)
+and stored in document_chunks, which is indexed by an FTS5 table on SQLite or
+a GIN-indexed tsvector column on PostgreSQL.
+
+Hebrew needs help from both tokenizers: niqqud/cantillation marks split words,
+geresh/gershayim split acronyms (צה״ל), and prefixes (ו, ה, ב, כ, ל, מ, ש) are
+written attached to the word. Each chunk therefore also stores `terms`: the
+normalized and prefix-stripped forms of its Hebrew words that don't appear
+verbatim in the body. Queries are normalized the same way.
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import or_, text as sql_text
+from sqlalchemy.orm import Session
+
+from database import engine, SessionLocal
+from models import Document, DocumentChunk, DocumentPage
+from services.parsers import CHUNK_SEPARATOR
+
+# Target size of an indexed chunk
+INDEX_CHUNK_CHARS = 2000
+
+# Words around each match in a snippet
+SNIPPET_TOKENS = 24
+
+# Match markers in snippets (plain text, safe to render)
+HIGHLIGHT_START = "**"
+HIGHLIGHT_END = "**"
+
+# (offset, length, heading, page, table) of a parser chunk in the document text
+Span = Tuple[int, int, Optional[str], Optional[int], Optional[str]]
+
+HEBREW_MARKS = re.compile("[\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7]")
+HEBREW_ACRONYM_QUOTES = re.compile("(?<=[\u05D0-\u05EA])[\u05F3\u05F4\"'](?=[\u05D0-\u05EA])")
+HEBREW_WORD = re.compile("[\u05D0-\u05EA]{2,}")
+HEBREW_PREFIXES = set("\u05D5\u05D4\u05D1\u05DB\u05DC\u05DE\u05E9")  # ו ה ב כ ל מ ש
+WORD = re.compile(r"\w+")
+
+_fts_available: Optional[bool] = None
+
+
+def normalize_search_text(text: str) -> str:
+    """Strip Hebrew points, join acronyms and split on maqaf, so word forms match"""
+    text = HEBREW_MARKS.sub("", text)
+    text = text.replace("\u05BE", " ")  # Maqaf
+    return HEBREW_ACRONYM_QUOTES.sub("", text)
+
+
+def hebrew_variants(word: str) -> List[str]:
+    """The word with up to three attached prefix letters removed (keeping 3+ letters)"""
+    variants = []
+    for cut in range(1, 4):
+        if len(word) - cut < 3 or word[cut - 1] not in HEBREW_PREFIXES:
+            break
+        variants.append(word[cut:])
+    return variants
+
+
+def search_terms(body: str) -> str:
+    """Extra Hebrew index terms for a chunk body"""
+    if not HEBREW_WORD.search(body):
+        return ""
+    verbatim = set(WORD.findall(body))
+    terms = {}
+    for word in HEBREW_WORD.findall(normalize_search_text(body)):
+        for form in [word] + hebrew_variants(word):
+            if form not in verbatim:
+                terms[form] = None
+    return " ".join(terms)
+
+
+def query_terms(query: str) -> List[str]:
+    return list(dict.fromkeys(word.lower() for word in WORD.findall(normalize_search_text(query))))
+
+
+def page_spans(layout: List[Tuple[int, int, int, Optional[str]]]) -> List[Span]:
+    """Spans for a PDF page layout (page_number, offset, length, error)"""
+    return [(offset, length, None, number, None) for number, offset, length, _ in layout if length]
+
+
+def paragraph_spans(text: str) -> List[Span]:
+    """Spans for text without parser metadata: its CHUNK_SEPARATOR-delimited paragraphs"""
+    spans = []
+    offset = 0
+    for part in text.split(CHUNK_SEPARATOR):
+        if part.strip():
+            spans.append((offset, len(part), None, None, None))
+        offset += len(part) + len(CHUNK_SEPARATOR)
+    return spans
+
+
+def _split_body(body: str) -> List[Tuple[int, str]]:
+    """Split an over-long body near INDEX_CHUNK_CHARS on line or word boundaries"""
+    pieces = []
+    start = 0
+    while len(body) - start > INDEX_CHUNK_CHARS:
+        end = start + INDEX_CHUNK_CHARS
+        cut = body.rfind("\n", start + INDEX_CHUNK_CHARS // 2, end)
+        if cut == -1:
+            cut = body.rfind(" ", start + INDEX_CHUNK_CHARS // 2, end)
+        if cut == -1:
+            cut = end
+        pieces.append((start, body[start:cut]))
+        start = cut
+    pieces.append((start, body[start:]))
+    return pieces
+
+
+def build_index_chunks(text: str, spans: List[Span]) -> List[Tuple[int, Optional[int], Optional[str], Optional[str], str]]:
+    """
+    Merge consecutive spans that share heading/page/table into chunks of up to
+    INDEX_CHUNK_CHARS, splitting longer ones.
+
+    Returns:
+        [(char_offset, page, heading, table, body), ...]
+    """
+    groups = []
+    for offset, length, heading, page, table in sorted(spans, key=lambda span: span[0]):
+        if length <= 0:
+            continue
+        key = (heading, page, table)
+        if groups and groups[-1][0] == key and offset + length - groups[-1][1] <= INDEX_CHUNK_CHARS:
+            groups[-1][2] = offset + length
+        else:
+            groups.append([key, offset, offset + length])
+
+    chunks = []
+    for (heading, page, table), start, end in groups:
+        for relative, body in _split_body(text[start:end]):
+            if body.strip():
+                chunks.append((start + relative, page, heading, table, body))
+    return chunks
+
+
+def index_document(document: Document, text: Optional[str], spans: Optional[List[Span]] = None):
+    """Replace a document's search chunks. Runs in the caller's session; the caller commits."""
+    document.search_indexed = True
+    if not text:
+        document.chunks = []
+        return
+    if spans is None:
+        spans = paragraph_spans(text)
+
+    document.chunks = [
+        DocumentChunk(
+            project_id=document.project_id,
+            chunk_index=index,
+            char_offset=offset,
+            page=page,
+            heading=heading[:300] if heading else None,
+            table_name=table[:200] if table else None,
+            body=body,
+            terms=search_terms(body)
+        )
+        for index, (offset, page, heading, table, body) in enumerate(build_index_chunks(text, spans))
+    ]
+
+
+def copy_document_chunks(db: Session, source_id: int, document: Document):
+    """Give document the same search chunks as source_id without re-chunking"""
+    document.search_indexed = True
+    document.chunks = [
+        DocumentChunk(
+            project_id=document.project_id,
+            chunk_index=chunk.chunk_index,
+            char_offset=chunk.char_offset,
+            page=chunk.page,
+            heading=chunk.heading,
+            table_name=chunk.table_name,
+            body=chunk.body,
+            terms=chunk.terms
+        )
+        for chunk in db.query(DocumentChunk).filter(
+            DocumentChunk.document_id == source_id
+        ).order_by(DocumentChunk.chunk_index)
+    ]
+
+
+def init_search_index():
+    """Create the FTS5 table and sync triggers (SQLite) or tsvector column and GIN index (PostgreSQL)"""
+    global _fts_available
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            try:
+                conn.execute(sql_text("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS document_chunks_fts USING fts5(
+                        body, terms, content='document_chunks', content_rowid='id', tokenize='unicode61'
+                    )
+                """))
+            except Exception as e:
+                print(f"FTS5 unavailable, document search falls back to LIKE: {e}")
+                _fts_available = False
+                return
+            conn.execute(sql_text("""
+                CREATE TRIGGER IF NOT EXISTS document_chunks_ai AFTER INSERT ON document_chunks BEGIN
+                    INSERT INTO document_chunks_fts(rowid, body, terms) VALUES (new.id, new.body, new.terms);
+                END
+            """))
+            conn.execute(sql_text("""
+                CREATE TRIGGER IF NOT EXISTS document_chunks_ad AFTER DELETE ON document_chunks BEGIN
+                    INSERT INTO document_chunks_fts(document_chunks_fts, rowid, body, terms)
+                    VALUES ('delete', old.id, old.body, old.terms);
+                END
+            """))
+            conn.execute(sql_text("""
+                CREATE TRIGGER IF NOT EXISTS document_chunks_au AFTER UPDATE ON document_chunks BEGIN
+                    INSERT INTO document_chunks_fts(document_chunks_fts, rowid, body, terms)
+                    VALUES ('delete', old.id, old.body, old.terms);
+                    INSERT INTO document_chunks_fts(rowid, body, terms) VALUES (new.id, new.body, new.terms);
+                END
+            """))
+            _fts_available = True
+        elif engine.dialect.name == "postgresql":
+            conn.execute(sql_text("""
+                ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS search_vector tsvector
+                GENERATED ALWAYS AS (to_tsvector('simple', body || ' ' || terms)) STORED
+            """))
+            conn.execute(sql_text(
+                "CREATE INDEX IF NOT EXISTS ix_document_chunks_search ON document_chunks USING GIN (search_vector)"
+            ))
+        conn.commit()
+
+
+def _sqlite_fts_available(db: Session) -> bool:
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = db.execute(sql_text(
+            "SELECT 1 FROM sqlite_master WHERE name = 'document_chunks_fts'"
+        )).first() is not None
+    return _fts_available
+
+
+def search_project(db: Session, project_id: int, query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+    """Ranked chunk matches (all query words must match) across a project's documents"""
+    terms = query_terms(query)
+    if not terms:
+        return []
+    params = {"project_id": project_id, "limit": limit, "offset": offset}
+    columns = """
+        c.document_id, d.name AS document_name, d.doc_type, c.page, c.heading,
+        c.table_name, c.char_offset
+    """
+
+    dialect = db.bind.dialect.name
+    if dialect == "sqlite" and _sqlite_fts_available(db):
+        rows = db.execute(sql_text(f"""
+            SELECT {columns},
+                   snippet(document_chunks_fts, 0, :start, :end, '…', :tokens) AS snippet,
+                   -bm25(document_chunks_fts) AS score
+            FROM document_chunks_fts
+            JOIN document_chunks c ON c.id = document_chunks_fts.rowid
+            JOIN documents d ON d.id = c.document_id
+            WHERE document_chunks_fts MATCH :match AND c.project_id = :project_id
+            ORDER BY bm25(document_chunks_fts)
+            LIMIT :limit OFFSET :offset
+        """), {
+            **params,
+            # Quoted terms, implicitly ANDed; quoting keeps user input out of FTS syntax
+            "match": " ".join(f'"{term}"' for term in terms),
+            "start": HIGHLIGHT_START,
+            "end": HIGHLIGHT_END,
+            "tokens": SNIPPET_TOKENS,
+        }).mappings().all()
+        return [dict(row) for row in rows]
+
+    if dialect == "postgresql":
+        rows = db.execute(sql_text(f"""
+            SELECT {columns},
+                   ts_headline('simple', c.body, q, :headline) AS snippet,
+                   ts_rank_cd(c.search_vector, q) AS score
+            FROM document_chunks c
+            JOIN documents d ON d.id = c.document_id,
+                 plainto_tsquery('simple', :query) q
+            WHERE c.search_vector @@ q AND c.project_id = :project_id
+            ORDER BY score DESC
+            LIMIT :limit OFFSET :offset
+        """), {
+            **params,
+            "query": " ".join(terms),
+            "headline": f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords={SNIPPET_TOKENS}, MinWords=8",
+        }).mappings().all()
+        return [dict(row) for row in rows]
+
+    return _search_like(db, project_id, terms, limit, offset)
+
+
+def _search_like(db: Session, project_id: int, terms: List[str], limit: int, offset: int) -> List[Dict]:
+    """Unranked fallback when no full-text index is available"""
+    query = db.query(DocumentChunk, Document.name, Document.doc_type).join(
+        Document, Document.id == DocumentChunk.document_id
+    ).filter(DocumentChunk.project_id == project_id)
+    for term in terms:
+        query = query.filter(
+            DocumentChunk.body.ilike(f"%{term}%") | DocumentChunk.terms.ilike(f"%{term}%")
+        )
+
+    results = []
+    for chunk, name, doc_type in query.order_by(DocumentChunk.id).offset(offset).limit(limit):
+        position = max(chunk.body.lower().find(terms[0]), 0)
+        start = max(position - 80, 0)
+        results.append({
+            "document_id": chunk.document_id,
+            "document_name": name,
+            "doc_type": doc_type,
+            "page": chunk.page,
+            "heading": chunk.heading,
+            "table_name": chunk.table_name,
+            "char_offset": chunk.char_offset,
+            "snippet": ("…" if start else "") + chunk.body[start:start + 200],
+            "score": 0.0,
+        })
+    return results
+
+
+def backfill_search_index(batch_size: int = 50):
+    """Index documents that have text but were never chunked (e.g. stored before search existed)"""
+    from services.document_text import get_document_text
+
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            documents = db.query(Document).filter(
+                Document.id > last_id,
+                Document.content_bytes.isnot(None),
+                or_(Document.search_indexed.is_(None), Document.search_indexed == False),
+                ~Document.chunks.any()
+            ).order_by(Document.id).limit(batch_size).all()
+            if not documents:
+                break
+            for document in documents:
+                text = get_document_text(db, document.id)
+                layout = db.query(
+                    DocumentPage.page_number, DocumentPage.char_offset, DocumentPage.char_length, DocumentPage.error
+                ).filter(DocumentPage.document_id == document.id).all()
+                index_document(document, text, page_spans(layout) if layout else None)
+            last_id = documents[-1].id
+            db.commit()
+    finally:
+        db.close()
+
+
+def start_search_backfill() -> threading.Thread:
+    """Run backfill_search_index in the background; documents are searchable as they are indexed"""
+    def run():
+        try:
+            backfill_search_index()
+        except Exception as e:
+            print(f"Search index backfill failed: {e}")
+
+    thread = threading.Thread(target=run, daemon=True, name="search-backfill")
+    thread.start()
+    return thread
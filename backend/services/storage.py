@@ -0,0 +1,159 @@
+"""
+Upload storage service.
+Streams uploaded files to disk in fixed-size chunks, enforcing a maximum size
+and computing the SHA-256 digest on the fly, so memory per upload stays at
+one chunk regardless of file size.
+
+Stored files are content-addressed (uploads/blobs/<aa>/<sha256><ext>) and
+reference-counted through StoredFile, so identical uploads share one file.
+"""
+
+import hashlib
+import os
+import uuid
+from typing import Optional, Tuple
+
+import aiofiles
+from fastapi import UploadFile
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import StoredFile
+
+UPLOAD_DIR = "uploads"
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")
+TEMP_DIR = os.path.join(UPLOAD_DIR, "tmp")
+
+# Read/write granularity for uploads
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Maximum accepted upload size (MB), configurable per deployment
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE_MB", "250")) * 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_SIZE while streaming"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"File exceeds maximum upload size of {max_size // (1024 * 1024)} MB")
+
+
+async def save_upload_stream(
+    file: UploadFile,
+    dest_dir: str,
+    file_ext: str,
+    max_size: int = MAX_UPLOAD_SIZE,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> Tuple[str, int, str]:
+    """
+    Stream an upload into dest_dir under a unique name.
+
+    The file is written to a temporary ".part" path and renamed into place only
+    once it is complete, so a rejected or failed upload never leaves a file
+    behind under its final name.
+
+    Returns:
+        (file_path, size_in_bytes, sha256_hex)
+
+    Raises:
+        UploadTooLargeError: if the stream exceeds max_size
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    file_path = os.path.join(dest_dir, f"{uuid.uuid4()}{file_ext}")
+    part_path = file_path + ".part"
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(part_path, 'wb') as f:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLargeError(max_size)
+                digest.update(chunk)
+                await f.write(chunk)
+        os.replace(part_path, file_path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+    return file_path, size, digest.hexdigest()
+
+
+def blob_path(sha256: str, file_ext: str) -> str:
+    """Content-addressed location for a file, fanned out by hash prefix"""
+    return os.path.join(BLOB_DIR, sha256[:2], f"{sha256}{file_ext}")
+
+
+def store_blob(db: Session, temp_path: str, size: int, sha256: str, file_ext: str) -> StoredFile:
+    """
+    Move a freshly streamed file into content-addressed storage and take a reference.
+
+    If a blob with the same hash already exists the temp file is discarded and
+    the existing blob's ref_count is incremented. Runs in the caller's
+    transaction; the caller commits.
+    """
+    stored = db.query(StoredFile).filter(StoredFile.sha256 == sha256).first()
+    if stored:
+        updated = db.query(StoredFile).filter(StoredFile.id == stored.id).update(
+            {StoredFile.ref_count: StoredFile.ref_count + 1},
+            synchronize_session=False
+        )
+        if updated:
+            if os.path.exists(stored.file_path):
+                os.remove(temp_path)
+            else:
+                # Row survived but the file went missing - restore it from this upload
+                os.makedirs(os.path.dirname(stored.file_path), exist_ok=True)
+                os.replace(temp_path, stored.file_path)
+            return stored
+        # The last reference was released concurrently; store it afresh below
+
+    final_path = blob_path(sha256, file_ext)
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(temp_path, final_path)
+    try:
+        with db.begin_nested():
+            stored = StoredFile(sha256=sha256, file_path=final_path, file_size=size, ref_count=1)
+            db.add(stored)
+    except IntegrityError:
+        # A concurrent upload of the same bytes created the row first
+        stored = db.query(StoredFile).filter(StoredFile.sha256 == sha256).one()
+        db.query(StoredFile).filter(StoredFile.id == stored.id).update(
+            {StoredFile.ref_count: StoredFile.ref_count + 1},
+            synchronize_session=False
+        )
+    return stored
+
+
+def release_blob(db: Session, file_path: str) -> Optional[str]:
+    """
+    Drop one reference to the blob at file_path.
+
+    Returns the path to delete from disk once the caller has committed (the
+    last reference went away), or None if other documents still use it.
+    Files that predate content-addressed storage are returned for deletion.
+    """
+    stored = db.query(StoredFile).filter(StoredFile.file_path == file_path).with_for_update().first()
+    if stored is None:
+        return file_path
+
+    if stored.ref_count <= 1:
+        db.delete(stored)
+        return file_path
+
+    stored.ref_count -= 1
+    return None
+
+
+def remove_unreferenced_file(db: Session, file_path: str):
+    """Delete a released file from disk unless a new upload re-created its blob meanwhile"""
+    if db.query(StoredFile.id).filter(StoredFile.file_path == file_path).first():
+        return
+    if os.path.exists(file_path):
+        os.remove(file_path)
@@ -0,0 +1,244 @@
+"""
+Orphaned upload garbage collection and storage accounting.
+
+The sweeper walks uploads/ with os.scandir (one directory entry at a time, so
+memory stays flat for hundreds of thousands of files) and checks paths in
+batches against Document.file_path and StoredFile.file_path. Unreferenced
+files older than ORPHAN_GRACE_SECONDS are first moved to
+uploads/.quarantine/<YYYYMMDD>/<original path>, and quarantine days older
+than QUARANTINE_DAYS are deleted. A quarantined file that becomes referenced
+again is restored to its original path.
+
+Each sweep also reconciles StoredFile.ref_count with the documents that
+actually point at each blob, drops stale strategy analyses
+(services.document_analysis) and refreshes the per-project byte totals in
+project_storage_usage.
+"""
+
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Set
+
+from sqlalchemy import func
+
+from database import SessionLocal
+from models import Document, ProjectStorageUsage, StoredFile
+from services.document_analysis import purge_stale_analyses
+from services.storage import UPLOAD_DIR, TEMP_DIR
+
+QUARANTINE_DIR = os.path.join(UPLOAD_DIR, ".quarantine")
+
+# Paths checked against the database per query
+SWEEP_BATCH_SIZE = 500
+
+# Files younger than this are never touched (uploads in flight)
+ORPHAN_GRACE_SECONDS = 3600
+
+# Days a quarantined file is kept before deletion
+QUARANTINE_DAYS = int(os.getenv("QUARANTINE_DAYS", "7"))
+
+# Hours between background sweeps; 0 disables the background sweeper
+STORAGE_SWEEP_INTERVAL_HOURS = float(os.getenv("STORAGE_SWEEP_INTERVAL_HOURS", "6"))
+
+_sweep_lock = threading.Lock()
+last_sweep: Optional[Dict] = None
+
+
+def _iter_files(root: str, skip: Set[str]) -> Iterator[os.DirEntry]:
+    """Depth-first walk yielding regular files, without listing whole trees up front"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.path not in skip:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except FileNotFoundError:
+            continue
+
+
+def _batches(entries: Iterator[os.DirEntry], size: int) -> Iterator[List[os.DirEntry]]:
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _referenced(db, paths: List[str]) -> Set[str]:
+    """Which of these paths a Document or StoredFile still points at"""
+    referenced = {row[0] for row in db.query(Document.file_path).filter(Document.file_path.in_(paths))}
+    referenced.update(row[0] for row in db.query(StoredFile.file_path).filter(StoredFile.file_path.in_(paths)))
+    return referenced
+
+
+def reconcile_ref_counts(db) -> int:
+    """
+    Set StoredFile.ref_count to the number of documents using each blob (in
+    SQL, without loading rows) and drop rows nothing uses; their files are then
+    swept as orphans. Returns the number of rows fixed.
+    """
+    documents = db.query(func.count(Document.id)).filter(
+        Document.file_path == StoredFile.file_path
+    ).scalar_subquery()
+    fixed = db.query(StoredFile).filter(StoredFile.ref_count != documents).update(
+        {StoredFile.ref_count: documents}, synchronize_session=False
+    )
+    db.query(StoredFile).filter(StoredFile.ref_count <= 0).delete(synchronize_session=False)
+    db.commit()
+    return fixed
+
+
+def refresh_project_usage(db):
+    """Recompute per-project file and text byte totals"""
+    totals = db.query(
+        Document.project_id,
+        func.count(Document.file_size),
+        func.coalesce(func.sum(Document.file_size), 0),
+        func.coalesce(func.sum(Document.content_bytes), 0)
+    ).group_by(Document.project_id).all()
+
+    now = datetime.utcnow()
+    db.query(ProjectStorageUsage).delete(synchronize_session=False)
+    for project_id, file_count, file_bytes, text_bytes in totals:
+        db.add(ProjectStorageUsage(
+            project_id=project_id,
+            file_count=file_count,
+            file_bytes=file_bytes,
+            text_bytes=text_bytes,
+            updated_at=now
+        ))
+    db.commit()
+
+
+def _quarantine(path: str, day: str) -> str:
+    target = os.path.join(QUARANTINE_DIR, day, os.path.relpath(path, UPLOAD_DIR))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(path, target)
+    return target
+
+
+def _sweep_uploads(db, stats: Dict):
+    """Quarantine unreferenced files under uploads/ (temp files included once stale)"""
+    cutoff = time.time() - ORPHAN_GRACE_SECONDS
+    day = datetime.utcnow().strftime("%Y%m%d")
+    entries = _iter_files(UPLOAD_DIR, skip={QUARANTINE_DIR})
+
+    for batch in _batches(entries, SWEEP_BATCH_SIZE):
+        stats["scanned"] += len(batch)
+        candidates = []
+        for entry in batch:
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime < cutoff:
+                candidates.append((entry.path, stat.st_size))
+        if not candidates:
+            continue
+
+        # Temp files are never referenced; everything else is checked against the DB
+        referenced = _referenced(db, [path for path, _ in candidates if not path.startswith(TEMP_DIR + os.sep)])
+        for path, size in candidates:
+            if path in referenced:
+                continue
+            try:
+                _quarantine(path, day)
+            except FileNotFoundError:
+                continue  # Deleted concurrently
+            stats["quarantined"] += 1
+            stats["quarantined_bytes"] += size
+
+
+def _purge_quarantine(db, stats: Dict):
+    """
+    Restore quarantined files that are referenced again, and delete the
+    quarantine days that are past retention.
+    """
+    if not os.path.isdir(QUARANTINE_DIR):
+        return
+    expiry = (datetime.utcnow() - timedelta(days=QUARANTINE_DAYS)).strftime("%Y%m%d")
+
+    with os.scandir(QUARANTINE_DIR) as days:
+        day_dirs = sorted((entry.name, entry.path) for entry in days if entry.is_dir())
+
+    for day, day_dir in day_dirs:
+        expired = day < expiry
+        for batch in _batches(_iter_files(day_dir, skip=set()), SWEEP_BATCH_SIZE):
+            originals = {
+                os.path.join(UPLOAD_DIR, os.path.relpath(entry.path, day_dir)): entry for entry in batch
+            }
+            referenced = _referenced(db, list(originals))
+            for original, entry in originals.items():
+                try:
+                    if original in referenced and not os.path.exists(original):
+                        os.makedirs(os.path.dirname(original), exist_ok=True)
+                        os.replace(entry.path, original)
+                        stats["restored"] += 1
+                    elif expired:
+                        size = entry.stat(follow_symlinks=False).st_size
+                        os.remove(entry.path)
+                        stats["deleted"] += 1
+                        stats["deleted_bytes"] += size
+                except FileNotFoundError:
+                    continue
+        if expired:
+            shutil.rmtree(day_dir, ignore_errors=True)
+
+
+def run_storage_sweep() -> Optional[Dict]:
+    """
+    One full reconcile/quarantine/purge/accounting pass.
+    Returns the sweep stats, or None if a sweep is already running.
+    """
+    global last_sweep
+    if not _sweep_lock.acquire(blocking=False):
+        return None
+    stats = {
+        "started_at": datetime.utcnow(),
+        "finished_at": None,
+        "scanned": 0,
+        "quarantined": 0,
+        "quarantined_bytes": 0,
+        "restored": 0,
+        "deleted": 0,
+        "deleted_bytes": 0,
+        "ref_counts_fixed": 0,
+    }
+    db = SessionLocal()
+    try:
+        stats["ref_counts_fixed"] = reconcile_ref_counts(db)
+        purge_stale_analyses(db)
+        if os.path.isdir(UPLOAD_DIR):
+            _sweep_uploads(db, stats)
+            _purge_quarantine(db, stats)
+        refresh_project_usage(db)
+        stats["finished_at"] = datetime.utcnow()
+        last_sweep = stats
+        return stats
+    finally:
+        db.close()
+        _sweep_lock.release()
+
+
+def quarantine_usage() -> Dict[str, int]:
+    """Files and bytes currently held in quarantine"""
+    files = size = 0
+    if os.path.isdir(QUARANTINE_DIR):
+        for entry in _iter_files(QUARANTINE_DIR, skip=set()):
+            try:
+                size += entry.stat(follow_symlinks=False).st_size
+                files += 1
+            except FileNotFoundError:
+                continue
+    return {"files": files, "bytes": size}
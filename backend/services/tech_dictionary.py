@@ -0,0 +1,202 @@
+"""
+Technology dictionary and matcher for strategy generation.
+
+The dictionary lives in the technologies table (name, category, aliases) and
+is seeded from data/technologies.json on first start. Names and aliases are
+tokenized exactly like document text (services.document_tokens) and compiled
+into one Aho-Corasick automaton whose alphabet is tokens, so every spelling
+matches whole words only - "api" never matches inside "capital", "node" never
+inside "anode" - and multi-word names such as "spring boot" match as phrases.
+A document's token stream is matched in a single pass whose cost depends on
+the number of tokens, not on the size of the dictionary.
+
+Spellings are matched exactly as listed: there are no automatic plurals
+("nodes" is not Node.js, "reacts" not React), so entries list the plural
+forms they want matched as aliases ("APIs").
+
+The compiled automaton is cached per process and rebuilt only when the
+table's fingerprint (row count, latest update) changes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Technology
+from services.document_tokens import NORMALIZER_VERSION, tokenize
+
+SEED_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "technologies.json")
+
+# Bump when spellings match differently; part of every automaton's key
+MATCHER_VERSION = 2
+
+# Joined tokens the dictionary doesn't know are matched by their parts ("react/redux", "spring-boot")
+_TOKEN_JOINS = re.compile(r"[/-]")
+
+_lock = threading.Lock()
+_cached: Optional[Tuple[Tuple, "TechAutomaton"]] = None
+_default: Optional["TechAutomaton"] = None
+
+
+def spellings(name: str, aliases: Iterable[str]) -> Iterator[Tuple[str, ...]]:
+    """Token sequences matching one technology: its name and each alias"""
+    for spelling in [name, *aliases]:
+        tokens = tuple(tokenize(spelling).tokens)
+        if tokens:
+            yield tokens
+
+
+class TechAutomaton:
+    """Aho-Corasick automaton over tokens for a list of (name, aliases) entries"""
+
+    def __init__(self, entries: List[Tuple[str, List[str]]]):
+        self.entries = entries  # Rebuilds the automaton in analysis workers
+        self.names = [name for name, _ in entries]
+        # Identifies the dictionary, and how it is matched, in results computed with
+        # it (services.document_analysis)
+        self.key = hashlib.sha256(
+            json.dumps([MATCHER_VERSION, NORMALIZER_VERSION, entries]).encode("utf-8")
+        ).hexdigest()
+        self.goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[Tuple[int, int]]] = [[]]  # (spelling length in tokens, entry index)
+
+        for index, (name, aliases) in enumerate(entries):
+            for tokens in spellings(name, aliases):
+                state = 0
+                for token in tokens:
+                    next_state = self.goto[state].get(token)
+                    if next_state is None:
+                        next_state = len(self.goto)
+                        self.goto.append({})
+                        outputs.append([])
+                        self.goto[state][token] = next_state
+                    state = next_state
+                # The first entry claiming a spelling keeps it
+                if not outputs[state]:
+                    outputs[state].append((len(tokens), index))
+
+        # Failure links breadth-first; each state also reports its suffixes' matches
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(token, 0)
+                outputs[next_state] = outputs[next_state] + outputs[self.fail[next_state]]
+                queue.append(next_state)
+        self.outputs = outputs
+        self.alphabet = set().union(*self.goto)
+
+    def _feed(self, tokens: Iterable[str]) -> Iterator[str]:
+        alphabet = self.alphabet
+        for token in tokens:
+            if token in alphabet or not _TOKEN_JOINS.search(token):
+                yield token
+            else:
+                yield from (part for part in _TOKEN_JOINS.split(token) if part)
+
+    def find(self, tokens: Iterable[str]) -> List[str]:
+        """
+        Names of the technologies mentioned in a token stream, in order of first
+        mention. Where spellings overlap the longest wins ("kafka streams" is
+        Kafka Streams, not also Kafka).
+        """
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        spans = []  # (start, -length, entry index)
+        state = 0
+        position = 0
+        for token in self._feed(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            position += 1
+            for length, index in outputs[state]:
+                spans.append((position - length, -length, index))
+
+        found: Dict[int, None] = {}
+        covered = 0
+        for start, negative_length, index in sorted(spans):
+            if start >= covered:
+                found.setdefault(index)
+                covered = start - negative_length
+        return [self.names[index] for index in found]
+
+
+def _fingerprint(db: Session) -> Tuple:
+    return tuple(db.query(func.count(Technology.id), func.max(Technology.updated_at)).one())
+
+
+def get_tech_automaton(db: Session) -> TechAutomaton:
+    """The automaton for the active dictionary, rebuilt only if the table changed"""
+    global _cached
+    fingerprint = _fingerprint(db)
+    cached = _cached
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    with _lock:
+        if _cached is not None and _cached[0] == fingerprint:
+            return _cached[1]
+        rows = db.query(Technology.name, Technology.aliases).filter(
+            Technology.is_active == True
+        ).order_by(Technology.id).all()
+        automaton = TechAutomaton([(name, json.loads(aliases or "[]")) for name, aliases in rows])
+        _cached = (fingerprint, automaton)
+        return automaton
+
+
+def _seed_entries() -> List[Dict]:
+    with open(SEED_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def default_tech_automaton() -> TechAutomaton:
+    """Automaton for the bundled seed dictionary (callers without a database)"""
+    global _default
+    if _default is None:
+        _default = TechAutomaton([(entry["name"], entry.get("aliases", [])) for entry in _seed_entries()])
+    return _default
+
+
+def import_technologies(db: Session, entries: Iterable[Dict]) -> Tuple[int, int]:
+    """
+    Upsert dictionary entries ({"name", "category", "aliases"}) by
+    case-insensitive name. Returns (created, updated).
+    """
+    existing = {technology.name.lower(): technology for technology in db.query(Technology).all()}
+    created = updated = 0
+    for entry in entries:
+        name = entry["name"].strip()
+        aliases = json.dumps(sorted({alias.strip() for alias in entry.get("aliases") or [] if alias.strip()}))
+        technology = existing.get(name.lower())
+        if technology is None:
+            technology = Technology(name=name, category=entry.get("category"), aliases=aliases)
+            db.add(technology)
+            existing[name.lower()] = technology
+            created += 1
+        elif technology.aliases != aliases or technology.category != entry.get("category", technology.category):
+            technology.aliases = aliases
+            technology.category = entry.get("category", technology.category)
+            updated += 1
+    db.commit()
+    return created, updated
+
+
+def seed_technologies():
+    """Fill an empty dictionary from the bundled seed file"""
+    db = SessionLocal()
+    try:
+        if db.query(Technology.id).first() is None:
+            import_technologies(db, _seed_entries())
+    finally:
+        db.close()
@@ -0,0 +1,176 @@
+"""
+Single-pass scanner feeding the strategy content generator.
+
+A document's text is walked once, line by line, with patterns compiled at
+import: bullet and numbered list items, capitalized phrases and names after
+feature/module/service/... prefixes are picked up per line, and requirements
+are sentences (segmented as the lines go by) containing a modal verb. Each
+category keeps only its first few items (all the generator shows), and the
+walk stops as soon as every category is full.
+
+Every pattern is applied to a single line and cannot backtrack more than
+linearly, so the scan is linear in the text length whatever the input - long
+period-free tables or code, dot leaders, very long lines.
+
+Scans of several documents merge into what one scan of their concatenated
+text would give; items never span documents.
+"""
+
+import re
+from typing import Iterable, Iterator, List, NamedTuple
+
+from services.document_tokens import ABBREVIATIONS
+
+# Items kept per category
+MAX_BULLETS = 15
+MAX_NUMBERED = 15
+MAX_REQUIREMENTS = 10
+MAX_CAPITALIZED = 20
+MAX_PREFIXED = 10
+
+# List items shorter than this are noise ("- Yes", "1. N/A")
+MIN_ITEM_CHARS = 6
+
+# Longer "sentences" are unpunctuated runs (pasted tables, code), not requirements
+MAX_SENTENCE_CHARS = 1000
+
+BULLET = re.compile(r'[ \t]*(?:[-*][ \t]+|•[ \t]*)(\S.*)')
+NUMBERED = re.compile(r'[ \t]*\d+[.)][ \t]+(\S.*)')
+CAPITALIZED_PHRASE = re.compile(r'\b[A-Z][a-zA-Z]+(?:[ \t]+[A-Z][a-zA-Z]+)*\b')
+NAME_AFTER_PREFIX = re.compile(r'(?:feature|module|component|service|api|endpoint|function)[ \t:]+([^.]+)', re.I)
+# Only the first character of a punctuation run may start a match (no quadratic retries on "....")
+SENTENCE_END = re.compile(r'(?<![.!?])[.!?]+(?=\s|$)')
+MODAL = re.compile(r'\b(?:shall|must|should|will|needs? to)\b', re.I)
+WORD = re.compile(r'\w')
+
+
+class TextScan(NamedTuple):
+    bullets: List[str]
+    numbered: List[str]
+    requirements: List[str]
+    capitalized: List[str]
+    prefixed: List[str]
+
+    @property
+    def features(self) -> List[str]:
+        return self.bullets + self.numbered
+
+    @property
+    def keywords(self) -> List[str]:
+        """Capitalized phrases then prefixed names, first occurrence of each"""
+        return list(dict.fromkeys(self.capitalized + self.prefixed))
+
+
+def _lines(text: str) -> Iterator[str]:
+    """Lines of text without splitting it all up front (the scan usually stops early)"""
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+class _Requirements:
+    """Sentence segmentation over a stream of lines, keeping sentences with a modal verb"""
+
+    def __init__(self):
+        self.found: List[str] = []
+        self.parts: List[str] = []
+        self.chars = 0
+        self.in_code = False
+
+    @property
+    def full(self) -> bool:
+        return len(self.found) >= MAX_REQUIREMENTS
+
+    def end_sentence(self):
+        if self.parts and self.chars <= MAX_SENTENCE_CHARS:
+            sentence = " ".join(" ".join(self.parts).split())
+            match = MODAL.search(sentence)
+            # The modal has to be followed by what is required
+            if match and WORD.search(sentence, match.end()):
+                self.found.append(sentence)
+        self.parts = []
+        self.chars = 0
+
+    def _add(self, text: str):
+        self.chars += len(text)
+        if self.chars <= MAX_SENTENCE_CHARS:
+            self.parts.append(text)
+
+    def feed(self, line: str):
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            self.in_code = not self.in_code
+            self.end_sentence()
+            return
+        # Blank lines, headings, table rows and code never continue a sentence
+        if self.in_code or not stripped or stripped[0] in "#|" or " | " in stripped:
+            self.end_sentence()
+            return
+
+        item = BULLET.match(stripped) or NUMBERED.match(stripped)
+        if item:
+            self.end_sentence()
+            stripped = item.group(1)
+
+        position = 0
+        for end in SENTENCE_END.finditer(stripped):
+            self._add(stripped[position:end.end()])
+            last_word = stripped[position:end.start()].rsplit(None, 1)[-1:]
+            if not last_word or last_word[0].lstrip("(\"'").lower() not in ABBREVIATIONS:
+                self.end_sentence()
+            position = end.end()
+        if position < len(stripped):
+            self._add(stripped[position:])
+
+
+def scan_text(text: str) -> TextScan:
+    """List items, requirements and keywords of one document, in one pass"""
+    bullets: List[str] = []
+    numbered: List[str] = []
+    capitalized: List[str] = []
+    prefixed: List[str] = []
+    requirements = _Requirements()
+
+    for line in _lines(text):
+        lists_open = len(bullets) < MAX_BULLETS or len(numbered) < MAX_NUMBERED
+        if lists_open:
+            match = BULLET.match(line)
+            if match:
+                item = match.group(1).strip()
+                if len(bullets) < MAX_BULLETS and len(item) >= MIN_ITEM_CHARS:
+                    bullets.append(item)
+            else:
+                match = NUMBERED.match(line)
+                if match:
+                    item = match.group(1).strip()
+                    if len(numbered) < MAX_NUMBERED and len(item) >= MIN_ITEM_CHARS:
+                        numbered.append(item)
+
+        if len(capitalized) < MAX_CAPITALIZED:
+            capitalized.extend(CAPITALIZED_PHRASE.findall(line)[:MAX_CAPITALIZED - len(capitalized)])
+        if len(prefixed) < MAX_PREFIXED:
+            prefixed.extend(NAME_AFTER_PREFIX.findall(line)[:MAX_PREFIXED - len(prefixed)])
+
+        if not requirements.full:
+            requirements.feed(line)
+        elif not lists_open and len(capitalized) >= MAX_CAPITALIZED and len(prefixed) >= MAX_PREFIXED:
+            break
+    if not requirements.full:
+        requirements.end_sentence()
+
+    return TextScan(bullets, numbered, requirements.found[:MAX_REQUIREMENTS], capitalized, prefixed)
+
+
+def merge_scans(scans: Iterable[TextScan]) -> TextScan:
+    """Combine per-document scans in document order, keeping each category's limit"""
+    merged = TextScan([], [], [], [], [])
+    limits = TextScan(MAX_BULLETS, MAX_NUMBERED, MAX_REQUIREMENTS, MAX_CAPITALIZED, MAX_PREFIXED)
+    for scan in scans:
+        for items, new_items, limit in zip(merged, scan, limits):
+            items.extend(new_items[:limit - len(items)])
+    return merged
@@ -0,0 +1,73 @@
+"""
+Helpers for the per-strategy breakdown version counter.
+Any change to a strategy's categories, items or their assignees bumps
+TestStrategy.breakdown_version so derived results (schedule, caches, HTTP
+ETags) can be keyed on it instead of rescanning the breakdown.
+"""
+
+from typing import Optional
+
+from fastapi import Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import TestStrategy
+
+
+def bump_breakdown_version(db: Session, strategy_id: Optional[int] = None, project_id: Optional[int] = None):
+    """
+    Increment breakdown_version for one strategy, or for every strategy of a project.
+    Runs in the caller's transaction; the caller commits.
+    """
+    query = db.query(TestStrategy)
+    if strategy_id is not None:
+        query = query.filter(TestStrategy.id == strategy_id)
+    elif project_id is not None:
+        query = query.filter(TestStrategy.project_id == project_id)
+    else:
+        return
+
+    # Keep updated_at untouched: editing the breakdown is not editing the strategy text
+    query.update(
+        {
+            TestStrategy.breakdown_version: func.coalesce(TestStrategy.breakdown_version, 0) + 1,
+            TestStrategy.updated_at: TestStrategy.updated_at,
+        },
+        synchronize_session=False
+    )
+
+
+def breakdown_etag(db: Session, strategy_id: int) -> Optional[str]:
+    """
+    Weak ETag for anything derived from a strategy's breakdown.
+    Costs a single primary-key lookup; returns None if the strategy doesn't exist.
+    """
+    row = db.query(TestStrategy.breakdown_version).filter(TestStrategy.id == strategy_id).first()
+    if row is None:
+        return None
+    return f'W/"breakdown-{strategy_id}-{row[0] or 0}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return opaque(etag) in {opaque(tag) for tag in if_none_match.split(",")}
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response for a matching If-None-Match"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    # Let clients cache, but revalidate on every poll
+    response.headers["Cache-Control"] = "no-cache"
@@ -31,6 +31,14 @@ function ProjectDetail() {
     loadData()
   }, [id])
   
+  // Listings only carry a preview; load the full text when a document is opened
+  useEffect(() => {
+    if (!viewingDoc || viewingDoc.content_text !== undefined) return
+    const docId = viewingDoc.id
+    const withText = (text) => setViewingDoc(doc => doc && doc.id === docId ? { ...doc, content_text: text } : doc)
+    documentsAPI.getContent(docId).then(withText).catch(() => withText(''))
+  }, [viewingDoc])
+  
   async function loadData() {
     try {
       setLoading(true)
@@ -85,12 +93,20 @@ function ProjectDetail() {
   }
   
   async function handleFileUpload(e) {
-    const file = e.target.files[0]
-    if (!file) return
+    const files = Array.from(e.target.files)
+    if (files.length === 0) return
     
     setUploading(true)
     try {
-      await documentsAPI.upload(id, file.name, uploadType, file)
+      if (files.length === 1) {
+        await documentsAPI.upload(id, files[0].name, uploadType, files[0])
+      } else {
+        const batch = await documentsAPI.uploadBatch(id, files, uploadType)
+        const rejected = batch.files.filter(f => f.status === 'rejected')
+        if (rejected.length > 0) {
+          alert('Some files were not uploaded:\n' + rejected.map(f => `${f.filename}: ${f.error}`).join('\n'))
+        }
+      }
       loadData()
     } catch (err) {
       alert('Upload failed: ' + err.message)
@@ -335,13 +351,14 @@ function ProjectDetail() {
                   </div>
                   <div className="add-option-text">
                     <h5>{uploading ? 'Uploading...' : 'Upload File'}</h5>
-                    <p>PDF, Word, or Markdown</p>
+                    <p>PDF, Word, Markdown, HTML, ODT or Excel</p>
                   </div>
                 </div>
                 <input
                   ref={fileInputRef}
                   type="file"
-                  accept=".pdf,.docx,.doc,.md,.txt"
+                  multiple
+                  accept=".pdf,.docx,.doc,.md,.txt,.html,.htm,.odt,.xlsx"
                   onChange={handleFileUpload}
                   style={{ display: 'none' }}
                 />
@@ -1183,6 +1200,19 @@ function ProjectDetail() {
 function DocumentItem({ doc, onDelete, onView }) {
   const isLink = doc.file_type === 'link'
   const isPasted = doc.file_type === 'pasted'
+  const hasFile = doc.file_path && !isLink && !isPasted && doc.doc_type !== 'note'
+  
+  const handleDownload = async () => {
+    try {
+      const blob = await documentsAPI.downloadFile(doc.id)
+      const url = URL.createObjectURL(blob)
+      window.open(url, '_blank', 'noopener')
+      // The new tab loads the blob asynchronously; release it once it has had time to
+      setTimeout(() => URL.revokeObjectURL(url), 60000)
+    } catch (error) {
+      alert('Failed to download file: ' + error.message)
+    }
+  }
   
   const getTypeLabel = () => {
     if (isLink) return '🔗 External Link'
@@ -1218,6 +1248,11 @@ function DocumentItem({ doc, onDelete, onView }) {
           <FileText size={16} />
         </button>
       )}
+      {hasFile && (
+        <button className="btn btn-ghost" onClick={handleDownload} title="Download File">
+          <Download size={16} />
+        </button>
+      )}
       <button className="btn btn-ghost" onClick={() => onDelete(doc.id)} title="Delete">
         <Trash2 size={16} />
       </button>
@@ -58,6 +58,14 @@ function StrategyEditor() {
     loadData()
   }, [id])
   
+  // Listings only carry a preview; load the full text when a document is opened
+  useEffect(() => {
+    if (!selectedDoc || selectedDoc.content_text !== undefined) return
+    const docId = selectedDoc.id
+    const withText = (text) => setSelectedDoc(doc => doc && doc.id === docId ? { ...doc, content_text: text } : doc)
+    documentsAPI.getContent(docId).then(withText).catch(() => withText(''))
+  }, [selectedDoc])
+  
   async function loadData() {
     try {
       setLoading(true)
@@ -182,7 +190,11 @@ function StrategyEditor() {
         // Expand all sections to show generated content
         setExpandedSections(SECTIONS.map(s => s.key))
         
-        alert(`Generated content based on ${result.document_count} document(s)! Review and edit as needed.`)
+        if (result.partial) {
+          alert(`Generated content based on ${result.document_count - result.incomplete_documents.length} of ${result.document_count} document(s). Not included (still being analysed, or analysis failed): ${result.incomplete_documents.join(', ')}. Generate again shortly to include them.`)
+        } else {
+          alert(`Generated content based on ${result.document_count} document(s)! Review and edit as needed.`)
+        }
       }
     } catch (err) {
       alert('Generation failed: ' + err.message)
@@ -88,6 +88,57 @@ export const documentsAPI = {
     })
   },
   
+  // Many files in one request; extraction runs for all of them concurrently
+  uploadBatch: async (projectId, files, docType) => {
+    const formData = new FormData()
+    formData.append('project_id', projectId)
+    formData.append('doc_types', docType)
+    files.forEach(file => formData.append('files', file))
+    
+    return fetchAPI('/documents/upload-batch', {
+      method: 'POST',
+      body: formData
+    })
+  },
+  
+  // Per-file status of a batch: pending / done / failed / rejected
+  getBatch: (batchId) => fetchAPI(`/documents/upload-batch/${batchId}`),
+  
+  // Text is extracted in the background after upload: pending / done / failed
+  getExtractionStatus: (id) => fetchAPI(`/documents/${id}/extraction`),
+  
+  // Full text is not part of listings (they carry content_preview); plain text body.
+  // Requires sign-in and access to the project
+  getContent: async (id) => {
+    const response = await fetch(`${API_BASE}/documents/${id}/content`, { headers: getAuthHeader() })
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}`)
+    }
+    return response.text()
+  },
+  
+  // Re-pull linked Google Docs in the background (all projects if projectId is omitted)
+  refreshLinks: (projectId) => fetchAPI(`/documents/refresh-links${projectId ? `?project_id=${projectId}` : ''}`, {
+    method: 'POST'
+  }),
+  
+  // Original uploaded file (requires sign-in and access to the project)
+  downloadFile: async (id) => {
+    const response = await fetch(`${API_BASE}/documents/${id}/file`, { headers: getAuthHeader() })
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}`)
+    }
+    return response.blob()
+  },
+  
+  // Ranked full-text search across a project's documents (matches wrapped in **...**)
+  search: (projectId, q, { limit = 20, offset = 0 } = {}) =>
+    fetchAPI(`/projects/${projectId}/documents/search?q=${encodeURIComponent(q)}&limit=${limit}&offset=${offset}`),
+  
+  // PDF page layout and single-page text
+  getPages: (id) => fetchAPI(`/documents/${id}/pages`),
+  getPage: (id, pageNumber) => fetchAPI(`/documents/${id}/pages/${pageNumber}`),
+  
   createNote: (data) => fetchAPI('/documents/note', {
     method: 'POST',
     body: JSON.stringify(data)
@@ -299,13 +350,23 @@ export const breakdownAPI = {
 
 // Progress
 export const progressAPI = {
+  // Summaries for several strategies in one request: { ids: [1, 2] } or { projectId }
+  getBatch: ({ ids, projectId } = {}) => {
+    const params = new URLSearchParams()
+    if (ids && ids.length) params.append('strategy_ids', ids.join(','))
+    if (projectId) params.append('project_id', projectId)
+    return fetchAPI(`/progress?${params.toString()}`)
+  },
+  
   getFull: (strategyId) => fetchAPI(`/strategies/${strategyId}/progress`),
   
   getSummary: (strategyId) => fetchAPI(`/strategies/${strategyId}/progress/summary`),
   
   getByParticipant: (strategyId) => fetchAPI(`/strategies/${strategyId}/progress/by-participant`),
   
-  getByCategory: (strategyId) => fetchAPI(`/strategies/${strategyId}/progress/by-category`)
+  getByCategory: (strategyId) => fetchAPI(`/strategies/${strategyId}/progress/by-category`),
+  
+  getByTeam: (strategyId) => fetchAPI(`/strategies/${strategyId}/progress/by-team`)
 }
 
 // ============== Authentication ==============
@@ -397,3 +458,74 @@ export const sharesAPI = {
   })
 }
 
+// ============== Admin ==============
+
+export const adminAPI = {
+  getStorage: () => fetchAPI('/admin/storage', {
+    headers: getAuthHeader()
+  }),
+  
+  sweepStorage: () => fetchAPI('/admin/storage/sweep', {
+    method: 'POST',
+    headers: getAuthHeader()
+  }),
+  
+  startReextraction: (filters) => fetchAPI('/admin/reextraction', {
+    method: 'POST',
+    headers: getAuthHeader(),
+    body: JSON.stringify(filters)
+  }),
+  
+  getReextractions: () => fetchAPI('/admin/reextraction', {
+    headers: getAuthHeader()
+  }),
+  
+  getReextraction: (id) => fetchAPI(`/admin/reextraction/${id}`, {
+    headers: getAuthHeader()
+  }),
+  
+  pauseReextraction: (id) => fetchAPI(`/admin/reextraction/${id}/pause`, {
+    method: 'POST',
+    headers: getAuthHeader()
+  }),
+  
+  resumeReextraction: (id) => fetchAPI(`/admin/reextraction/${id}/resume`, {
+    method: 'POST',
+    headers: getAuthHeader()
+  }),
+  
+  cancelReextraction: (id) => fetchAPI(`/admin/reextraction/${id}/cancel`, {
+    method: 'POST',
+    headers: getAuthHeader()
+  }),
+  
+  getTechnologies: (params = {}) => {
+    const query = new URLSearchParams(params).toString()
+    return fetchAPI(`/admin/technologies${query ? `?${query}` : ''}`, {
+      headers: getAuthHeader()
+    })
+  },
+  
+  createTechnology: (data) => fetchAPI('/admin/technologies', {
+    method: 'POST',
+    headers: getAuthHeader(),
+    body: JSON.stringify(data)
+  }),
+  
+  updateTechnology: (id, data) => fetchAPI(`/admin/technologies/${id}`, {
+    method: 'PUT',
+    headers: getAuthHeader(),
+    body: JSON.stringify(data)
+  }),
+  
+  deleteTechnology: (id) => fetchAPI(`/admin/technologies/${id}`, {
+    method: 'DELETE',
+    headers: getAuthHeader()
+  }),
+  
+  importTechnologies: (entries) => fetchAPI('/admin/technologies/import', {
+    method: 'POST',
+    headers: getAuthHeader(),
+    body: JSON.stringify(entries)
+  })
+}
@@ -9,10 +9,6 @@ export default defineConfig({
       '/api': {
         target: 'http://localhost:8001',
         changeOrigin: true
-      },
-      '/uploads': {
-        target: 'http://localhost:8001',
-        changeOrigin: true
       }
     }
   }